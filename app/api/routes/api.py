@@ -1,7 +1,14 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 
 from app.api.routes import stocks
 from app.core.config import settings
+from app.services.cache_manager import cache_manager
+from app.services.cache_service import tiered_cache
+from app.services.rate_limiter import alpha_vantage_limiter
+from app.services.scheduler_service import scheduler_service
+from app.services.stock_service import StockService
+from app.services.warmup_service import warmup_service
 
 router = APIRouter(prefix=settings.API_V1_STR)
 
@@ -12,3 +19,23 @@ router.include_router(stocks.router, tags=["Stocks"])
 @router.get("/")
 async def health_check():
     return {"status": "healthy", "message": "API is working correctly"}
+
+
+@router.get("/ready")
+async def readiness_check():
+    """Report whether cache warm-up has finished, with its progress"""
+    return JSONResponse(
+        status_code=200 if warmup_service.ready else 503,
+        content={"ready": warmup_service.ready, "warmup": warmup_service.progress},
+    )
+
+
+@router.get("/stats")
+async def service_stats():
+    """Get runtime counters for the stock data services"""
+    return {
+        "single_flight": StockService.single_flight_stats(),
+        "cache": {**tiered_cache.stats(), "budget": cache_manager.stats()},
+        "rate_limiter": alpha_vantage_limiter.stats(),
+        "refresh": scheduler_service.refresh_progress,
+    }
@@ -3,37 +3,24 @@ import logging
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.models.stock import StockData, StockOverview
 from app.services.stock_service import StockService
+from app.services.warmup_service import warmup_service
 
 router = APIRouter(prefix="/stocks")
 logger = logging.getLogger(__name__)
 
 
-@router.get("/{symbol}", response_model=StockData)
-async def get_stock(symbol: str, db: AsyncSession = Depends(get_db)):
-    """Get stock data by symbol"""
-    stock_data = await StockService.get_stock_data(symbol, db)
-
-    if not stock_data:
-        raise HTTPException(status_code=404, detail=f"Stock {symbol} not found")
-
-    return stock_data
-
-
-@router.get("/{symbol}/overview", response_model=StockOverview)
-async def get_stock_overview(symbol: str, db: AsyncSession = Depends(get_db)):
-    """Get company overview for a stock"""
-    overview = await StockService.get_stock_overview(symbol, db)
-
-    if not overview:
-        raise HTTPException(status_code=404, detail=f"Overview for {symbol} not found")
-
-    return overview
+def _validate_symbol(symbol: str) -> str:
+    """Normalize a symbol path parameter, rejecting malformed ones up front"""
+    normalized = StockService.normalize_symbol(symbol)
+    if normalized is None:
+        raise HTTPException(status_code=400, detail=f"Invalid symbol: {symbol}")
+    return normalized
 
 
 @router.get("/popular", response_model=List[dict])
@@ -67,3 +54,50 @@ async def search_stocks(
     """Search for stocks by symbol or name"""
     results = await StockService.search_stocks(query, db)
     return results
+
+
+# Declared after the fixed paths above so /{symbol} does not capture them
+@router.get("/{symbol}", response_model=StockData)
+async def get_stock(symbol: str, db: AsyncSession = Depends(get_db)):
+    """Get stock data by symbol"""
+    symbol = _validate_symbol(symbol)
+    # Served as pre-encoded JSON; response_model only documents the schema
+    body = await StockService.get_stock_data_json(symbol, db)
+
+    if not body:
+        raise HTTPException(status_code=404, detail=f"Stock {symbol} not found")
+
+    # Counted symbols join the cache warm-up hot set on the next start
+    warmup_service.record_request(symbol)
+    return Response(content=body, media_type="application/json")
+
+
+@router.get("/{symbol}/history", response_model=StockData)
+async def get_stock_history(
+    symbol: str,
+    days: Optional[int] = Query(None, ge=1),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get the full stored price history of a stock, archived bars included"""
+    symbol = _validate_symbol(symbol)
+    stock_data = await StockService.get_price_history(symbol, db, days)
+
+    if not stock_data:
+        raise HTTPException(status_code=404, detail=f"Stock {symbol} not found")
+
+    return Response(
+        content=stock_data.model_dump_json(), media_type="application/json"
+    )
+
+
+@router.get("/{symbol}/overview", response_model=StockOverview)
+async def get_stock_overview(symbol: str, db: AsyncSession = Depends(get_db)):
+    """Get company overview for a stock"""
+    symbol = _validate_symbol(symbol)
+    body = await StockService.get_stock_overview_json(symbol, db)
+
+    if not body:
+        raise HTTPException(status_code=404, detail=f"Overview for {symbol} not found")
+
+    warmup_service.record_request(symbol)
+    return Response(content=body, media_type="application/json")
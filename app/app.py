@@ -1,16 +1,22 @@
 import logging
 from pathlib import Path
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from sqlalchemy import exc
 
 from app.api.routes.api import router as api_router
 from app.api.routes.dashboard import router as dashboard_router
 from app.api.routes.websockets import router as websocket_router
 from app.core.config import settings
-from app.core.database import init_db
+from app.core.database import async_session, init_db, pool_timeouts
+from app.services.alpha_vantage_client import alpha_vantage_client
+from app.services.cache_service import tiered_cache
 from app.services.scheduler_service import scheduler_service
+from app.services.stock_service import StockService
+from app.services.warmup_service import warmup_service
 from app.services.websocket_service import start_stock_update_task
 
 logging.basicConfig(
@@ -19,6 +25,15 @@ logging.basicConfig(
 )
 
 
+def database_busy_response() -> JSONResponse:
+    """Response for a request that timed out waiting for a database connection"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Database busy, retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+
 def create_application() -> FastAPI:
     application = FastAPI(title=settings.PROJECT_NAME, debug=settings.DEBUG)
 
@@ -38,6 +53,26 @@ def create_application() -> FastAPI:
     # Include WebSocket routes
     application.include_router(websocket_router)
 
+    # Answer 503 when the connection pool is exhausted. Repositories log and
+    # swallow database errors, so a checkout timeout would otherwise surface
+    # as an empty result (404) after waiting out the whole pool timeout
+    @application.middleware("http")
+    async def database_busy_middleware(request: Request, call_next):
+        timeouts = []
+        token = pool_timeouts.set(timeouts)
+        try:
+            response = await call_next(request)
+        finally:
+            pool_timeouts.reset(token)
+        if timeouts:
+            logging.warning(f"{request.url.path}: {timeouts[0]}")
+            return database_busy_response()
+        return response
+
+    @application.exception_handler(exc.TimeoutError)
+    async def database_timeout_handler(request: Request, error: exc.TimeoutError):
+        return database_busy_response()
+
     # Add event handlers for startup and shutdown
     @application.on_event("startup")
     async def startup_event():
@@ -45,9 +80,23 @@ def create_application() -> FastAPI:
         await init_db()
         logging.info("Database initialized")
 
-        # Start the stock update background task
+        # Build cache keys with the persisted namespace versions
+        async with async_session() as db:
+            await tiered_cache.load_namespace_versions(db)
+
+            # Serve search autocomplete from memory; save_stock keeps it current
+            indexed = await StockService.rebuild_search_index(db)
+            if indexed is not None:
+                logging.info(f"Indexed {indexed} stocks for autocomplete")
+
+        # Warm the caches with hot symbols; /api/v1/ready reports progress
         import asyncio
 
+        application.state.warmup_task = asyncio.create_task(
+            warmup_service.warm_up(scheduler_service.popular_symbols)
+        )
+
+        # Start the stock update background task
         application.state.stock_update_task = asyncio.create_task(
             start_stock_update_task()
         )
@@ -64,10 +113,19 @@ def create_application() -> FastAPI:
             application.state.stock_update_task.cancel()
             logging.info("Stopped stock update background task")
 
+        if hasattr(application.state, "warmup_task"):
+            application.state.warmup_task.cancel()
+
         # Shutdown the scheduler service
         scheduler_service.shutdown()
         logging.info("Stopped scheduler service")
 
+        # Keep this run's request counts for the next warm-up
+        await warmup_service.save_request_counts()
+
+        # Release pooled upstream connections
+        await alpha_vantage_client.close()
+
     return application
 
 
@@ -1,36 +1,316 @@
+import logging
 import os
+from contextvars import ContextVar
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Any, Dict, List, Optional
 
 from sqlalchemy import (
+    BigInteger,
     Column,
     DateTime,
     Float,
     ForeignKey,
     Index,
     Integer,
+    LargeBinary,
     String,
     UniqueConstraint,
+    column,
     create_engine,
+    event,
+    exc,
+    inspect,
+    make_url,
+    table,
+    text,
+)
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
 )
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship, sessionmaker
+from sqlalchemy.orm import Session, relationship, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
 
 # Create the database directory if it doesn't exist
 db_dir = Path(__file__).parent.parent.parent / "data"
 db_dir.mkdir(exist_ok=True)
 
-# Database URL
-SQLALCHEMY_DATABASE_URL = f"sqlite+aiosqlite:///{db_dir}/stock_data.db"
+# Database URL, the SQLite file under data/ unless DATABASE_URL is set
+SQLALCHEMY_DATABASE_URL = (
+    settings.DATABASE_URL or f"sqlite+aiosqlite:///{db_dir}/stock_data.db"
+)
+
+# SQLite engine profiles: PRAGMAs applied to every new connection. "default"
+# keeps SQLite's own defaults (rollback journal), "wal" lets readers run
+# alongside a writer, and "tuned" adds a larger page cache, memory-mapped
+# reads and in-memory temp tables on top of WAL. Pools are sized from the
+# DATABASE_POOL_* settings instead, since they depend on the expected load.
+ENGINE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": {
+        "pragmas": {"journal_mode": "DELETE", "synchronous": "FULL"},
+    },
+    "wal": {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "busy_timeout": 5000,
+        },
+    },
+    "tuned": {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "busy_timeout": 5000,
+            "cache_size": -64 * 1024,  # Negative values are KiB: 64 MiB
+            "mmap_size": 256 * 1024 * 1024,
+            "temp_store": "MEMORY",
+        },
+    },
+}
 
-# Create async engine
-engine = create_async_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+# Connection checkouts that timed out while serving the current request; the
+# API middleware sets a list per request and answers 503 if one is recorded,
+# since repositories swallow database errors and would return empty results
+pool_timeouts: ContextVar[Optional[List[str]]] = ContextVar(
+    "pool_timeouts", default=None
 )
 
-# Create sessionmaker
-async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+class ReportingQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that records checkout timeouts in `pool_timeouts`"""
+
+    def _do_get(self):
+        try:
+            return super()._do_get()
+        except exc.TimeoutError as e:
+            timeouts = pool_timeouts.get()
+            if timeouts is not None:
+                timeouts.append(str(e))
+            raise
+
+
+def _pool_options(role: str) -> Dict[str, Any]:
+    """Get the connection pool settings for an engine role"""
+    if role == "write":
+        # A single connection, so write transactions take turns on it
+        return {
+            "pool_size": 1,
+            "max_overflow": 0,
+            "pool_timeout": settings.DATABASE_WRITE_TIMEOUT_SECONDS,
+        }
+    return {
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT_SECONDS,
+    }
+
+
+# Engine roles: "read" engines open query-only connections, "write" engines
+# keep a single connection so write transactions take turns on it
+ENGINE_ROLES = ("shared", "read", "write")
+
+
+def build_engine(
+    url: str, profile: str = "default", role: str = "shared"
+) -> AsyncEngine:
+    """Create an async engine configured by an engine profile
+
+    SQLITE_PRAGMAS entries in the settings override the profile's PRAGMAs.
+    Engine profiles only apply to SQLite; see _build_server_engine for other
+    databases.
+    """
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(
+            f"Unknown database profile {profile!r}, "
+            f"expected one of {', '.join(ENGINE_PROFILES)}"
+        )
+    if role not in ENGINE_ROLES:
+        raise ValueError(
+            f"Unknown engine role {role!r}, expected one of {', '.join(ENGINE_ROLES)}"
+        )
+    if make_url(url).get_backend_name() != "sqlite":
+        return _build_server_engine(url, role)
+
+    pragmas = {**ENGINE_PROFILES[profile]["pragmas"], **settings.SQLITE_PRAGMAS}
+    if role == "read":
+        # Writes through a read engine fail instead of taking the write lock
+        pragmas["query_only"] = "ON"
+    new_engine = create_async_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        poolclass=ReportingQueuePool,
+        **_pool_options(role),
+    )
+
+    @event.listens_for(new_engine.sync_engine, "connect")
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    return new_engine
+
+
+def _build_server_engine(url: str, role: str) -> AsyncEngine:
+    """Create an async engine for a database server such as PostgreSQL
+
+    The server handles concurrent writers itself, so every role gets a full
+    pool; read engines open read-only transactions on asyncpg.
+    """
+    connect_args = {}
+    if role == "read" and make_url(url).get_driver_name() == "asyncpg":
+        connect_args["server_settings"] = {"default_transaction_read_only": "on"}
+    pool = _pool_options("shared")
+    if role == "write":
+        pool["pool_timeout"] = settings.DATABASE_WRITE_TIMEOUT_SECONDS
+    return create_async_engine(
+        url,
+        connect_args=connect_args,
+        poolclass=ReportingQueuePool,
+        pool_pre_ping=True,
+        **pool,
+    )
+
+
+# Statement execution option declaring whether it reads or writes
+READ_INTENT = "read"
+WRITE_INTENT = "write"
+
+
+def write_intent(statement):
+    """Mark a SELECT to run on the write connection
+
+    Used for reads whose results feed a write in the same transaction, so
+    the read queues behind other writers instead of racing them.
+    """
+    return statement.execution_options(intent=WRITE_INTENT)
+
+
+class RoutingSession(Session):
+    """Session sending writes to the write engine and reads to the read engine
+
+    INSERT/UPDATE/DELETE statements, statements with write intent and
+    flushes run on the single write connection; other reads run on a
+    query-only connection, so they never wait for the writer's pool. When a
+    transaction first writes, its read connection goes back to the read pool
+    before it queues for the writer, and its later reads follow it to the
+    writer until it ends, so a session always reads its own uncommitted
+    writes.
+    """
+
+    def __init__(self, *args, read_engine=None, write_engine=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.read_engine = read_engine
+        self.write_engine = write_engine
+        # Whether the current transaction has started writing
+        self.writing = False
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.writing or clause is None or clause.is_dml:
+            return self.write_engine.sync_engine
+        intent = clause.get_execution_options().get("intent", READ_INTENT)
+        if intent == WRITE_INTENT:
+            return self.write_engine.sync_engine
+        return self.read_engine.sync_engine
+
+    def start_writing(self):
+        """Route the rest of the transaction to the writer, releasing the reader"""
+        if self.writing:
+            return
+        self.writing = True
+        # Savepoints are pinned to the connection they started on
+        if not self.in_nested_transaction():
+            self._release_read_connection()
+
+    def _release_read_connection(self):
+        """Return the transaction's read connection to its pool
+
+        Session has no public way to drop one bind's connection from a
+        transaction, so this edits SessionTransaction._connections, keyed by
+        engine and by connection; tests/test_routing_session.py checks that
+        layout, and pyproject.toml bounds the SQLAlchemy version.
+        """
+        transaction = self.get_transaction()
+        if transaction is None:
+            return
+        entry = transaction._connections.pop(self.read_engine.sync_engine, None)
+        if entry is None:
+            return
+        connection, read_transaction = entry[0], entry[1]
+        transaction._connections.pop(connection, None)
+        # Reads are query-only, so ending their transaction loses nothing
+        read_transaction.rollback()
+        connection.close()
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _route_write_statements(orm_execute_state):
+    """Start writing before a write statement takes a connection"""
+    statement = orm_execute_state.statement
+    intent = statement.get_execution_options().get("intent", READ_INTENT)
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+        or intent == WRITE_INTENT
+    ):
+        orm_execute_state.session.start_writing()
+
+
+@event.listens_for(RoutingSession, "before_flush")
+def _route_flushes(session, flush_context, instances):
+    """Start writing before a flush takes a connection"""
+    session.start_writing()
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _end_writing(session, transaction):
+    """Send reads back to the read engine once the outer transaction ends"""
+    if transaction.parent is None:
+        session.writing = False
+
+
+def routing_sessionmaker(
+    read_engine: AsyncEngine, write_engine: AsyncEngine
+) -> async_sessionmaker:
+    """Create a session factory routing reads and writes to separate engines"""
+    return async_sessionmaker(
+        class_=AsyncSession,
+        sync_session_class=RoutingSession,
+        expire_on_commit=False,
+        read_engine=read_engine,
+        write_engine=write_engine,
+    )
+
+
+# Create async engines: query-only readers and a single serialized writer
+read_engine = build_engine(
+    SQLALCHEMY_DATABASE_URL, settings.DATABASE_PROFILE, role="read"
+)
+write_engine = build_engine(
+    SQLALCHEMY_DATABASE_URL, settings.DATABASE_PROFILE, role="write"
+)
+# Schema setup and maintenance scripts run on the write engine
+engine = write_engine
+
+# Create sessionmakers: read_session for read-only work, write_session for
+# maintenance that only writes, async_session routing each statement
+read_session = async_sessionmaker(
+    read_engine, class_=AsyncSession, expire_on_commit=False
+)
+write_session = async_sessionmaker(
+    write_engine, class_=AsyncSession, expire_on_commit=False
+)
+async_session = routing_sessionmaker(read_engine, write_engine)
 
 # Create base class for declarative models
 Base = declarative_base()
@@ -74,7 +354,7 @@ class StockPrice(Base):
     high = Column(Float, nullable=False)
     low = Column(Float, nullable=False)
     close = Column(Float, nullable=False)
-    volume = Column(Integer, nullable=False)
+    volume = Column(BigInteger, nullable=False)
     created_at = Column(DateTime, default=datetime.now)
 
     # Relationship with Stock
@@ -95,10 +375,75 @@ class APICache(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     key = Column(String, unique=True, index=True, nullable=False)
-    data = Column(String, nullable=False)  # Stored as JSON string
-    expires_at = Column(DateTime, nullable=False)
+    data = Column(LargeBinary, nullable=False)  # JSON encoded by CacheCodec
+    expires_at = Column(DateTime, nullable=False)  # Hard TTL
+    stale_at = Column(DateTime, nullable=True)  # Soft TTL, served stale after
     created_at = Column(DateTime, default=datetime.now)
 
+    # Bookkeeping for size-budgeted LRU eviction
+    namespace = Column(String, nullable=True)
+    size_bytes = Column(Integer, nullable=True)
+    last_accessed_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_api_cache_namespace_accessed", "namespace", "last_accessed_at"),
+        Index("ix_api_cache_last_accessed_at", "last_accessed_at"),
+    )
+
+
+class APICacheTag(Base):
+    """Model for tags on cache entries, used to invalidate them as a group"""
+
+    __tablename__ = "api_cache_tags"
+
+    tag = Column(String, primary_key=True)
+    cache_key = Column(String, primary_key=True)
+
+    # The primary key serves lookups by tag; this index serves lookups by key
+    __table_args__ = (Index("ix_api_cache_tags_cache_key", "cache_key"),)
+
+
+class CacheNamespace(Base):
+    """Model for the current key version of each cache namespace"""
+
+    __tablename__ = "cache_namespaces"
+
+    namespace = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=1)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+
+class CacheInvalidation(Base):
+    """Model for cache keys dropped by another process, such as scripts/db_util.py
+
+    Running servers replay new rows to drop the keys from their memory tier.
+    """
+
+    __tablename__ = "cache_invalidations"
+
+    id = Column(Integer, primary_key=True)
+    cache_key = Column(String, nullable=False)
+    created_at = Column(DateTime, default=datetime.now, index=True)
+
+
+class SymbolRequest(Base):
+    """Model for per-symbol request counts, used to pick the warm-up hot set"""
+
+    __tablename__ = "symbol_requests"
+
+    id = Column(Integer, primary_key=True, index=True)
+    symbol = Column(String, unique=True, index=True, nullable=False)
+    request_count = Column(Integer, nullable=False, default=0)
+    last_requested_at = Column(DateTime, nullable=True)
+
+
+# FTS5 index over stock symbols and names (SQLite only); each row's rowid is
+# the stock id, and StockRepository.save_stock keeps it in step with stocks
+STOCK_SEARCH_TABLE = "stocks_fts"
+stock_search = table(
+    STOCK_SEARCH_TABLE, column("rowid"), column("symbol"), column("name")
+)
+
 
 async def get_db():
     """Dependency for getting database session"""
@@ -106,9 +451,52 @@ async def get_db():
         yield session
 
 
+def _add_missing_columns(connection):
+    """Add model columns and indexes missing from tables created by an older version"""
+    inspector = inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                column_type = column.type.compile(connection.dialect)
+                connection.execute(
+                    text(
+                        f"ALTER TABLE {table.name} "
+                        f"ADD COLUMN {column.name} {column_type}"
+                    )
+                )
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
+def create_stock_search_index(connection):
+    """Create the stock search index, refilling it if it is out of step"""
+    if connection.dialect.name != "sqlite":
+        return
+    # Prefix indexes make 1-3 character autocomplete prefixes cheap
+    connection.exec_driver_sql(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {STOCK_SEARCH_TABLE} "
+        "USING fts5(symbol, name, prefix='1 2 3')"
+    )
+    indexed = connection.exec_driver_sql(
+        f"SELECT count(*) FROM {STOCK_SEARCH_TABLE}"
+    ).scalar()
+    stocks = connection.exec_driver_sql("SELECT count(*) FROM stocks").scalar()
+    if indexed != stocks:
+        connection.exec_driver_sql(f"DELETE FROM {STOCK_SEARCH_TABLE}")
+        connection.exec_driver_sql(
+            f"INSERT INTO {STOCK_SEARCH_TABLE} (rowid, symbol, name) "
+            "SELECT id, symbol, name FROM stocks"
+        )
+
+
 async def init_db():
     """Initialize database, creating tables if they don't exist"""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
+        await conn.run_sync(create_stock_search_index)
 
     print("Database initialized")
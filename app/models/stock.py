@@ -1,7 +1,10 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
 
-from pydantic import BaseModel, Field
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, Field, GetCoreSchemaHandler
+from pydantic_core import core_schema
 
 
 class StockPrice(BaseModel):
@@ -15,12 +18,208 @@ class StockPrice(BaseModel):
     volume: int
 
 
+class PriceSeries:
+    """Columnar price history backed by NumPy arrays
+
+    Holds one array per field instead of one StockPrice object per bar.
+    Integer indexing and iteration build StockPrice rows on demand, slicing
+    returns a PriceSeries of zero-copy views, and JSON encoding works on whole
+    columns at once.
+    """
+
+    __slots__ = ("dates", "open", "high", "low", "close", "volume")
+
+    COLUMNS = ("open", "high", "low", "close", "volume")
+
+    def __init__(
+        self,
+        dates: Any,
+        open: Any,
+        high: Any,
+        low: Any,
+        close: Any,
+        volume: Any,
+    ):
+        self.dates = np.asarray(dates, dtype="datetime64[us]")
+        self.open = np.asarray(open, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.close = np.asarray(close, dtype=np.float64)
+        self.volume = np.asarray(volume, dtype=np.int64)
+
+    @classmethod
+    def empty(cls) -> "PriceSeries":
+        """Create a series with no bars"""
+        return cls([], [], [], [], [], [])
+
+    @classmethod
+    def from_records(cls, records: Iterable[Sequence[Any]]) -> "PriceSeries":
+        """Create a series from (date, open, high, low, close, volume) tuples"""
+        records = list(records)
+        if not records:
+            return cls.empty()
+        return cls(*zip(*records))
+
+    @classmethod
+    def from_rows(
+        cls, rows: Iterable[Union[StockPrice, Dict[str, Any]]]
+    ) -> "PriceSeries":
+        """Create a series from StockPrice objects or dictionaries"""
+        rows = list(rows)
+        if rows and isinstance(rows[0], dict):
+            return cls.from_json_rows(rows)
+        return cls.from_records(
+            (row.date, row.open, row.high, row.low, row.close, row.volume)
+            for row in rows
+        )
+
+    @classmethod
+    def from_json_rows(cls, rows: List[Dict[str, Any]]) -> "PriceSeries":
+        """Create a series from JSON-style dictionaries with ISO date strings"""
+        return cls(
+            np.array([row["date"] for row in rows], dtype="datetime64[us]"),
+            *([row[column] for row in rows] for column in cls.COLUMNS),
+        )
+
+    @classmethod
+    def concat(cls, series: Iterable["PriceSeries"]) -> "PriceSeries":
+        """Join several series end to end"""
+        series = list(series)
+        if not series:
+            return cls.empty()
+        return cls(
+            np.concatenate([part.dates for part in series]),
+            *(
+                np.concatenate([getattr(part, column) for part in series])
+                for column in cls.COLUMNS
+            ),
+        )
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return self._take(index)
+        return StockPrice(
+            date=self.dates[index].item(),
+            open=float(self.open[index]),
+            high=float(self.high[index]),
+            low=float(self.low[index]),
+            close=float(self.close[index]),
+            volume=int(self.volume[index]),
+        )
+
+    def __iter__(self) -> Iterator[StockPrice]:
+        for row in zip(
+            self.dates.tolist(),
+            self.open.tolist(),
+            self.high.tolist(),
+            self.low.tolist(),
+            self.close.tolist(),
+            self.volume.tolist(),
+        ):
+            yield StockPrice(
+                date=row[0],
+                open=row[1],
+                high=row[2],
+                low=row[3],
+                close=row[4],
+                volume=row[5],
+            )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PriceSeries):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            np.array_equal(getattr(self, name), getattr(other, name))
+            for name in self.__slots__
+        )
+
+    def __repr__(self) -> str:
+        return f"PriceSeries({len(self)} bars)"
+
+    def _take(self, index: Any) -> "PriceSeries":
+        """Select bars by slice (views) or by index array/mask (copies)"""
+        return PriceSeries(
+            self.dates[index],
+            *(getattr(self, column)[index] for column in self.COLUMNS),
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the column arrays"""
+        return sum(getattr(self, name).nbytes for name in self.__slots__)
+
+    def sorted(self, descending: bool = True) -> "PriceSeries":
+        """Get the series ordered by date (newest first by default)"""
+        order = np.argsort(self.dates, kind="stable")
+        if descending:
+            order = order[::-1]
+        return self._take(order)
+
+    def since(self, start: datetime) -> "PriceSeries":
+        """Get the bars dated on or after `start`"""
+        return self._take(self.dates >= np.datetime64(start, "us"))
+
+    def to_rows(self) -> List[StockPrice]:
+        """Materialize the series as StockPrice objects"""
+        return list(self)
+
+    def to_json_rows(self) -> List[Dict[str, Any]]:
+        """Encode the series as JSON-ready dictionaries with ISO dates"""
+        dates = np.datetime_as_string(self.dates, unit="s").tolist()
+        columns = [getattr(self, column).tolist() for column in self.COLUMNS]
+        return [
+            {
+                "date": date,
+                "open": open_,
+                "high": high,
+                "low": low,
+                "close": close,
+                "volume": volume,
+            }
+            for date, open_, high, low, close, volume in zip(dates, *columns)
+        ]
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Convert the series to a DataFrame indexed by date"""
+        return pd.DataFrame(
+            {column: getattr(self, column) for column in self.COLUMNS},
+            index=pd.DatetimeIndex(self.dates, name="date"),
+        )
+
+    def _serialize(self, info: Any) -> List[Dict[str, Any]]:
+        if info.mode == "json":
+            return self.to_json_rows()
+        return [row.model_dump() for row in self]
+
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls, source: Any, handler: GetCoreSchemaHandler
+    ) -> core_schema.CoreSchema:
+        # Accept a PriceSeries as-is or build one from a list of rows; the
+        # schema is documented as a list of StockPrice objects
+        from_rows = core_schema.no_info_after_validator_function(
+            cls.from_rows, handler.generate_schema(List[StockPrice])
+        )
+        return core_schema.json_or_python_schema(
+            json_schema=from_rows,
+            python_schema=core_schema.union_schema(
+                [core_schema.is_instance_schema(cls), from_rows]
+            ),
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                cls._serialize, info_arg=True
+            ),
+        )
+
+
 class StockData(BaseModel):
     """Model for stock data including price history"""
 
     symbol: str
     name: str
-    prices: List[StockPrice] = []
+    prices: PriceSeries = Field(default_factory=PriceSeries.empty)
     last_updated: Optional[datetime] = None
 
 
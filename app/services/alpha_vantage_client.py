@@ -0,0 +1,171 @@
+import asyncio
+import codecs
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import aiohttp
+
+from app.core.config import settings
+from app.services.rate_limiter import (
+    RateLimiter,
+    RateLimitExceeded,
+    alpha_vantage_limiter,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AlphaVantageClient:
+    """Non-blocking HTTP client for the Alpha Vantage API with a pooled session"""
+
+    def __init__(
+        self,
+        base_url: str,
+        rate_limiter: Optional[RateLimiter] = None,
+        pool_limit: int = 20,
+        pool_limit_per_host: int = 10,
+        keepalive_seconds: float = 30.0,
+        connect_timeout: float = 5.0,
+        timeout: float = 15.0,
+    ):
+        self.base_url = base_url
+        self.rate_limiter = rate_limiter
+        self.pool_limit = pool_limit
+        self.pool_limit_per_host = pool_limit_per_host
+        self.keepalive_seconds = keepalive_seconds
+        self.connect_timeout = connect_timeout
+        self.timeout = timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_lock = asyncio.Lock()
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared session, creating it on first use inside the running loop"""
+        if self._session is None or self._session.closed:
+            async with self._session_lock:
+                if self._session is None or self._session.closed:
+                    connector = aiohttp.TCPConnector(
+                        limit=self.pool_limit,
+                        limit_per_host=self.pool_limit_per_host,
+                        keepalive_timeout=self.keepalive_seconds,
+                        ttl_dns_cache=300,
+                    )
+                    self._session = aiohttp.ClientSession(
+                        connector=connector,
+                        timeout=aiohttp.ClientTimeout(
+                            total=self.timeout, sock_connect=self.connect_timeout
+                        ),
+                        raise_for_status=True,
+                    )
+                    logger.info(
+                        f"Opened Alpha Vantage session (pool={self.pool_limit}, "
+                        f"per_host={self.pool_limit_per_host})"
+                    )
+        return self._session
+
+    async def _acquire(self):
+        """Wait for the local budget to admit one call"""
+        if self.rate_limiter is None:
+            return
+        try:
+            await self.rate_limiter.acquire()
+        except RateLimitExceeded as e:
+            logger.warning(f"Alpha Vantage call not admitted: {e}")
+            raise
+
+    async def query(
+        self, params: Dict[str, Any], timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Run a query against the API and return the decoded JSON payload
+
+        `timeout` overrides the default per-call deadline in seconds. Raises
+        RateLimitExceeded for calls that do not fit the local budget; upstream
+        throttling comes back as the upstream's "Information" payload.
+        """
+        await self._acquire()
+
+        session = await self._get_session()
+        request_timeout = (
+            aiohttp.ClientTimeout(total=timeout, sock_connect=self.connect_timeout)
+            if timeout is not None
+            else None
+        )
+
+        async with session.get(
+            self.base_url, params=params, timeout=request_timeout
+        ) as response:
+            # Alpha Vantage does not always send a JSON content type
+            data = await response.json(content_type=None)
+
+        self._check_throttled(data)
+        return data
+
+    def _check_throttled(self, data: Any):
+        """Drain the minute budget if an upstream response is a throttle note
+
+        Only called on payloads the upstream actually sent.
+        """
+        if self.rate_limiter is not None and isinstance(data, dict):
+            if "Information" in data:
+                # The upstream throttled us, so stop spending the minute budget
+                self.rate_limiter.penalize()
+
+    async def iter_text(
+        self, params: Dict[str, Any], chunk_bytes: int = 65536
+    ) -> AsyncIterator[str]:
+        """Run a query and yield the response body as decoded text pieces
+
+        Used for large payloads that are parsed incrementally instead of being
+        held in memory whole. Rate limiting works as in `query`. A stream has
+        no overall deadline, only the default timeout between reads, so long
+        bodies are not cut off while they keep arriving.
+        """
+        await self._acquire()
+
+        session = await self._get_session()
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        # Throttle notes are tiny, so only bodies that fit in one chunk are
+        # kept whole to be checked once the stream ends
+        body: Optional[List[str]] = []
+
+        stream_timeout = aiohttp.ClientTimeout(
+            total=None, sock_connect=self.connect_timeout, sock_read=self.timeout
+        )
+
+        async with session.get(
+            self.base_url, params=params, timeout=stream_timeout
+        ) as response:
+            async for chunk in response.content.iter_chunked(chunk_bytes):
+                text = decoder.decode(chunk)
+                if body is not None:
+                    body = None if body else [text]
+                if text:
+                    yield text
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+        if body:
+            try:
+                self._check_throttled(json.loads(body[0] + tail))
+            except ValueError:
+                pass
+
+    async def close(self):
+        """Close the shared session and release pooled connections"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info("Closed Alpha Vantage session")
+        self._session = None
+
+
+# Global instance
+alpha_vantage_client = AlphaVantageClient(
+    base_url=settings.ALPHA_VANTAGE_BASE_URL,
+    rate_limiter=alpha_vantage_limiter,
+    pool_limit=settings.HTTP_POOL_LIMIT,
+    pool_limit_per_host=settings.HTTP_POOL_LIMIT_PER_HOST,
+    keepalive_seconds=settings.HTTP_KEEPALIVE_SECONDS,
+    connect_timeout=settings.HTTP_CONNECT_TIMEOUT_SECONDS,
+    timeout=settings.HTTP_TIMEOUT_SECONDS,
+)
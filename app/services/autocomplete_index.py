@@ -0,0 +1,145 @@
+import bisect
+import re
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Token entries walked per search, bounding queries whose later words rule
+# out most stocks matching the first
+SEARCH_CANDIDATES = 200
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split a query, symbol or name into lowercase word tokens"""
+    return WORD_PATTERN.findall(text.lower())
+
+
+class AutocompleteIndex:
+    """In-process prefix index over stock symbols and name tokens
+
+    Symbols bucketed by length and (token, symbol) entries bucketed by the
+    token's position in "<symbol> <name>" are kept in sorted lists, so a
+    prefix lookup is a bisect to the first key not below the prefix and a
+    walk while keys still start with it. Walking buckets in order yields
+    results already ranked like StockRepository.search_stocks: symbols
+    starting with the query first, the exact match leading, then token-prefix
+    matches, symbol tokens and earlier name words first.
+    """
+
+    def __init__(self):
+        self.names: Dict[str, str] = {}
+        self._tokens: Dict[int, List[Tuple[str, str]]] = {}
+        self._symbol_tokens: Dict[str, List[str]] = {}
+        self._symbols_by_length: Dict[int, List[str]] = {}
+        self.ready = False
+        # When the stocks table was last read into the index
+        self.synced_at: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @staticmethod
+    def _entries(symbol: str, name: str) -> List[Tuple[str, int, str]]:
+        """Get the token entries of a stock, each token at its first position"""
+        positions: Dict[str, int] = {}
+        for position, token in enumerate(tokenize(f"{symbol} {name}")):
+            positions.setdefault(token, position)
+        return [(token, position, symbol) for token, position in positions.items()]
+
+    def build(self, stocks: Iterable[Tuple[str, str]]):
+        """Replace the index contents with (symbol, name) pairs"""
+        self.names = dict(stocks)
+        entries = {
+            symbol: self._entries(symbol, name) for symbol, name in self.names.items()
+        }
+        self._tokens = {}
+        for items in entries.values():
+            for token, position, symbol in items:
+                self._tokens.setdefault(position, []).append((token, symbol))
+        for bucket in self._tokens.values():
+            bucket.sort()
+        self._symbol_tokens = {
+            symbol: [token for token, _, _ in items]
+            for symbol, items in entries.items()
+        }
+        self._symbols_by_length = {}
+        for symbol in sorted(self.names):
+            self._symbols_by_length.setdefault(len(symbol), []).append(symbol)
+        self.ready = True
+
+    def add(self, symbol: str, name: str):
+        """Add a stock, or update the name of one already indexed"""
+        if symbol in self.names:
+            if self.names[symbol] == name:
+                return
+            for token, position, _ in self._entries(symbol, self.names[symbol]):
+                bucket = self._tokens[position]
+                del bucket[bisect.bisect_left(bucket, (token, symbol))]
+        else:
+            bisect.insort(self._symbols_by_length.setdefault(len(symbol), []), symbol)
+
+        self.names[symbol] = name
+        entries = self._entries(symbol, name)
+        for token, position, _ in entries:
+            bisect.insort(self._tokens.setdefault(position, []), (token, symbol))
+        self._symbol_tokens[symbol] = [token for token, _, _ in entries]
+
+    def _search_symbols(self, prefix: str, limit: int) -> List[str]:
+        """Get symbols starting with a prefix, shortest first"""
+        found: List[str] = []
+        for length in sorted(self._symbols_by_length):
+            if length < len(prefix):
+                continue
+            symbols = self._symbols_by_length[length]
+            for i in range(bisect.bisect_left(symbols, prefix), len(symbols)):
+                if len(found) == limit or not symbols[i].startswith(prefix):
+                    break
+                found.append(symbols[i])
+        return found
+
+    def _search_tokens(self, words: List[str], limit: int) -> List[str]:
+        """Get symbols with a token starting with each word, best first"""
+        # Walk the most selective word's ranges; check the others per stock
+        first = max(words, key=len)
+        others = [word for word in words if word is not first]
+        found: Dict[str, None] = {}
+        walked = 0
+        for position in sorted(self._tokens):
+            bucket = self._tokens[position]
+            for i in range(bisect.bisect_left(bucket, (first,)), len(bucket)):
+                token, symbol = bucket[i]
+                if not token.startswith(first):
+                    break
+                if symbol not in found and (
+                    not others or self._matches_all(symbol, others)
+                ):
+                    found[symbol] = None
+                    if len(found) == limit:
+                        return list(found)
+                walked += 1
+                if walked == SEARCH_CANDIDATES:
+                    return list(found)
+        return list(found)
+
+    def _matches_all(self, symbol: str, words: List[str]) -> bool:
+        """Whether every word starts one of a stock's tokens"""
+        tokens = self._symbol_tokens[symbol]
+        return all(any(token.startswith(word) for token in tokens) for word in words)
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[str, str]]:
+        """Get the best matching (symbol, name) pairs for a query"""
+        words = tokenize(query)
+        if not words:
+            return []
+        by_symbol = self._search_symbols(query.strip().upper(), limit)
+        by_token = self._search_tokens(words, limit)
+
+        # Leave half the results to token matches unless they run short
+        leading = by_symbol[: max(limit // 2, limit - len(by_token))]
+        symbols = list(dict.fromkeys([*leading, *by_token, *by_symbol]))[:limit]
+        return [(symbol, self.names[symbol]) for symbol in symbols]
+
+
+# Global instance, built from the stocks table at startup
+autocomplete_index = AutocompleteIndex()
@@ -0,0 +1,86 @@
+import logging
+import zlib
+from typing import Union
+
+from app.core.config import settings
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Header: format version byte, then codec id byte, then the payload
+FORMAT_VERSION = 1
+CODEC_RAW = 0
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+
+CODEC_IDS = {"none": CODEC_RAW, "zlib": CODEC_ZLIB, "zstd": CODEC_ZSTD}
+
+
+class CacheCodec:
+    """Binary storage format for cache values
+
+    Values are compact UTF-8 JSON bodies, compressed with zlib or zstd once
+    they reach `min_bytes`, behind a two-byte header holding the format
+    version and codec id. Rows written before the format existed (plain JSON
+    text) decode transparently, since JSON never starts with the version byte.
+    """
+
+    def __init__(
+        self, compression: str = "zlib", min_bytes: int = 1024, level: int = 6
+    ):
+        if compression not in CODEC_IDS:
+            raise ValueError(f"Unknown cache compression: {compression}")
+        if compression == "zstd" and zstandard is None:
+            logger.warning("zstandard is not installed, compressing with zlib")
+            compression = "zlib"
+
+        self.codec = CODEC_IDS[compression]
+        self.min_bytes = min_bytes
+        self.level = level
+        if zstandard is not None:
+            self._zstd_compressor = zstandard.ZstdCompressor(level=level)
+            self._zstd_decompressor = zstandard.ZstdDecompressor()
+
+    def encode(self, body: bytes) -> bytes:
+        """Encode a JSON body for storage"""
+        codec = self.codec if len(body) >= self.min_bytes else CODEC_RAW
+        if codec == CODEC_ZLIB:
+            body = zlib.compress(body, self.level)
+        elif codec == CODEC_ZSTD:
+            body = self._zstd_compressor.compress(body)
+        return bytes((FORMAT_VERSION, codec)) + body
+
+    def decode(self, data: Union[bytes, str]) -> bytes:
+        """Decode a stored value back into its JSON body"""
+        if isinstance(data, str):
+            # Legacy JSON text row
+            return data.encode()
+        if not data or data[0] != FORMAT_VERSION:
+            return bytes(data)
+
+        codec, payload = data[1], memoryview(data)[2:]
+        if codec == CODEC_RAW:
+            return bytes(payload)
+        if codec == CODEC_ZLIB:
+            return zlib.decompress(payload)
+        if codec == CODEC_ZSTD:
+            if zstandard is None:
+                raise ValueError("zstd cache value but zstandard is not installed")
+            return self._zstd_decompressor.decompress(payload)
+        raise ValueError(f"Unknown cache codec id: {codec}")
+
+    @staticmethod
+    def is_current(data: Union[bytes, str]) -> bool:
+        """Check whether a stored value already uses this format"""
+        return isinstance(data, bytes) and data[:1] == bytes((FORMAT_VERSION,))
+
+
+# Global instance
+cache_codec = CacheCodec(
+    compression=settings.CACHE_COMPRESSION,
+    min_bytes=settings.CACHE_COMPRESS_MIN_BYTES,
+)
@@ -0,0 +1,49 @@
+from typing import Dict, List
+
+# Cache namespaces; keys look like "<namespace>:v<version>:<ident>"
+CACHE_NAMESPACES = ("data", "overview", "company_name", "search", "negative")
+
+
+def cache_namespace(key: str) -> str:
+    """Get the namespace of a cache key, or "other" for unstructured keys"""
+    namespace, sep, _ = key.partition(":")
+    return namespace if sep and namespace in CACHE_NAMESPACES else "other"
+
+
+def symbol_tag(symbol: str) -> str:
+    """Get the tag attached to every cache entry derived from a symbol"""
+    return f"symbol:{symbol}"
+
+
+def symbol_tags(symbols: List[str]) -> List[str]:
+    """Get the symbol tags for several symbols, without duplicates"""
+    return [symbol_tag(symbol) for symbol in dict.fromkeys(symbols)]
+
+
+class CacheKeyspace:
+    """Builds versioned cache keys
+
+    Bumping a namespace's version changes every key built for it, so all of
+    its existing entries become unreachable at once and are purged later.
+    Versions are persisted in the cache_namespaces table and loaded at
+    startup.
+    """
+
+    def __init__(self):
+        self.versions: Dict[str, int] = {}
+
+    def version(self, namespace: str) -> int:
+        """Get the current version of a namespace"""
+        return self.versions.get(namespace, 1)
+
+    def prefix(self, namespace: str) -> str:
+        """Get the prefix shared by the current keys of a namespace"""
+        return f"{namespace}:v{self.version(namespace)}:"
+
+    def key(self, namespace: str, ident: str) -> str:
+        """Build the current cache key for an identifier in a namespace"""
+        return f"{self.prefix(namespace)}{ident}"
+
+
+# Global instance
+cache_keys = CacheKeyspace()
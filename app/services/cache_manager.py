@@ -0,0 +1,123 @@
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.services.cache_keys import cache_namespace
+from app.services.db_service import CacheRepository
+
+logger = logging.getLogger(__name__)
+
+
+class CacheManager:
+    """Keeps the api_cache table within its row and byte budgets
+
+    Reads are recorded in memory (hits, misses and last access per key) and
+    written back in one statement when the budget is enforced, so tracking
+    recency does not turn every cache hit into a database write. Enforcement
+    evicts the least recently used rows, first per namespace quota, then for
+    the whole table.
+    """
+
+    def __init__(
+        self,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        namespace_max_rows: Optional[Dict[str, int]] = None,
+    ):
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.namespace_max_rows = namespace_max_rows or {}
+        self.namespaces: Dict[str, Dict[str, int]] = {}
+        self.usage: Dict[str, Dict[str, int]] = {}
+        self.last_enforced_at: Optional[datetime] = None
+        self._accessed: Dict[str, datetime] = {}
+        self._backfilled = False
+
+    def _counters(self, namespace: str) -> Dict[str, int]:
+        counters = self.namespaces.get(namespace)
+        if counters is None:
+            counters = self.namespaces[namespace] = {
+                "hits": 0,
+                "misses": 0,
+                "evictions": 0,
+            }
+        return counters
+
+    def record_hit(self, key: str):
+        """Count a hit and remember when the key was last used"""
+        self._counters(cache_namespace(key))["hits"] += 1
+        self._accessed[key] = datetime.now()
+
+    def record_miss(self, key: str):
+        """Count a miss"""
+        self._counters(cache_namespace(key))["misses"] += 1
+
+    async def enforce(self, db: AsyncSession) -> List[str]:
+        """Evict least recently used rows beyond the budgets, returning their keys
+
+        Use TieredCache.enforce_budget(), which also drops the evicted keys
+        from the memory tier.
+        """
+        if not self._backfilled:
+            await CacheRepository.backfill_cache_metadata(db)
+            self._backfilled = True
+
+        # Flush recorded access times so recency reflects memory-tier hits too
+        accessed, self._accessed = self._accessed, {}
+        await CacheRepository.touch_cache_entries(db, accessed)
+
+        evicted_keys: List[str] = []
+        budgets = [
+            (namespace, max_rows, None)
+            for namespace, max_rows in self.namespace_max_rows.items()
+        ]
+        if self.max_rows is not None or self.max_bytes is not None:
+            budgets.append((None, self.max_rows, self.max_bytes))
+
+        for namespace, max_rows, max_bytes in budgets:
+            evicted = await CacheRepository.evict_lru(
+                db, namespace=namespace, max_rows=max_rows, max_bytes=max_bytes
+            )
+            for key in evicted:
+                self._counters(cache_namespace(key))["evictions"] += 1
+            evicted_keys.extend(evicted)
+
+        self.usage = await CacheRepository.get_cache_usage(db)
+        self.last_enforced_at = datetime.now()
+        if evicted_keys:
+            logger.info(f"Evicted {len(evicted_keys)} cache entries over budget")
+        return evicted_keys
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit ratio, size and eviction counters for each namespace"""
+        namespaces = {}
+        for name in sorted(set(self.namespaces) | set(self.usage)):
+            counters = self._counters(name)
+            lookups = counters["hits"] + counters["misses"]
+            usage = self.usage.get(name, {"rows": 0, "bytes": 0})
+            namespaces[name] = {
+                **counters,
+                "hit_ratio": counters["hits"] / lookups if lookups else None,
+                "rows": usage["rows"],
+                "bytes": usage["bytes"],
+                "max_rows": self.namespace_max_rows.get(name),
+            }
+        return {
+            "max_rows": self.max_rows,
+            "max_bytes": self.max_bytes,
+            "last_enforced_at": (
+                self.last_enforced_at.isoformat() if self.last_enforced_at else None
+            ),
+            "namespaces": namespaces,
+        }
+
+
+# Global instance
+cache_manager = CacheManager(
+    max_rows=settings.CACHE_MAX_ROWS,
+    max_bytes=settings.CACHE_MAX_BYTES,
+    namespace_max_rows=settings.CACHE_NAMESPACE_MAX_ROWS,
+)
@@ -0,0 +1,483 @@
+import asyncio
+import json
+import logging
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.services.cache_keys import CACHE_NAMESPACES, cache_keys
+from app.services.cache_manager import CacheManager, cache_manager
+from app.services.db_service import CacheRepository
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCache:
+    """Bounded in-process LRU cache with the same TTLs as the database cache
+
+    Entries hold values together with their stale_at and expires_at
+    times and an approximate size. The least recently used entries are
+    evicted once either the entry count or the byte budget is exceeded.
+
+    TieredCache sizes entries by their encoded JSON body only, so the byte
+    budget is approximate: decoded values kept alongside the bodies are not
+    counted and typically take a few times the body size in Python objects.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # key -> (value, size, stale_at, expires_at), least recently used first
+        self._entries: OrderedDict = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Tuple[Any, bool]]:
+        """Get a value by key if not expired, with whether it is stale"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, _, stale_at, expires_at = entry
+        now = datetime.now()
+        if expires_at <= now:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value, stale_at is not None and stale_at <= now
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        size: int,
+        stale_at: Optional[datetime],
+        expires_at: datetime,
+    ):
+        """Store a value, evicting least recently used entries to make room"""
+        self._remove(key)
+        if size > self.max_bytes:
+            return
+
+        self._entries[key] = (value, size, stale_at, expires_at)
+        self.bytes += size
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate(self, key: str) -> bool:
+        """Drop a key if present, returning whether it was"""
+        return self._remove(key)
+
+    def invalidate_prefix(self, prefix: str) -> int:
+        """Drop every key starting with `prefix` and return how many were dropped"""
+        keys = [key for key in self._entries if key.startswith(prefix)]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def clear_expired(self) -> int:
+        """Drop all expired entries and return how many were dropped"""
+        now = datetime.now()
+        expired = [key for key, entry in self._entries.items() if entry[3] <= now]
+        for key in expired:
+            self._remove(key)
+        self.expirations += len(expired)
+        return len(expired)
+
+    def clear(self):
+        """Drop every entry"""
+        self._entries.clear()
+        self.bytes = 0
+
+    def _remove(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self.bytes -= entry[1]
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Get counters for the memory tier"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+        }
+
+
+class CachedValue:
+    """Memory tier entry: the encoded JSON body and its decoded value"""
+
+    __slots__ = ("body", "value")
+
+    def __init__(self, body: bytes, value: Any = None):
+        self.body = body
+        # Decoded on first use when the entry was promoted from the database
+        self.value = value
+
+
+class CacheWriteBatch:
+    """Database cache writes deferred by TieredCache.batch()"""
+
+    def __init__(self, db: AsyncSession, max_pending: int):
+        self.db = db
+        self.max_pending = max_pending
+        # Only writes from the task that opened the batch are deferred
+        self.owner = asyncio.current_task()
+        # key -> (body, expire_seconds, stale_seconds, tags), last write wins
+        self.pending: Dict[
+            str, Tuple[bytes, int, Optional[int], Optional[List[str]]]
+        ] = {}
+
+
+_write_batch: ContextVar[Optional[CacheWriteBatch]] = ContextVar(
+    "cache_write_batch", default=None
+)
+
+
+class TieredCache:
+    """Memory tier (L1) in front of the api_cache table (L2)
+
+    Reads try memory first and fall back to the database, promoting what they
+    find. Memory keeps both the JSON body, which can be sent as a response
+    as-is, and the decoded object. Writes go to the database and then to
+    memory. Values held in memory are shared between callers and must not be
+    mutated.
+    """
+
+    def __init__(self, memory: MemoryCache, manager: Optional[CacheManager] = None):
+        self.memory = memory
+        self.manager = manager
+        self.db_hits = 0
+        self.db_misses = 0
+        self.db_writes = 0
+        self.db_commits = 0
+        # Id of the newest logged invalidation applied to the memory tier
+        self.invalidation_cursor: Optional[int] = None
+
+    async def get(
+        self, db: AsyncSession, key: str, decode: Callable[[bytes], Any]
+    ) -> Optional[Tuple[Any, bool]]:
+        """Get a value by key if not expired, with whether it is stale
+
+        `decode` turns the stored JSON body into the value to return.
+        """
+        cached = await self._get_entry(db, key)
+        if cached is None:
+            return None
+
+        entry, stale = cached
+        if entry.value is None:
+            entry.value = decode(entry.body)
+        return entry.value, stale
+
+    async def get_raw(
+        self, db: AsyncSession, key: str
+    ) -> Optional[Tuple[bytes, bool]]:
+        """Get the encoded JSON body for a key without decoding it"""
+        cached = await self._get_entry(db, key)
+        if cached is None:
+            return None
+
+        entry, stale = cached
+        return entry.body, stale
+
+    async def _get_entry(
+        self, db: AsyncSession, key: str
+    ) -> Optional[Tuple["CachedValue", bool]]:
+        cached = self.memory.get(key)
+        if cached is not None:
+            if self.manager:
+                self.manager.record_hit(key)
+            return cached
+
+        row = await CacheRepository.get_cached_entry(db, key)
+        if row is None:
+            self.db_misses += 1
+            if self.manager:
+                self.manager.record_miss(key)
+            return None
+        self.db_hits += 1
+        if self.manager:
+            self.manager.record_hit(key)
+
+        body, stale_at, expires_at = row
+        entry = CachedValue(body)
+        self.memory.set(key, entry, len(entry.body), stale_at, expires_at)
+        return entry, stale_at is not None and stale_at <= datetime.now()
+
+    async def set(
+        self,
+        db: AsyncSession,
+        key: str,
+        value: Any,
+        data: Any,
+        expire_seconds: int = 3600,
+        stale_seconds: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+    ) -> bool:
+        """Cache `value` in memory and its JSON-ready form `data` in the database
+
+        `tags` (see cache_keys.symbol_tag) let invalidate_tags() drop the
+        entry together with others derived from the same symbol.
+        """
+        return await self.set_many(
+            db,
+            [(key, value, data)],
+            expire_seconds,
+            stale_seconds,
+            tags={key: tags} if tags is not None else None,
+        )
+
+    async def set_many(
+        self,
+        db: AsyncSession,
+        entries: List[Tuple[str, Any, Any]],
+        expire_seconds: int = 3600,
+        stale_seconds: Optional[int] = None,
+        tags: Optional[Dict[str, List[str]]] = None,
+    ) -> bool:
+        """Cache several (key, value, data) entries with the same TTLs
+
+        The database rows are written in one statement and transaction, or
+        deferred to the enclosing batch() of the current task. `tags` maps
+        keys to their tags.
+        """
+        tags = tags or {}
+        # Compact JSON doubles as a ready-made response body
+        encoded = [
+            (key, value, json.dumps(data, separators=(",", ":")).encode())
+            for key, value, data in entries
+        ]
+
+        batch = _write_batch.get()
+        if batch is not None and batch.owner is asyncio.current_task():
+            for key, _, body in encoded:
+                batch.pending[key] = (
+                    body,
+                    expire_seconds,
+                    stale_seconds,
+                    tags.get(key),
+                )
+            ok = True
+        else:
+            ok = await CacheRepository.set_many_cached_bodies(
+                db,
+                [(key, body) for key, _, body in encoded],
+                expire_seconds,
+                stale_seconds,
+                tags=tags,
+            )
+            self.db_writes += len(encoded)
+            self.db_commits += 1
+
+        if not ok:
+            # Keep the tiers consistent if the database write failed
+            for key, _, _ in encoded:
+                self.memory.invalidate(key)
+            return False
+
+        now = datetime.now()
+        expires_at = now + timedelta(seconds=expire_seconds)
+        stale_at = (
+            now + timedelta(seconds=stale_seconds)
+            if stale_seconds is not None
+            else None
+        )
+        for key, value, body in encoded:
+            entry = CachedValue(body, value)
+            self.memory.set(key, entry, len(body), stale_at, expires_at)
+
+        if batch is not None and len(batch.pending) >= batch.max_pending:
+            await self._flush(batch)
+        return True
+
+    @asynccontextmanager
+    async def batch(self, db: AsyncSession, max_pending: int = 100):
+        """Defer this task's database cache writes and flush them together
+
+        Memory is updated immediately. Pending rows are upserted in a single
+        transaction whenever `max_pending` accumulate and on exit.
+        """
+        batch = CacheWriteBatch(db, max_pending)
+        token = _write_batch.set(batch)
+        try:
+            yield batch
+        finally:
+            _write_batch.reset(token)
+            await self._flush(batch)
+
+    async def _flush(self, batch: "CacheWriteBatch"):
+        """Write a batch's pending rows, one statement per TTL pair"""
+        if not batch.pending:
+            return
+        pending, batch.pending = batch.pending, {}
+
+        groups: Dict[Tuple[int, Optional[int]], List[Tuple[str, bytes]]] = {}
+        tags: Dict[str, List[str]] = {}
+        for key, (body, expire_seconds, stale_seconds, key_tags) in pending.items():
+            groups.setdefault((expire_seconds, stale_seconds), []).append((key, body))
+            if key_tags is not None:
+                tags[key] = key_tags
+
+        ok = True
+        for i, ((expire_seconds, stale_seconds), rows) in enumerate(groups.items()):
+            ok = await CacheRepository.set_many_cached_bodies(
+                batch.db,
+                rows,
+                expire_seconds,
+                stale_seconds,
+                commit=i == len(groups) - 1,
+                tags={key: tags[key] for key, _ in rows if key in tags},
+            )
+            if not ok:
+                break
+        self.db_writes += len(pending)
+        self.db_commits += 1
+
+        if not ok:
+            for key in pending:
+                self.memory.invalidate(key)
+
+    async def invalidate(self, db: AsyncSession, key: str) -> bool:
+        """Drop a key from both tiers"""
+        self.memory.invalidate(key)
+        return await CacheRepository.invalidate_cache(db, key)
+
+    async def invalidate_tags(
+        self,
+        db: AsyncSession,
+        tags: List[str],
+        keep: Tuple[str, ...] = (),
+        broadcast: bool = False,
+    ) -> int:
+        """Drop every entry carrying one of the tags from both tiers
+
+        Keys listed in `keep` survive, so a refresh can drop everything
+        derived from a symbol except the entry it just rewrote. With
+        `broadcast`, the dropped keys are logged so that running servers drop
+        them from their memory tiers on their next sync(). Returns the number
+        of dropped database rows.
+        """
+        batch = _write_batch.get()
+        if batch is not None and batch.owner is asyncio.current_task():
+            # Flush first so tags of deferred rows are visible
+            await self._flush(batch)
+        keys = await CacheRepository.invalidate_tags(db, tags, keep)
+        for key in keys:
+            self.memory.invalidate(key)
+        if broadcast:
+            await CacheRepository.record_invalidations(db, keys)
+        return len(keys)
+
+    async def bump_namespace(self, db: AsyncSession, namespace: str) -> int:
+        """Move a namespace to a new key version, orphaning all its entries
+
+        Returns the new version. Orphaned rows are deleted by
+        purge_unreachable().
+        """
+        old_prefix = cache_keys.prefix(namespace)
+        version = await CacheRepository.bump_namespace_version(db, namespace)
+        if version is None:
+            return cache_keys.version(namespace)
+        cache_keys.versions[namespace] = version
+        self.memory.invalidate_prefix(old_prefix)
+        logger.info(f"Cache namespace {namespace} bumped to v{version}")
+        return version
+
+    async def load_namespace_versions(self, db: AsyncSession):
+        """Load the persisted namespace versions into the key builder
+
+        Invalidations logged so far are skipped, since memory starts empty.
+        """
+        cache_keys.versions.update(await CacheRepository.get_namespace_versions(db))
+        self.invalidation_cursor = await CacheRepository.get_last_invalidation_id(db)
+
+    async def sync(self, db: AsyncSession) -> int:
+        """Apply namespace bumps and invalidations made by other processes
+
+        Namespaces whose stored version moved on get the new version and lose
+        their memory entries; logged invalidations are dropped from memory.
+        Returns the number of memory entries dropped.
+        """
+        dropped = 0
+        versions = await CacheRepository.get_namespace_versions(db)
+        for namespace, version in versions.items():
+            if version != cache_keys.version(namespace):
+                old_prefix = cache_keys.prefix(namespace)
+                cache_keys.versions[namespace] = version
+                dropped += self.memory.invalidate_prefix(old_prefix)
+                logger.info(f"Cache namespace {namespace} moved to v{version}")
+
+        if self.invalidation_cursor is None:
+            self.invalidation_cursor = (
+                await CacheRepository.get_last_invalidation_id(db)
+            )
+            return dropped
+        for row_id, key in await CacheRepository.get_invalidations(
+            db, self.invalidation_cursor
+        ):
+            dropped += self.memory.invalidate(key)
+            self.invalidation_cursor = row_id
+        return dropped
+
+    async def enforce_budget(self, db: AsyncSession) -> int:
+        """Evict least recently used rows beyond the cache budget from both tiers
+
+        Returns the number of evicted rows.
+        """
+        if self.manager is None:
+            return 0
+        keys = await self.manager.enforce(db)
+        for key in keys:
+            self.memory.invalidate(key)
+        return len(keys)
+
+    async def purge_unreachable(self, db: AsyncSession) -> int:
+        """Delete rows left behind by namespace bumps and legacy key formats"""
+        prefixes = {
+            namespace: cache_keys.prefix(namespace) for namespace in CACHE_NAMESPACES
+        }
+        return await CacheRepository.purge_unreachable(db, prefixes)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get counters for each tier"""
+        return {
+            "memory": self.memory.stats(),
+            "database": {
+                "hits": self.db_hits,
+                "misses": self.db_misses,
+                "writes": self.db_writes,
+                "commits": self.db_commits,
+            },
+        }
+
+
+# Global instance
+tiered_cache = TieredCache(
+    MemoryCache(
+        max_entries=settings.MEMORY_CACHE_MAX_ENTRIES,
+        max_bytes=settings.MEMORY_CACHE_MAX_BYTES,
+    ),
+    cache_manager,
+)
@@ -0,0 +1,181 @@
+import json
+import logging
+from typing import Any, Dict, Iterator, List, Tuple
+
+from app.models.stock import PriceSeries
+
+logger = logging.getLogger(__name__)
+
+SERIES_KEY = "Time Series (Daily)"
+WHITESPACE = " \t\r\n"
+
+
+class DailySeriesStreamParser:
+    """Incremental parser for TIME_SERIES_DAILY payloads
+
+    Text is fed in arbitrary pieces as it arrives. Bars of the
+    "Time Series (Daily)" object are emitted as PriceSeries chunks of
+    `chunk_size` as soon as they are complete, so memory stays bounded by the
+    chunk size instead of the payload size. Every other top-level key (Meta
+    Data, Error Message, Information) is decoded whole into `header`.
+    """
+
+    # Parser states
+    START = "start"
+    KEY = "key"
+    COLON = "colon"
+    VALUE = "value"
+    AFTER_VALUE = "after_value"
+    SERIES_KEY = "series_key"
+    SERIES_COLON = "series_colon"
+    SERIES_VALUE = "series_value"
+    SERIES_AFTER_VALUE = "series_after_value"
+    DONE = "done"
+
+    def __init__(self, chunk_size: int = 500):
+        self.chunk_size = chunk_size
+        self.header: Dict[str, Any] = {}
+        self.has_series = False
+        self.bar_count = 0
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._state = self.START
+        self._key = None
+        self._bars: List[Tuple[str, float, float, float, float, int]] = []
+
+    def feed(self, text: str) -> Iterator[PriceSeries]:
+        """Consume more payload text and yield every completed chunk of bars"""
+        # Drop consumed text so the buffer only holds the unparsed tail
+        self._buffer = self._buffer[self._pos :] + text
+        self._pos = 0
+
+        while self._step():
+            if len(self._bars) >= self.chunk_size:
+                yield self._flush()
+
+    def close(self) -> Iterator[PriceSeries]:
+        """Finish parsing and yield the last partial chunk"""
+        if self._state != self.DONE:
+            raise ValueError(f"Truncated TIME_SERIES_DAILY payload ({self._state})")
+        if self._bars:
+            yield self._flush()
+
+    def _flush(self) -> PriceSeries:
+        bars, self._bars = self._bars, []
+        return PriceSeries.from_records(bars)
+
+    def _skip_whitespace(self) -> bool:
+        """Advance past whitespace, returning False if the buffer ran out"""
+        while self._pos < len(self._buffer) and self._buffer[self._pos] in WHITESPACE:
+            self._pos += 1
+        return self._pos < len(self._buffer)
+
+    def _expect(self, char: str) -> bool:
+        if self._buffer[self._pos] != char:
+            raise ValueError(
+                f"Expected {char!r} at offset {self._pos}, "
+                f"got {self._buffer[self._pos]!r}"
+            )
+        self._pos += 1
+        return True
+
+    def _decode_value(self):
+        """Decode one complete JSON value, or return (None, False) if incomplete
+
+        A value is only accepted once the next delimiter has arrived, so
+        numbers and literals split across pieces are never cut short.
+        """
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            return None, False
+
+        lookahead = end
+        while lookahead < len(self._buffer) and self._buffer[lookahead] in WHITESPACE:
+            lookahead += 1
+        if lookahead >= len(self._buffer):
+            return None, False
+
+        self._pos = end
+        return value, True
+
+    def _step(self) -> bool:
+        """Advance the state machine by one token, returning False when starved"""
+        if self._state == self.DONE or not self._skip_whitespace():
+            return False
+
+        char = self._buffer[self._pos]
+        state = self._state
+
+        if state == self.START:
+            self._state = self.KEY
+            return self._expect("{")
+
+        if state in (self.KEY, self.SERIES_KEY):
+            if char == "}":
+                self._pos += 1
+                self._state = (
+                    self.AFTER_VALUE if state == self.SERIES_KEY else self.DONE
+                )
+                return True
+            key, ok = self._decode_value()
+            if not ok:
+                return False
+            self._key = key
+            self._state = self.COLON if state == self.KEY else self.SERIES_COLON
+            return True
+
+        if state in (self.COLON, self.SERIES_COLON):
+            self._state = self.VALUE if state == self.COLON else self.SERIES_VALUE
+            return self._expect(":")
+
+        if state == self.VALUE:
+            if self._key == SERIES_KEY:
+                self.has_series = True
+                self._state = self.SERIES_KEY
+                return self._expect("{")
+            value, ok = self._decode_value()
+            if not ok:
+                return False
+            self.header[self._key] = value
+            self._state = self.AFTER_VALUE
+            return True
+
+        if state == self.SERIES_VALUE:
+            value, ok = self._decode_value()
+            if not ok:
+                return False
+            self._add_bar(self._key, value)
+            self._state = self.SERIES_AFTER_VALUE
+            return True
+
+        if state in (self.AFTER_VALUE, self.SERIES_AFTER_VALUE):
+            inner = state == self.SERIES_AFTER_VALUE
+            if char == ",":
+                self._pos += 1
+                self._state = self.SERIES_KEY if inner else self.KEY
+                return True
+            if char == "}":
+                self._pos += 1
+                self._state = self.AFTER_VALUE if inner else self.DONE
+                return True
+            raise ValueError(f"Unexpected {char!r} at offset {self._pos}")
+
+        return False
+
+    def _add_bar(self, date_str: str, daily_data: Dict[str, str]):
+        try:
+            self._bars.append(
+                (
+                    date_str,
+                    float(daily_data["1. open"]),
+                    float(daily_data["2. high"]),
+                    float(daily_data["3. low"]),
+                    float(daily_data["4. close"]),
+                    int(daily_data["5. volume"]),
+                )
+            )
+            self.bar_count += 1
+        except (ValueError, KeyError) as e:
+            logger.warning(f"Error processing data point for {date_str}: {e}")
@@ -1,18 +1,99 @@
 import json
 import logging
+import re
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 
-from sqlalchemy import delete, func, select, update
+from sqlalchemy import (
+    bindparam,
+    column,
+    delete,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    table,
+    text,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import APICache, Stock, StockPrice
-from app.models.stock import StockData, StockOverview
+from app.core.database import (
+    APICache,
+    APICacheTag,
+    CacheInvalidation,
+    CacheNamespace,
+    Stock,
+    StockPrice,
+    SymbolRequest,
+    stock_search,
+    write_intent,
+)
+from app.models.stock import PriceSeries, StockData, StockOverview
 from app.models.stock import StockPrice as StockPriceModel
+from app.services.autocomplete_index import autocomplete_index
+from app.services.cache_codec import cache_codec
+from app.services.cache_keys import cache_namespace
 
 logger = logging.getLogger(__name__)
 
+# Rows per statement when deleting by key, below SQLite's variable limit
+DELETE_CHUNK_ROWS = 500
+
+# Keys per IN list when selecting by key, below SQLite's variable limit
+SELECT_CHUNK_ROWS = 500
+
+# Bars per upsert statement when saving prices
+PRICE_UPSERT_CHUNK_ROWS = 1000
+
+# Bars from which PostgreSQL saves go through COPY instead of upsert chunks
+PRICE_COPY_MIN_ROWS = 2000
+
+# Per-connection staging table for COPY price ingest on PostgreSQL
+PRICE_STAGE_TABLE = "stock_prices_stage"
+price_stage = table(
+    PRICE_STAGE_TABLE, column("date"), *(column(name) for name in PriceSeries.COLUMNS)
+)
+
+
+# Token matches ranked per stock search; BM25 costs time per scored row, so
+# short prefixes matching much of the listing only rank the first ones
+SEARCH_CANDIDATES = 200
+
+# Token-prefix stock search through the FTS5 index, ranked by BM25 with
+# symbol matches weighted above name matches
+STOCK_SEARCH_QUERY = text(
+    "SELECT stocks.* FROM ("
+    "SELECT rowid, bm25(stocks_fts, 10.0, 1.0) AS score FROM stocks_fts "
+    "WHERE stocks_fts MATCH :match LIMIT :candidates"
+    ") AS hits JOIN stocks ON stocks.id = hits.rowid "
+    "ORDER BY hits.score, stocks.symbol LIMIT :limit"
+)
+
+
+def _search_match(query: str) -> Optional[str]:
+    """Build an FTS5 query matching every word of `query` as a token prefix"""
+    words = re.findall(r"\w+", query.lower())
+    if not words:
+        return None
+    # Quoted, so words are never read as FTS5 operators
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def _prefix_end(prefix: str) -> str:
+    """Get the smallest string greater than every string starting with prefix"""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def _insert(db: AsyncSession, model):
+    """Create an INSERT supporting ON CONFLICT for the session's database"""
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
 
 class StockRepository:
     """Repository for database operations related to stocks"""
@@ -33,10 +114,11 @@ class StockRepository:
     ) -> Optional[Stock]:
         """Save or update stock information"""
         try:
-            # Check if stock already exists
-            existing_stock = await StockRepository.get_stock_by_symbol(
-                db, stock_data.symbol
+            # Check if stock already exists, on the writer since it is updated
+            result = await db.execute(
+                write_intent(select(Stock).where(Stock.symbol == stock_data.symbol))
             )
+            existing_stock = result.scalars().first()
 
             if existing_stock:
                 # Update existing stock
@@ -47,8 +129,10 @@ class StockRepository:
                 existing_stock.pe_ratio = stock_data.pe_ratio
                 existing_stock.dividend_yield = stock_data.dividend_yield
                 existing_stock.last_updated = datetime.now()
+                await StockRepository._index_stock(db, existing_stock)
 
                 await db.commit()
+                autocomplete_index.add(existing_stock.symbol, existing_stock.name)
                 return existing_stock
             else:
                 # Create new stock
@@ -63,59 +147,195 @@ class StockRepository:
                 )
 
                 db.add(new_stock)
+                await db.flush()
+                await StockRepository._index_stock(db, new_stock)
                 await db.commit()
                 await db.refresh(new_stock)
+                autocomplete_index.add(new_stock.symbol, new_stock.name)
                 return new_stock
         except SQLAlchemyError as e:
             await db.rollback()
             logger.error(f"Database error when saving stock {stock_data.symbol}: {e}")
             return None
 
+    @staticmethod
+    async def _index_stock(db: AsyncSession, stock: Stock):
+        """Write a stock's row in the search index, without committing"""
+        if db.get_bind().dialect.name != "sqlite":
+            return
+        await db.execute(delete(stock_search).where(stock_search.c.rowid == stock.id))
+        await db.execute(
+            insert(stock_search).values(
+                rowid=stock.id, symbol=stock.symbol, name=stock.name
+            )
+        )
+
     @staticmethod
     async def save_stock_prices(
-        db: AsyncSession, stock_id: int, prices: List[StockPriceModel]
-    ) -> bool:
-        """Save stock prices to the database"""
+        db: AsyncSession,
+        stock_id: int,
+        prices: Union[PriceSeries, List[StockPriceModel]],
+        chunk_rows: int = PRICE_UPSERT_CHUNK_ROWS,
+    ) -> Optional[Tuple[int, int]]:
+        """Upsert stock prices with INSERT ... ON CONFLICT(stock_id, date) DO UPDATE
+
+        Bars are written in chunks of `chunk_rows` within one transaction.
+        Returns (inserted, updated) counts, or None if the write failed.
+        """
+        if not isinstance(prices, PriceSeries):
+            prices = PriceSeries.from_rows(prices)
+        if len(prices) == 0:
+            return 0, 0
+        if (
+            len(prices) >= PRICE_COPY_MIN_ROWS
+            and db.get_bind().dialect.name == "postgresql"
+        ):
+            return await StockRepository._copy_stock_prices(db, stock_id, prices)
+
+        stmt = _insert(db, StockPrice)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[StockPrice.stock_id, StockPrice.date],
+            set_={
+                column: getattr(stmt.excluded, column)
+                for column in PriceSeries.COLUMNS
+            },
+        ).returning(StockPrice.created_at)
+
+        inserted = 0
         try:
-            # Create database models from API models
-            db_prices = []
-            for price in prices:
-                # Check if price already exists
+            for start in range(0, len(prices), chunk_rows):
+                chunk = prices[start : start + chunk_rows]
+                created_at = datetime.now()
+                columns = [getattr(chunk, column).tolist() for column in chunk.COLUMNS]
                 result = await db.execute(
-                    select(StockPrice).where(
-                        StockPrice.stock_id == stock_id, StockPrice.date == price.date
-                    )
+                    stmt,
+                    [
+                        {
+                            "stock_id": stock_id,
+                            "date": date,
+                            "open": open_,
+                            "high": high,
+                            "low": low,
+                            "close": close,
+                            "volume": volume,
+                            "created_at": created_at,
+                        }
+                        for date, open_, high, low, close, volume in zip(
+                            chunk.dates.tolist(), *columns
+                        )
+                    ],
+                )
+                # Updated rows keep their original created_at
+                inserted += sum(
+                    1 for value in result.scalars() if value == created_at
                 )
-                existing_price = result.scalars().first()
-
-                if existing_price:
-                    # Update existing price
-                    existing_price.open = price.open
-                    existing_price.high = price.high
-                    existing_price.low = price.low
-                    existing_price.close = price.close
-                    existing_price.volume = price.volume
-                else:
-                    # Create new price
-                    db_price = StockPrice(
-                        stock_id=stock_id,
-                        date=price.date,
-                        open=price.open,
-                        high=price.high,
-                        low=price.low,
-                        close=price.close,
-                        volume=price.volume,
-                    )
-                    db.add(db_price)
 
             await db.commit()
-            return True
+            return inserted, len(prices) - inserted
         except SQLAlchemyError as e:
             await db.rollback()
             logger.error(
                 f"Database error when saving prices for stock ID {stock_id}: {e}"
             )
-            return False
+            return None
+
+    @staticmethod
+    async def _copy_stock_prices(
+        db: AsyncSession, stock_id: int, prices: PriceSeries
+    ) -> Optional[Tuple[int, int]]:
+        """Upsert stock prices on PostgreSQL through COPY into a staging table
+
+        The bars are copied into a temporary table that is emptied on commit,
+        then merged with one INSERT ... SELECT ... ON CONFLICT statement.
+        """
+        columns = ["date", *PriceSeries.COLUMNS]
+        created_at = datetime.now()
+        stmt = postgresql.insert(StockPrice).from_select(
+            ["stock_id", *columns, "created_at"],
+            select(
+                literal(stock_id),
+                *(price_stage.c[name] for name in columns),
+                literal(created_at, StockPrice.created_at.type),
+            ),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[StockPrice.stock_id, StockPrice.date],
+            set_={
+                column: getattr(stmt.excluded, column)
+                for column in PriceSeries.COLUMNS
+            },
+        ).returning(StockPrice.created_at)
+
+        try:
+            connection = await db.connection()
+            # Creating the table first starts the transaction the COPY joins
+            await connection.exec_driver_sql(
+                f"CREATE TEMPORARY TABLE IF NOT EXISTS {PRICE_STAGE_TABLE} "
+                "(date timestamp, open float8, high float8, low float8, "
+                "close float8, volume bigint) ON COMMIT DELETE ROWS"
+            )
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table(
+                PRICE_STAGE_TABLE,
+                records=zip(
+                    prices.dates.tolist(),
+                    *(getattr(prices, name).tolist() for name in PriceSeries.COLUMNS),
+                ),
+                columns=columns,
+            )
+            result = await db.execute(stmt)
+            # Updated rows keep their original created_at
+            inserted = sum(1 for value in result.scalars() if value == created_at)
+
+            await db.commit()
+            return inserted, len(prices) - inserted
+        except Exception as e:  # The driver's COPY errors are not wrapped
+            await db.rollback()
+            logger.error(
+                f"Database error when copying prices for stock ID {stock_id}: {e}"
+            )
+            return None
+
+    @staticmethod
+    async def get_latest_price_date(
+        db: AsyncSession, stock_id: int
+    ) -> Optional[datetime]:
+        """Get the date of the newest stored price for a stock"""
+        try:
+            result = await db.execute(
+                select(func.max(StockPrice.date)).where(
+                    StockPrice.stock_id == stock_id
+                )
+            )
+            return result.scalar()
+        except SQLAlchemyError as e:
+            logger.error(
+                f"Database error when fetching latest price date for stock ID {stock_id}: {e}"
+            )
+            return None
+
+    @staticmethod
+    async def get_latest_price_dates(
+        db: AsyncSession, symbols: List[str]
+    ) -> Dict[str, datetime]:
+        """Get the date of the newest stored price for each of the given symbols
+
+        Symbols are looked up in chunks to stay within the bound parameter limit.
+        """
+        try:
+            latest_dates = {}
+            for i in range(0, len(symbols), SELECT_CHUNK_ROWS):
+                result = await db.execute(
+                    select(Stock.symbol, func.max(StockPrice.date))
+                    .join(StockPrice, StockPrice.stock_id == Stock.id)
+                    .where(Stock.symbol.in_(symbols[i : i + SELECT_CHUNK_ROWS]))
+                    .group_by(Stock.symbol)
+                )
+                latest_dates.update(result.all())
+            return latest_dates
+        except SQLAlchemyError as e:
+            logger.error(f"Database error when fetching latest price dates: {e}")
+            return {}
 
     @staticmethod
     async def get_stock_prices(
@@ -142,6 +362,75 @@ class StockRepository:
             )
             return []
 
+    @staticmethod
+    async def get_price_series(
+        db: AsyncSession,
+        stock_id: int,
+        days: int = None,
+        before: Optional[datetime] = None,
+    ) -> PriceSeries:
+        """Get stock prices as a columnar series, newest first
+
+        Selects the price columns only, so no ORM objects are materialized.
+        With `before`, only bars dated earlier than it are returned.
+        """
+        try:
+            query = (
+                select(
+                    StockPrice.date,
+                    StockPrice.open,
+                    StockPrice.high,
+                    StockPrice.low,
+                    StockPrice.close,
+                    StockPrice.volume,
+                )
+                .where(StockPrice.stock_id == stock_id)
+                .order_by(StockPrice.date.desc())
+            )
+
+            if days:
+                # Limit by days
+                date_limit = datetime.now() - timedelta(days=days)
+                query = query.where(StockPrice.date >= date_limit)
+            if before is not None:
+                query = query.where(StockPrice.date < before)
+
+            result = await db.execute(query)
+            return PriceSeries.from_records(result.all())
+        except SQLAlchemyError as e:
+            logger.error(
+                f"Database error when fetching prices for stock ID {stock_id}: {e}"
+            )
+            return PriceSeries.empty()
+
+    @staticmethod
+    async def delete_prices(
+        db: AsyncSession, stock_id: int, dates: List[datetime]
+    ) -> int:
+        """Delete a stock's bars on exactly the given dates and return the count
+
+        Deleting by key rather than by date range leaves bars written since
+        the caller read them alone. All chunks are deleted in one transaction.
+        """
+        try:
+            deleted = 0
+            for i in range(0, len(dates), DELETE_CHUNK_ROWS):
+                result = await db.execute(
+                    delete(StockPrice).where(
+                        StockPrice.stock_id == stock_id,
+                        StockPrice.date.in_(dates[i : i + DELETE_CHUNK_ROWS]),
+                    )
+                )
+                deleted += result.rowcount
+            await db.commit()
+            return deleted
+        except SQLAlchemyError as e:
+            await db.rollback()
+            logger.error(
+                f"Database error when deleting prices for stock ID {stock_id}: {e}"
+            )
+            return 0
+
     @staticmethod
     async def get_popular_stocks(
         db: AsyncSession, symbols: List[str]
@@ -176,12 +465,38 @@ class StockRepository:
             logger.error(f"Database error when fetching popular stocks: {e}")
             return []
 
+    @staticmethod
+    async def get_stock_names(
+        db: AsyncSession, updated_since: Optional[datetime] = None
+    ) -> Optional[List[Tuple[str, str]]]:
+        """Get the symbol and name of every stored stock, or None on failure
+
+        With `updated_since`, only stocks stored or updated since then.
+        """
+        try:
+            stmt = select(Stock.symbol, Stock.name)
+            if updated_since is not None:
+                stmt = stmt.where(Stock.last_updated >= updated_since)
+            result = await db.execute(stmt)
+            return [tuple(row) for row in result.all()]
+        except SQLAlchemyError as e:
+            logger.error(f"Database error when fetching stock names: {e}")
+            return None
+
     @staticmethod
     async def search_stocks(
         db: AsyncSession, query: str, limit: int = 10
     ) -> List[Stock]:
-        """Search for stocks by symbol or name"""
+        """Search for stocks by symbol or name, best matches first
+
+        On SQLite, symbols starting with the query come first, the exact
+        match leading, followed by FTS5 token-prefix matches on symbol and
+        name. Other databases fall back to substring matching.
+        """
         try:
+            if db.get_bind().dialect.name == "sqlite":
+                return await StockRepository._search_stocks_indexed(db, query, limit)
+
             result = await db.execute(
                 select(Stock)
                 .where(
@@ -195,23 +510,75 @@ class StockRepository:
             logger.error(f"Database error when searching stocks: {e}")
             return []
 
+    @staticmethod
+    async def _search_stocks_indexed(
+        db: AsyncSession, query: str, limit: int
+    ) -> List[Stock]:
+        """Search the symbol index and the FTS5 index, merging the results"""
+        match = _search_match(query)
+        if match is None:
+            return []
+        symbol = query.strip().upper()
+
+        # Symbols starting with the query, shortest (so the exact match) first
+        result = await db.execute(
+            select(Stock)
+            .where(Stock.symbol >= symbol, Stock.symbol < _prefix_end(symbol))
+            .order_by(func.length(Stock.symbol), Stock.symbol)
+            .limit(limit)
+        )
+        by_symbol = result.scalars().all()
+
+        result = await db.execute(
+            select(Stock).from_statement(
+                STOCK_SEARCH_QUERY.bindparams(
+                    match=match, candidates=SEARCH_CANDIDATES, limit=limit
+                )
+            )
+        )
+        by_token = result.scalars().all()
+
+        # Leave half the results to token matches unless they run short
+        leading = by_symbol[: max(limit // 2, limit - len(by_token))]
+        return list(dict.fromkeys([*leading, *by_token, *by_symbol]))[:limit]
+
 
 class CacheRepository:
     """Repository for API cache operations"""
 
     @staticmethod
-    async def get_cached_data(db: AsyncSession, key: str) -> Optional[str]:
-        """Get cached data by key if not expired"""
+    async def get_cached_data(db: AsyncSession, key: str) -> Optional[bytes]:
+        """Get cached JSON data by key if not expired"""
+        try:
+            result = await db.execute(
+                select(APICache.data).where(
+                    (APICache.key == key) & (APICache.expires_at > datetime.now())
+                )
+            )
+            data = result.scalar()
+
+            if data is not None:
+                return cache_codec.decode(data)
+            return None
+        except SQLAlchemyError as e:
+            logger.error(f"Database error when getting cache for {key}: {e}")
+            return None
+
+    @staticmethod
+    async def get_cached_entry(
+        db: AsyncSession, key: str
+    ) -> Optional[Tuple[bytes, Optional[datetime], datetime]]:
+        """Get cached JSON data by key if not expired, with stale_at and expires_at"""
         try:
             result = await db.execute(
-                select(APICache).where(
+                select(APICache.data, APICache.stale_at, APICache.expires_at).where(
                     (APICache.key == key) & (APICache.expires_at > datetime.now())
                 )
             )
-            cache_entry = result.scalars().first()
+            row = result.first()
 
-            if cache_entry:
-                return cache_entry.data
+            if row:
+                return cache_codec.decode(row.data), row.stale_at, row.expires_at
             return None
         except SQLAlchemyError as e:
             logger.error(f"Database error when getting cache for {key}: {e}")
@@ -219,36 +586,294 @@ class CacheRepository:
 
     @staticmethod
     async def set_cached_data(
-        db: AsyncSession, key: str, data: Any, expire_seconds: int = 3600
+        db: AsyncSession,
+        key: str,
+        data: Any,
+        expire_seconds: int = 3600,
+        stale_seconds: Optional[int] = None,
+    ) -> bool:
+        """Set data in cache with expiration time
+
+        With `stale_seconds`, the entry turns stale (see get_cached_entry)
+        after that long and expires after `expire_seconds`. An existing entry
+        is updated in place, so readers never see it missing.
+        """
+        # Convert data to compact JSON
+        body = json.dumps(data, separators=(",", ":")).encode()
+        return await CacheRepository.set_cached_body(
+            db, key, body, expire_seconds, stale_seconds
+        )
+
+    @staticmethod
+    async def set_cached_body(
+        db: AsyncSession,
+        key: str,
+        body: bytes,
+        expire_seconds: int = 3600,
+        stale_seconds: Optional[int] = None,
+    ) -> bool:
+        """Set an already encoded JSON body in cache, like set_cached_data"""
+        return await CacheRepository.set_many_cached_bodies(
+            db, [(key, body)], expire_seconds, stale_seconds
+        )
+
+    @staticmethod
+    async def set_many_cached_data(
+        db: AsyncSession,
+        items: Dict[str, Any],
+        expire_seconds: int = 3600,
+        stale_seconds: Optional[int] = None,
+        commit: bool = True,
+    ) -> bool:
+        """Set several cache entries with the same TTLs in one statement"""
+        return await CacheRepository.set_many_cached_bodies(
+            db,
+            [
+                (key, json.dumps(data, separators=(",", ":")).encode())
+                for key, data in items.items()
+            ],
+            expire_seconds,
+            stale_seconds,
+            commit,
+        )
+
+    @staticmethod
+    async def set_many_cached_bodies(
+        db: AsyncSession,
+        entries: List[Tuple[str, bytes]],
+        expire_seconds: int = 3600,
+        stale_seconds: Optional[int] = None,
+        commit: bool = True,
+        tags: Optional[Dict[str, List[str]]] = None,
     ) -> bool:
-        """Set data in cache with expiration time"""
+        """Upsert encoded JSON bodies with INSERT ... ON CONFLICT(key) DO UPDATE
+
+        All entries are written by one statement; with `commit=False` the
+        caller commits, so several batches can share a transaction. `tags`
+        maps keys to the tags that replace their current ones.
+        """
+        if not entries:
+            return True
         try:
-            # Convert data to JSON string
-            data_str = json.dumps(data)
+            now = datetime.now()
+            expires_at = now + timedelta(seconds=expire_seconds)
+            stale_at = (
+                now + timedelta(seconds=stale_seconds)
+                if stale_seconds is not None
+                else None
+            )
 
-            # Check if key already exists
-            result = await db.execute(select(APICache).where(APICache.key == key))
-            existing_cache = result.scalars().first()
+            stmt = _insert(db, APICache)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[APICache.key],
+                set_={
+                    "data": stmt.excluded.data,
+                    "expires_at": stmt.excluded.expires_at,
+                    "stale_at": stmt.excluded.stale_at,
+                    "created_at": stmt.excluded.created_at,
+                    "namespace": stmt.excluded.namespace,
+                    "size_bytes": stmt.excluded.size_bytes,
+                    "last_accessed_at": stmt.excluded.last_accessed_at,
+                },
+            )
+            rows = []
+            for key, body in entries:
+                data = cache_codec.encode(body)
+                rows.append(
+                    {
+                        "key": key,
+                        "data": data,
+                        "expires_at": expires_at,
+                        "stale_at": stale_at,
+                        "created_at": now,
+                        "namespace": cache_namespace(key),
+                        "size_bytes": len(key) + len(data),
+                        "last_accessed_at": now,
+                    }
+                )
+            await db.execute(stmt, rows)
+            if tags:
+                await CacheRepository._replace_tags(db, tags)
 
-            expires_at = datetime.now() + timedelta(seconds=expire_seconds)
+            if commit:
+                await db.commit()
+            return True
+        except SQLAlchemyError as e:
+            await db.rollback()
+            logger.error(
+                f"Database error when setting {len(entries)} cache entries: {e}"
+            )
+            return False
 
-            if existing_cache:
-                # Update existing cache
-                existing_cache.data = data_str
-                existing_cache.expires_at = expires_at
-                existing_cache.created_at = datetime.now()
-            else:
-                # Create new cache entry
-                cache_entry = APICache(key=key, data=data_str, expires_at=expires_at)
-                db.add(cache_entry)
+    @staticmethod
+    async def _replace_tags(db: AsyncSession, tags: Dict[str, List[str]]):
+        """Replace the tags of the given keys, without committing"""
+        await db.execute(
+            delete(APICacheTag).where(APICacheTag.cache_key.in_(list(tags)))
+        )
+        rows = [
+            {"tag": tag, "cache_key": key}
+            for key, key_tags in tags.items()
+            for tag in key_tags
+        ]
+        if rows:
+            await db.execute(
+                _insert(db, APICacheTag).on_conflict_do_nothing(), rows
+            )
+
+    @staticmethod
+    async def invalidate_tags(
+        db: AsyncSession, tags: List[str], keep: Tuple[str, ...] = ()
+    ) -> List[str]:
+        """Delete every entry carrying one of the tags, except the `keep` keys
+
+        Only the tagged rows are touched: keys are found through the tag
+        table's primary key and deleted by the unique key index. Returns the
+        deleted keys.
+        """
+        try:
+            result = await db.execute(
+                select(APICacheTag.cache_key)
+                .where(APICacheTag.tag.in_(tags))
+                .distinct()
+            )
+            keys = [key for key in result.scalars().all() if key not in keep]
+            for i in range(0, len(keys), DELETE_CHUNK_ROWS):
+                chunk = keys[i : i + DELETE_CHUNK_ROWS]
+                await db.execute(delete(APICache).where(APICache.key.in_(chunk)))
+                await db.execute(
+                    delete(APICacheTag).where(APICacheTag.cache_key.in_(chunk))
+                )
+            await db.commit()
+            return keys
+        except SQLAlchemyError as e:
+            await db.rollback()
+            logger.error(f"Database error when invalidating tags {tags}: {e}")
+            return []
+
+    @staticmethod
+    async def get_namespace_versions(db: AsyncSession) -> Dict[str, int]:
+        """Get the stored key version of each cache namespace"""
+        try:
+            result = await db.execute(
+                select(CacheNamespace.namespace, CacheNamespace.version)
+            )
+            return {namespace: version for namespace, version in result.all()}
+        except SQLAlchemyError as e:
+            logger.error(f"Database error when loading cache namespaces: {e}")
+            return {}
+
+    @staticmethod
+    async def bump_namespace_version(
+        db: AsyncSession, namespace: str
+    ) -> Optional[int]:
+        """Increment a namespace's key version and return the new one"""
+        try:
+            stmt = _insert(db, CacheNamespace).values(
+                namespace=namespace, version=2, updated_at=datetime.now()
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[CacheNamespace.namespace],
+                set_={
+                    "version": CacheNamespace.version + 1,
+                    "updated_at": stmt.excluded.updated_at,
+                },
+            ).returning(CacheNamespace.version)
+            result = await db.execute(stmt)
+            version = result.scalar_one()
+            await db.commit()
+            return version
+        except SQLAlchemyError as e:
+            await db.rollback()
+            logger.error(
+                f"Database error when bumping cache namespace {namespace}: {e}"
+            )
+            return None
 
+    @staticmethod
+    async def record_invalidations(db: AsyncSession, keys: List[str]) -> bool:
+        """Log dropped cache keys so other processes drop them from memory"""
+        if not keys:
+            return True
+        try:
+            now = datetime.now()
+            await db.execute(
+                insert(CacheInvalidation),
+                [{"cache_key": key, "created_at": now} for key in keys],
+            )
             await db.commit()
             return True
         except SQLAlchemyError as e:
             await db.rollback()
-            logger.error(f"Database error when setting cache for {key}: {e}")
+            logger.error(f"Database error when recording cache invalidations: {e}")
             return False
 
+    @staticmethod
+    async def get_invalidations(
+        db: AsyncSession, after_id: int
+    ) -> List[Tuple[int, str]]:
+        """Get the (id, cache_key) invalidations logged after an id, oldest first"""
+        try:
+            result = await db.execute(
+                select(CacheInvalidation.id, CacheInvalidation.cache_key)
+                .where(CacheInvalidation.id > after_id)
+                .order_by(CacheInvalidation.id)
+            )
+            return [(row_id, key) for row_id, key in result.all()]
+        except SQLAlchemyError as e:
+            logger.error(f"Database error when loading cache invalidations: {e}")
+            return []
+
+    @staticmethod
+    async def get_last_invalidation_id(db: AsyncSession) -> int:
+        """Get the id of the newest logged invalidation, or 0 if there is none"""
+        try:
+            result = await db.execute(select(func.max(CacheInvalidation.id)))
+            return result.scalar() or 0
+        except SQLAlchemyError as e:
+            logger.error(f"Database error when loading cache invalidations: {e}")
+            return 0
+
+    @staticmethod
+    async def prune_invalidations(db: AsyncSession, before: datetime) -> int:
+        """Delete invalidations logged before a time and return how many"""
+        try:
+            result = await db.execute(
+                delete(CacheInvalidation).where(CacheInvalidation.created_at < before)
+            )
+            await db.commit()
+            return result.rowcount
+        except SQLAlchemyError as e:
+            await db.rollback()
+            logger.error(f"Database error when pruning cache invalidations: {e}")
+            return 0
+
+    @staticmethod
+    async def purge_unreachable(db: AsyncSession, prefixes: Dict[str, str]) -> int:
+        """Delete entries that no current key can reach, and orphaned tags
+
+        `prefixes` maps each namespace to the prefix of its current keys, so
+        rows from older versions and unstructured legacy keys are dropped.
+        """
+        try:
+            current = [
+                APICache.key.startswith(prefix, autoescape=True)
+                for prefix in prefixes.values()
+            ]
+            result = await db.execute(delete(APICache).where(~or_(*current)))
+            deleted_count = result.rowcount
+            await db.execute(
+                delete(APICacheTag).where(
+                    APICacheTag.cache_key.not_in(select(APICache.key))
+                )
+            )
+            await db.commit()
+            return deleted_count
+        except SQLAlchemyError as e:
+            await db.rollback()
+            logger.error(f"Database error when purging unreachable cache entries: {e}")
+            return 0
+
     @staticmethod
     async def invalidate_cache(db: AsyncSession, key: str) -> bool:
         """Invalidate cache for a specific key"""
@@ -275,3 +900,246 @@ class CacheRepository:
             await db.rollback()
             logger.error(f"Database error when clearing expired cache: {e}")
             return 0
+
+    @staticmethod
+    async def touch_cache_entries(db: AsyncSession, accessed: Dict[str, datetime]):
+        """Record last access times for cache keys in one statement"""
+        if not accessed:
+            return
+        table = APICache.__table__
+        try:
+            await db.execute(
+                update(table)
+                .where(table.c.key == bindparam("cache_key"))
+                .values(last_accessed_at=bindparam("accessed_at")),
+                [
+                    {"cache_key": key, "accessed_at": accessed_at}
+                    for key, accessed_at in accessed.items()
+                ],
+            )
+            await db.commit()
+        except SQLAlchemyError as e:
+            await db.rollback()
+            logger.error(f"Database error when recording cache access: {e}")
+
+    @staticmethod
+    async def evict_lru(
+        db: AsyncSession,
+        namespace: Optional[str] = None,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ) -> List[str]:
+        """Delete the least recently used rows beyond a row and byte budget
+
+        The budget applies to one namespace, or to the whole table when
+        `namespace` is None. The evicted entries' tags are deleted in the same
+        transaction. Returns the evicted keys.
+        """
+        recency = func.coalesce(APICache.last_accessed_at, APICache.created_at)
+        size = func.coalesce(APICache.size_bytes, func.length(APICache.data))
+        ranked = select(
+            APICache.id,
+            APICache.key,
+            func.row_number()
+            .over(order_by=(recency.desc(), APICache.id))
+            .label("position"),
+            func.sum(size)
+            .over(order_by=(recency.desc(), APICache.id))
+            .label("running"),
+        )
+        if namespace is not None:
+            ranked = ranked.where(APICache.namespace == namespace)
+        ranked = ranked.subquery()
+
+        conditions = []
+        if max_rows is not None:
+            conditions.append(ranked.c.position > max_rows)
+        if max_bytes is not None:
+            conditions.append(ranked.c.running > max_bytes)
+        if not conditions:
+            return []
+
+        try:
+            result = await db.execute(
+                write_intent(
+                    select(ranked.c.id, ranked.c.key).where(or_(*conditions))
+                )
+            )
+            victims = result.all()
+            for i in range(0, len(victims), DELETE_CHUNK_ROWS):
+                chunk = victims[i : i + DELETE_CHUNK_ROWS]
+                await db.execute(
+                    delete(APICache).where(APICache.id.in_([row.id for row in chunk]))
+                )
+                await db.execute(
+                    delete(APICacheTag).where(
+                        APICacheTag.cache_key.in_([row.key for row in chunk])
+                    )
+                )
+            await db.commit()
+            return [row.key for row in victims]
+        except SQLAlchemyError as e:
+            await db.rollback()
+            logger.error(f"Database error when evicting cache entries: {e}")
+            return []
+
+    @staticmethod
+    async def get_cache_usage(db: AsyncSession) -> Dict[str, Dict[str, int]]:
+        """Get the row count and stored bytes of each cache namespace"""
+        try:
+            result = await db.execute(
+                select(
+                    APICache.namespace,
+                    func.count(APICache.id),
+                    func.sum(
+                        func.coalesce(APICache.size_bytes, func.length(APICache.data))
+                    ),
+                ).group_by(APICache.namespace)
+            )
+            return {
+                namespace or "other": {"rows": rows, "bytes": size or 0}
+                for namespace, rows, size in result.all()
+            }
+        except SQLAlchemyError as e:
+            logger.error(f"Database error when measuring cache usage: {e}")
+            return {}
+
+    @staticmethod
+    async def backfill_cache_metadata(db: AsyncSession) -> int:
+        """Fill namespace and size for rows written before they were tracked"""
+        try:
+            result = await db.execute(
+                write_intent(
+                    select(APICache.id, APICache.key).where(
+                        APICache.namespace.is_(None) | APICache.size_bytes.is_(None)
+                    )
+                )
+            )
+            rows = result.all()
+            table = APICache.__table__
+            if rows:
+                await db.execute(
+                    update(table)
+                    .where(table.c.id == bindparam("row_id"))
+                    .values(
+                        namespace=bindparam("row_namespace"),
+                        size_bytes=func.length(table.c.key) + func.length(table.c.data),
+                    ),
+                    [
+                        {"row_id": row.id, "row_namespace": cache_namespace(row.key)}
+                        for row in rows
+                    ],
+                )
+                await db.commit()
+            return len(rows)
+        except SQLAlchemyError as e:
+            await db.rollback()
+            logger.error(f"Database error when backfilling cache metadata: {e}")
+            return 0
+
+    @staticmethod
+    async def migrate_cache_payloads(db: AsyncSession, batch_size: int = 500) -> int:
+        """Rewrite cache rows stored as JSON text in the current codec format
+
+        Values that were JSON-encoded twice (a JSON string holding JSON) are
+        unwrapped on the way. Returns the number of rewritten rows.
+        """
+        rewritten = 0
+        last_id = 0
+        try:
+            while True:
+                result = await db.execute(
+                    write_intent(
+                        select(APICache.id, APICache.data)
+                        .where(APICache.id > last_id)
+                        .order_by(APICache.id)
+                        .limit(batch_size)
+                    )
+                )
+                rows = result.all()
+                if not rows:
+                    break
+                last_id = rows[-1].id
+
+                for row in rows:
+                    if cache_codec.is_current(row.data):
+                        continue
+                    value = json.loads(cache_codec.decode(row.data))
+                    if isinstance(value, str):
+                        try:
+                            inner = json.loads(value)
+                        except ValueError:
+                            inner = None
+                        if isinstance(inner, (str, list, dict)):
+                            value = inner
+                    body = json.dumps(value, separators=(",", ":")).encode()
+                    await db.execute(
+                        update(APICache)
+                        .where(APICache.id == row.id)
+                        .values(data=cache_codec.encode(body))
+                    )
+                    rewritten += 1
+                await db.commit()
+
+            return rewritten
+        except SQLAlchemyError as e:
+            await db.rollback()
+            logger.error(f"Database error when migrating cache payloads: {e}")
+            return rewritten
+
+
+class RequestStatsRepository:
+    """Repository for database operations related to symbol request counts"""
+
+    @staticmethod
+    async def add_request_counts(
+        db: AsyncSession, counts: Dict[str, int], requested_at: datetime = None
+    ) -> bool:
+        """Add request counts per symbol with one upsert statement"""
+        if not counts:
+            return True
+        try:
+            requested_at = requested_at or datetime.now()
+            stmt = _insert(db, SymbolRequest)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[SymbolRequest.symbol],
+                set_={
+                    "request_count": SymbolRequest.request_count
+                    + stmt.excluded.request_count,
+                    "last_requested_at": stmt.excluded.last_requested_at,
+                },
+            )
+            await db.execute(
+                stmt,
+                [
+                    {
+                        "symbol": symbol,
+                        "request_count": count,
+                        "last_requested_at": requested_at,
+                    }
+                    for symbol, count in counts.items()
+                ],
+            )
+            await db.commit()
+            return True
+        except SQLAlchemyError as e:
+            await db.rollback()
+            logger.error(f"Database error when saving request counts: {e}")
+            return False
+
+    @staticmethod
+    async def get_most_requested(db: AsyncSession, limit: int = 50) -> List[str]:
+        """Get the most requested symbols, most requested first"""
+        try:
+            result = await db.execute(
+                select(SymbolRequest.symbol)
+                .order_by(
+                    SymbolRequest.request_count.desc(),
+                    SymbolRequest.last_requested_at.desc(),
+                )
+                .limit(limit)
+            )
+            return list(result.scalars().all())
+        except SQLAlchemyError as e:
+            logger.error(f"Database error when getting most requested symbols: {e}")
+            return []
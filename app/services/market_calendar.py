@@ -0,0 +1,91 @@
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+import pytz
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar,
+    GoodFriday,
+    Holiday,
+    USLaborDay,
+    USMartinLutherKingJr,
+    USMemorialDay,
+    USPresidentsDay,
+    USThanksgivingDay,
+    nearest_workday,
+    sunday_to_monday,
+)
+
+# Exchange time zone and regular session hours
+MARKET_TZ = pytz.timezone("US/Eastern")
+MARKET_OPEN = time(9, 30)
+MARKET_CLOSE = time(16, 0)
+
+
+class NYSEHolidayCalendar(AbstractHolidayCalendar):
+    """Full-day NYSE holidays (early closes count as regular sessions)"""
+
+    rules = [
+        # A Saturday New Year's Day is not made up on the Friday before
+        Holiday("New Year's Day", month=1, day=1, observance=sunday_to_monday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday(
+            "Juneteenth",
+            month=6,
+            day=19,
+            start_date=datetime(2022, 1, 1),
+            observance=nearest_workday,
+        ),
+        Holiday("Independence Day", month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday("Christmas Day", month=12, day=25, observance=nearest_workday),
+    ]
+
+
+@lru_cache(maxsize=1)
+def trading_calendar() -> np.busdaycalendar:
+    """Get the weekday calendar without NYSE holidays, for numpy busday functions"""
+    holidays = NYSEHolidayCalendar().holidays(
+        start=datetime(1990, 1, 1), end=datetime(2100, 12, 31)
+    )
+    return np.busdaycalendar(holidays=holidays.values.astype("datetime64[D]"))
+
+
+def market_time(moment: Optional[datetime] = None) -> datetime:
+    """Convert a local or aware datetime (default now) to naive exchange time"""
+    moment = moment or datetime.now()
+    return moment.astimezone(MARKET_TZ).replace(tzinfo=None)
+
+
+def is_trading_day(day: date) -> bool:
+    """Whether the exchange holds a session on a day"""
+    return bool(np.is_busday(day, busdaycal=trading_calendar()))
+
+
+def latest_session(now: datetime) -> date:
+    """Get the latest trading day whose session has opened by `now` (exchange time)"""
+    calendar = trading_calendar()
+    today = np.datetime64(now.date(), "D")
+    offset = -1 if is_trading_day(now.date()) and now.time() < MARKET_OPEN else 0
+    return np.busday_offset(today, offset, roll="backward", busdaycal=calendar).item()
+
+
+def session_close(day: date) -> datetime:
+    """Get the closing time of a day's session (exchange time)"""
+    return datetime.combine(day, MARKET_CLOSE)
+
+
+def trading_days_between(start: date, end: date) -> int:
+    """Count the trading days after `start` up to and including `end`"""
+    return int(
+        np.busday_count(
+            start + timedelta(days=1),
+            end + timedelta(days=1),
+            busdaycal=trading_calendar(),
+        )
+    )
@@ -0,0 +1,130 @@
+import logging
+import zlib
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.models.stock import PriceSeries
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS_PER_YEAR = 252
+
+# Base prices for the symbols used in demo mode
+BASE_PRICES = {
+    "AAPL": 175.0,
+    "MSFT": 390.0,
+    "GOOGL": 147.0,
+    "AMZN": 182.0,
+    "TSLA": 172.0,
+    "META": 485.0,
+    "NVDA": 880.0,
+    "JPM": 196.0,
+    "V": 275.0,
+    "WMT": 60.0,
+}
+
+
+def symbol_seed(symbol: str, salt: int = 0) -> int:
+    """Derive a stable seed for a symbol (Python's hash() is salted per process)"""
+    return zlib.crc32(symbol.upper().encode()) ^ salt
+
+
+def trading_days(end: date, count: int) -> np.ndarray:
+    """Get the `count` business days up to and including `end`, oldest first"""
+    last = np.busday_offset(np.datetime64(end, "D"), 0, roll="backward")
+    return np.busday_offset(last, np.arange(-count + 1, 1), roll="backward")
+
+
+def generate_ohlcv(
+    seeds: List[int],
+    bars: int,
+    base_prices: np.ndarray,
+    annual_drift: float = 0.05,
+    annual_volatility: float = 0.3,
+) -> Dict[str, np.ndarray]:
+    """Generate geometric Brownian motion OHLCV bars for several symbols
+
+    Every symbol draws from its own generator, so its path depends only on
+    its seed. Returns (symbols x bars) arrays, oldest bar first, where the
+    last close equals the base price.
+    """
+    # Rows: close return, opening gap, high wick, low wick, volume
+    shocks = np.empty((len(seeds), 5, bars))
+    for i, seed in enumerate(seeds):
+        np.random.default_rng(seed).standard_normal(out=shocks[i])
+
+    dt = 1 / TRADING_DAYS_PER_YEAR
+    sigma = annual_volatility * np.sqrt(dt)
+    log_returns = (annual_drift - annual_volatility**2 / 2) * dt + sigma * shocks[:, 0]
+
+    # Anchor the path so it ends at the base price
+    log_path = np.cumsum(log_returns, axis=1)
+    log_path -= log_path[:, -1:]
+    close = base_prices[:, None] * np.exp(log_path)
+
+    previous_close = np.concatenate(
+        [close[:, :1] * np.exp(-log_returns[:, :1]), close[:, :-1]], axis=1
+    )
+    open_ = previous_close * np.exp(sigma * 0.25 * shocks[:, 1])
+    high = np.maximum(open_, close) * np.exp(np.abs(shocks[:, 2]) * sigma * 0.5)
+    low = np.minimum(open_, close) * np.exp(-np.abs(shocks[:, 3]) * sigma * 0.5)
+    volume = np.exp(16.5 + 0.5 * shocks[:, 4]).astype(np.int64)
+
+    return {
+        "open": np.round(open_, 2),
+        "high": np.round(high, 2),
+        "low": np.round(low, 2),
+        "close": np.round(close, 2),
+        "volume": volume,
+    }
+
+
+def generate_universe(
+    symbols: List[str],
+    years: float = 1.0,
+    end: Optional[date] = None,
+    salt: int = 0,
+    bars: Optional[int] = None,
+) -> Dict[str, PriceSeries]:
+    """Generate deterministic daily histories for many symbols, newest first
+
+    The history spans `years` of trading days, or exactly `bars` bars when
+    given, ending on the last business day up to `end` (today by default).
+    """
+    if bars is None:
+        bars = max(1, int(years * TRADING_DAYS_PER_YEAR))
+    days = trading_days(end or date.today(), bars)
+    base_prices = np.array(
+        [BASE_PRICES.get(symbol, 100.0) for symbol in symbols], dtype=np.float64
+    )
+    columns = generate_ohlcv(
+        [symbol_seed(symbol, salt) for symbol in symbols], bars, base_prices
+    )
+
+    dates = days[::-1]
+    return {
+        symbol: PriceSeries(
+            dates, *(columns[column][i, ::-1] for column in PriceSeries.COLUMNS)
+        )
+        for i, symbol in enumerate(symbols)
+    }
+
+
+@lru_cache(maxsize=1024)
+def mock_price_series(symbol: str, day: date, days: int = 30) -> PriceSeries:
+    """Get the mock history for a symbol, memoized per symbol and day
+
+    Covers the business days in the `days` calendar days up to `day`, newest
+    first, and is identical for every call on the same day.
+    """
+    logger.info(f"Generating mock data for {symbol}")
+    bars = int(np.busday_count(day - timedelta(days=days), day + timedelta(days=1)))
+    series = generate_universe([symbol], end=day, bars=bars)[symbol]
+
+    # The memoized arrays are shared by every caller
+    for name in PriceSeries.__slots__:
+        getattr(series, name).flags.writeable = False
+    return series
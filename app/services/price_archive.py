@@ -0,0 +1,118 @@
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.stock import PriceSeries
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:  # Optional dependency
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+# Default archive location, next to the SQLite database
+DEFAULT_ARCHIVE_DIR = Path(__file__).parent.parent.parent / "data" / "archive"
+
+
+class PriceArchive:
+    """Columnar archive of closed daily bars, one Arrow IPC file per symbol
+
+    Files hold a single uncompressed record batch sorted oldest first, so a
+    read memory-maps the file and wraps its buffers in NumPy arrays without
+    copying or building a row object per bar. Only the recent window stays in
+    the stock_prices table; see StockService.get_price_history for the merge.
+    Requires pyarrow (the `archive` extra); without it the archive is empty
+    and every read falls back to SQLite alone.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        if pa is None:
+            logger.info("pyarrow is not installed, the price archive is disabled")
+
+    @property
+    def enabled(self) -> bool:
+        """Whether archive files can be read and written"""
+        return pa is not None
+
+    def _path(self, symbol: str) -> Path:
+        return self.root / f"{symbol}.arrow"
+
+    def read(
+        self,
+        symbol: str,
+        since: Optional[datetime] = None,
+        before: Optional[datetime] = None,
+    ) -> PriceSeries:
+        """Memory-map a symbol's archived bars, newest first
+
+        `since` and `before` bound the dates (inclusive and exclusive). The
+        returned arrays are read-only views into the mapped file.
+        """
+        path = self._path(symbol)
+        if not self.enabled or not path.exists():
+            return PriceSeries.empty()
+
+        with pa.memory_map(str(path)) as source:
+            table = pa.ipc.open_file(source).read_all()
+        if table.num_rows == 0:
+            return PriceSeries.empty()
+        columns = [
+            table.column(name).chunk(0).to_numpy(zero_copy_only=True)
+            for name in ("date", *PriceSeries.COLUMNS)
+        ]
+        # Dates are sorted, so the bounds are a slice; reversed views keep
+        # the read zero-copy while returning the newest bar first
+        dates = columns[0]
+        start = np.searchsorted(dates, np.datetime64(since, "us")) if since else 0
+        end = (
+            np.searchsorted(dates, np.datetime64(before, "us"))
+            if before
+            else len(dates)
+        )
+        return PriceSeries(*(column[start:end][::-1] for column in columns))
+
+    def write(self, symbol: str, prices: PriceSeries) -> int:
+        """Merge bars into a symbol's archive file and return its bar count
+
+        Bars already archived for the same date are replaced. The file is
+        rewritten next to the old one and swapped in atomically, so readers
+        holding the old mapping are unaffected.
+        """
+        if not self.enabled:
+            raise RuntimeError("pyarrow is required to write the price archive")
+
+        merged = PriceSeries.concat([prices, self.read(symbol)])
+        # Keep the first occurrence of each date, i.e. the newly written bar
+        _, first = np.unique(merged.dates, return_index=True)
+        merged = merged._take(first)  # np.unique sorts oldest first
+
+        table = pa.table(
+            {
+                "date": pa.array(merged.dates, type=pa.timestamp("us")),
+                **{
+                    column: pa.array(getattr(merged, column))
+                    for column in PriceSeries.COLUMNS
+                },
+            }
+        )
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._path(symbol)
+        tmp_path = path.with_suffix(".arrow.tmp")
+        with pa.OSFile(str(tmp_path), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                # One record batch so reads map each column as one buffer
+                writer.write_table(table, max_chunksize=max(1, table.num_rows))
+        os.replace(tmp_path, path)
+        return table.num_rows
+
+
+# Global instance
+price_archive = PriceArchive(settings.PRICE_ARCHIVE_DIR or DEFAULT_ARCHIVE_DIR)
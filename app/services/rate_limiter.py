@@ -0,0 +1,194 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Priority lanes for upstream calls (lower value is served first)"""
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+# Priority of the upstream calls made by the current task
+request_priority: ContextVar[Priority] = ContextVar(
+    "request_priority", default=Priority.INTERACTIVE
+)
+
+
+@contextmanager
+def background_priority():
+    """Run the enclosed upstream calls in the background lane"""
+    token = request_priority.set(Priority.BACKGROUND)
+    try:
+        yield
+    finally:
+        request_priority.reset(token)
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a call cannot be admitted within the upstream budget"""
+
+
+class TokenBucket:
+    """Token bucket that refills continuously up to its capacity"""
+
+    def __init__(self, capacity: int, period_seconds: float):
+        self.capacity = capacity
+        self.refill_rate = capacity / period_seconds
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        """Add the tokens accrued since the last refill"""
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.refill_rate
+        )
+        self.updated = now
+
+    def seconds_until_available(self) -> float:
+        """Get the time until one whole token is available"""
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.refill_rate
+
+
+class RateLimiter:
+    """Process-wide async rate limiter with per-minute and per-day budgets
+
+    Callers that cannot be admitted right away wait in a priority queue, so
+    interactive requests are granted tokens ahead of background refreshes.
+    """
+
+    def __init__(
+        self,
+        per_minute: int,
+        per_day: int,
+        interactive_max_wait: Optional[float] = None,
+    ):
+        self.minute_bucket = TokenBucket(per_minute, 60)
+        self.day_bucket = TokenBucket(per_day, 86400)
+        self.interactive_max_wait = interactive_max_wait
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+        self.granted = {priority.name.lower(): 0 for priority in Priority}
+        self.rejected = {priority.name.lower(): 0 for priority in Priority}
+        self.throttled = 0
+
+    def _refill(self):
+        """Refill both buckets up to the current time"""
+        now = time.monotonic()
+        self.minute_bucket.refill(now)
+        self.day_bucket.refill(now)
+
+    def _take(self, priority: Priority):
+        """Consume one token from each bucket"""
+        self.minute_bucket.tokens -= 1
+        self.day_bucket.tokens -= 1
+        self.granted[priority.name.lower()] += 1
+
+    async def acquire(self, priority: Optional[Priority] = None):
+        """Wait for permission to make one upstream call
+
+        Raises RateLimitExceeded when the daily budget is spent, or when an
+        interactive call would wait longer than `interactive_max_wait`.
+        """
+        if priority is None:
+            priority = request_priority.get()
+
+        self._refill()
+        if self.day_bucket.tokens < 1:
+            self.rejected[priority.name.lower()] += 1
+            raise RateLimitExceeded("Daily Alpha Vantage budget exhausted")
+
+        # Fast path: nobody is queued and a token is available
+        if not self._waiters and self.minute_bucket.tokens >= 1:
+            self._take(priority)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        self._schedule_dispatch()
+
+        max_wait = (
+            self.interactive_max_wait if priority == Priority.INTERACTIVE else None
+        )
+        try:
+            await asyncio.wait_for(future, timeout=max_wait)
+        except asyncio.TimeoutError:
+            self.rejected[priority.name.lower()] += 1
+            raise RateLimitExceeded(
+                f"No Alpha Vantage budget available within {max_wait}s"
+            )
+
+    def _schedule_dispatch(self):
+        """Arrange for queued waiters to be served when a token is available"""
+        if self._wakeup is not None or not self._waiters:
+            return
+        delay = self.minute_bucket.seconds_until_available()
+        self._wakeup = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    def _dispatch(self):
+        """Grant tokens to queued waiters in priority order"""
+        self._wakeup = None
+        self._refill()
+
+        while self._waiters and self.minute_bucket.tokens >= 1:
+            priority, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                # The waiter gave up (timeout or cancellation)
+                continue
+            if self.day_bucket.tokens < 1:
+                self.rejected[Priority(priority).name.lower()] += 1
+                future.set_exception(
+                    RateLimitExceeded("Daily Alpha Vantage budget exhausted")
+                )
+                continue
+            self._take(Priority(priority))
+            future.set_result(None)
+
+        self._schedule_dispatch()
+
+    def penalize(self):
+        """Drain the per-minute bucket after the upstream reported throttling"""
+        self.throttled += 1
+        self._refill()
+        self.minute_bucket.tokens = min(self.minute_bucket.tokens, 0.0)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get remaining budget and admission counters"""
+        self._refill()
+        waiting = {priority.name.lower(): 0 for priority in Priority}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                waiting[Priority(priority).name.lower()] += 1
+
+        return {
+            "remaining_minute": int(self.minute_bucket.tokens),
+            "remaining_day": int(self.day_bucket.tokens),
+            "per_minute": self.minute_bucket.capacity,
+            "per_day": self.day_bucket.capacity,
+            "waiting": waiting,
+            "granted": dict(self.granted),
+            "rejected": dict(self.rejected),
+            "throttled": self.throttled,
+        }
+
+
+# Global instance shared by every outbound Alpha Vantage call
+alpha_vantage_limiter = RateLimiter(
+    per_minute=settings.ALPHA_VANTAGE_CALLS_PER_MINUTE,
+    per_day=settings.ALPHA_VANTAGE_CALLS_PER_DAY,
+    interactive_max_wait=settings.ALPHA_VANTAGE_INTERACTIVE_MAX_WAIT_SECONDS,
+)
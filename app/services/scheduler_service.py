@@ -1,19 +1,41 @@
 import asyncio
 import logging
+import time as time_module
 from datetime import datetime, time, timedelta
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 import pytz
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import async_session, get_db
+from app.core.config import settings
+from app.core.database import (
+    Stock,
+    async_session,
+    get_db,
+    read_session,
+    write_session,
+)
+from app.models.stock import StockData
+from app.services.cache_keys import cache_keys
+from app.services.cache_service import tiered_cache
 from app.services.db_service import CacheRepository, StockRepository
-from app.services.stock_service import StockService
+from app.services.market_calendar import market_time
+from app.services.rate_limiter import background_priority
+from app.services.stock_service import (
+    ALPHA_VANTAGE_API_KEY,
+    COMPACT_BARS,
+    StockService,
+)
+from app.services.warmup_service import warmup_service
 
 logger = logging.getLogger(__name__)
 
+# Marks a symbol whose full history is streamed in the persist stage
+STREAM_FULL_HISTORY = "stream_full_history"
+
 
 class SchedulerService:
     """Service for scheduling tasks to update stock data periodically"""
@@ -32,6 +54,8 @@ class SchedulerService:
             "V",
             "WMT",
         ]
+        self.refresh_concurrency = settings.REFRESH_CONCURRENCY
+        self.refresh_progress: Dict[str, Any] = {}
 
     def start(self):
         """Start the scheduler"""
@@ -54,6 +78,24 @@ class SchedulerService:
                 replace_existing=True,
             )
 
+            # Move bars older than the hot window to the columnar archive
+            # (weekly, Sunday 3:00 AM Eastern Time)
+            self.scheduler.add_job(
+                self.archive_price_history,
+                CronTrigger(day_of_week="sun", hour=3, timezone=eastern_tz),
+                id="price_archive",
+                replace_existing=True,
+            )
+
+            # Keep the database cache within its row and byte budgets
+            self.scheduler.add_job(
+                self.enforce_cache_budget,
+                "interval",
+                seconds=settings.CACHE_EVICTION_INTERVAL_SECONDS,
+                id="cache_budget",
+                replace_existing=True,
+            )
+
             # Schedule hourly update of popular stocks during market hours
             # Market hours: 9:30 AM - 4:00 PM Eastern Time, Monday-Friday
             self.scheduler.add_job(
@@ -68,12 +110,38 @@ class SchedulerService:
                 replace_existing=True,
             )
 
-            # Run an initial update when the app starts
+            # Pick up cache invalidations made by other processes
             self.scheduler.add_job(
-                self.update_popular_stocks,
-                "date",
-                run_date=datetime.now() + timedelta(seconds=10),
-                id="initial_update",
+                self.sync_cache,
+                "interval",
+                seconds=settings.CACHE_SYNC_INTERVAL_SECONDS,
+                id="cache_sync",
+                replace_existing=True,
+            )
+
+            # Add stocks stored by other processes to search autocomplete, and
+            # rebuild it now and then to drop deleted ones
+            self.scheduler.add_job(
+                self.sync_search_index,
+                "interval",
+                seconds=settings.AUTOCOMPLETE_SYNC_INTERVAL_SECONDS,
+                id="autocomplete_sync",
+                replace_existing=True,
+            )
+            self.scheduler.add_job(
+                self.rebuild_search_index,
+                "interval",
+                seconds=settings.AUTOCOMPLETE_REBUILD_INTERVAL_SECONDS,
+                id="autocomplete_rebuild",
+                replace_existing=True,
+            )
+
+            # Persist request counts so the next start warms the right symbols
+            self.scheduler.add_job(
+                warmup_service.save_request_counts,
+                "interval",
+                seconds=settings.REQUEST_STATS_SAVE_INTERVAL_SECONDS,
+                id="save_request_counts",
                 replace_existing=True,
             )
 
@@ -89,32 +157,240 @@ class SchedulerService:
             logger.info("Scheduler shutdown")
 
     async def update_stock_data(self):
-        """Update all stock data in the database"""
+        """Update all stock data in the database
+
+        Runs a fetch -> parse -> persist pipeline connected by bounded queues.
+        Fetch workers are paced by the shared rate limiter, and each persist
+        worker owns its database session.
+        """
         logger.info("Running scheduled update of all stock data")
         try:
             async with async_session() as db:
                 # Get all stock symbols from the database
-                result = await db.execute("SELECT symbol FROM stocks")
-                symbols = [row[0] for row in result.fetchall()]
+                result = await db.execute(select(Stock.symbol, Stock.last_updated))
+                rows = result.all()
+                symbols = [symbol for symbol, _ in rows]
+                fetched_at = {
+                    symbol: market_time(last_updated)
+                    for symbol, last_updated in rows
+                    if last_updated is not None
+                }
+                latest_dates = await StockRepository.get_latest_price_dates(
+                    db, symbols
+                )
+
+            if not symbols:
+                logger.info("No stocks in database to update")
+                return
+
+            logger.info(
+                f"Updating {len(symbols)} stocks with "
+                f"{self.refresh_concurrency} workers per stage"
+            )
+
+            with background_priority():
+                await self._run_refresh_pipeline(symbols, latest_dates, fetched_at)
+
+            progress = self.refresh_progress
+            logger.info(
+                f"Stock data update completed: {progress['persisted']} updated, "
+                f"{progress['skipped']} up to date, "
+                f"{progress['failed']} failed in {progress['elapsed_seconds']:.1f}s "
+                f"({progress['symbols_per_second']:.2f} symbols/s)"
+            )
+        except ExceptionGroup as group:
+            for e in group.exceptions:
+                logger.error(f"Error in scheduled stock data update: {e}")
+        except Exception as e:
+            logger.error(f"Error in scheduled stock data update: {e}")
+
+    async def _run_refresh_pipeline(
+        self,
+        symbols: List[str],
+        latest_dates: Dict[str, datetime],
+        fetched_at: Optional[Dict[str, datetime]] = None,
+    ):
+        """Refresh the given symbols through the fetch, parse and persist stages
+
+        `latest_dates` maps symbols to their newest stored bar, so each symbol
+        only fetches and writes the bars it is missing. `fetched_at` maps them
+        to their last fetch in exchange time, so final bars are not refetched.
+        Errors outside a worker's per-symbol handling stop every stage and
+        are raised together as an ExceptionGroup.
+        """
+        fetched_at = fetched_at or {}
+        concurrency = max(1, self.refresh_concurrency)
+        symbol_queue: asyncio.Queue = asyncio.Queue()
+        parse_queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+        persist_queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+        progress = {
+            "running": True,
+            "total": len(symbols),
+            "fetched": 0,
+            "parsed": 0,
+            "persisted": 0,
+            "skipped": 0,
+            "failed": 0,
+            "started_at": datetime.now().isoformat(),
+            "elapsed_seconds": 0.0,
+            "symbols_per_second": 0.0,
+        }
+        self.refresh_progress = progress
+        started = time_module.monotonic()
+        report_every = max(1, len(symbols) // 10)
 
-                if not symbols:
-                    logger.info("No stocks in database to update")
+        for symbol in symbols:
+            symbol_queue.put_nowait(symbol)
+
+        def update_throughput():
+            progress["elapsed_seconds"] = time_module.monotonic() - started
+            if progress["elapsed_seconds"] > 0:
+                progress["symbols_per_second"] = (
+                    progress["persisted"] / progress["elapsed_seconds"]
+                )
+
+        async def fetch_worker():
+            while True:
+                try:
+                    symbol = symbol_queue.get_nowait()
+                except asyncio.QueueEmpty:
                     return
+                try:
+                    outputsize = StockService.plan_history_fetch(
+                        latest_dates.get(symbol), fetched_at=fetched_at.get(symbol)
+                    )
+                    if outputsize is None:
+                        # The latest session's final bar is already stored
+                        progress["skipped"] += 1
+                        continue
+                    if ALPHA_VANTAGE_API_KEY == "demo":
+                        # Mock data is generated in the parse stage
+                        series_data, overview_data = None, None
+                    elif outputsize == "full":
+                        # Full histories are too big to pass between stages
+                        series_data = STREAM_FULL_HISTORY
+                        overview_data = await StockService.fetch_overview(symbol)
+                    else:
+                        series_data = await StockService.fetch_daily_series(
+                            symbol, outputsize
+                        )
+                        overview_data = await StockService.fetch_overview(symbol)
+                    progress["fetched"] += 1
+                    await parse_queue.put((symbol, series_data, overview_data))
+                except Exception as e:
+                    progress["failed"] += 1
+                    logger.error(f"Error fetching {symbol}: {e}")
 
-                logger.info(f"Updating {len(symbols)} stocks")
+        async def parse_worker():
+            while True:
+                item = await parse_queue.get()
+                if item is None:
+                    return
+                symbol, series_data, overview_data = item
+                try:
+                    if series_data is None:
+                        stock_data = StockService._generate_mock_stock_data(symbol)
+                        overview = StockService._get_mock_overview(symbol)
+                    elif series_data == STREAM_FULL_HISTORY:
+                        stock_data = None
+                        overview = StockService.parse_overview(overview_data)
+                    elif "Time Series (Daily)" not in series_data:
+                        message = (
+                            series_data.get("Error Message")
+                            or series_data.get("Information")
+                            or "unexpected response format"
+                        )
+                        raise ValueError(message)
+                    else:
+                        overview = StockService.parse_overview(overview_data)
+                        stock_data = StockData(
+                            symbol=symbol,
+                            name=overview.name if overview else symbol,
+                            prices=StockService.parse_daily_series(series_data),
+                            last_updated=datetime.now(),
+                        )
+                    progress["parsed"] += 1
+                    await persist_queue.put((symbol, stock_data, overview))
+                except Exception as e:
+                    progress["failed"] += 1
+                    logger.error(f"Error parsing {symbol}: {e}")
 
-                # Update each stock one by one
-                for symbol in symbols:
+        async def persist_worker():
+            # Cache rows are upserted in batches instead of one commit each
+            async with async_session() as db, tiered_cache.batch(db):
+                while True:
+                    item = await persist_queue.get()
+                    if item is None:
+                        return
+                    symbol, stock_data, overview = item
                     try:
-                        await StockService.get_stock_data(symbol, db)
-                        await StockService.get_stock_overview(symbol, db)
-                        await asyncio.sleep(0.5)  # Avoid hitting API rate limits
+                        if stock_data is None:
+                            header, prices = await StockService.ingest_daily_series(
+                                db, symbol, latest_dates.get(symbol), overview
+                            )
+                            if prices is None:
+                                raise ValueError(
+                                    header.get("Error Message")
+                                    or header.get("Information")
+                                    or "unexpected response format"
+                                )
+                            stock_data = StockData(
+                                symbol=symbol,
+                                name=overview.name if overview else symbol,
+                                prices=prices,
+                                last_updated=datetime.now(),
+                            )
+                        else:
+                            await StockService.persist_stock_data(
+                                db,
+                                stock_data,
+                                overview,
+                                latest_stored=latest_dates.get(symbol),
+                            )
+                            stock_data.prices = stock_data.prices[:COMPACT_BARS]
+                        await StockService.cache_stock_data(db, stock_data)
+                        if overview:
+                            await StockService.cache_stock_overview(db, overview)
+                        progress["persisted"] += 1
                     except Exception as e:
-                        logger.error(f"Error updating {symbol}: {e}")
+                        progress["failed"] += 1
+                        logger.error(f"Error saving {symbol}: {e}")
 
-                logger.info("Stock data update completed")
-        except Exception as e:
-            logger.error(f"Error in scheduled stock data update: {e}")
+                    done = (
+                        progress["persisted"] + progress["skipped"] + progress["failed"]
+                    )
+                    if done % report_every == 0:
+                        update_throughput()
+                        logger.info(
+                            f"Refresh progress: {done}/{progress['total']} "
+                            f"({progress['symbols_per_second']:.2f} symbols/s)"
+                        )
+
+        try:
+            # A worker failing outside its per-symbol handling cancels the
+            # others, so no stage is left blocked on a full queue
+            async with asyncio.TaskGroup() as workers:
+                fetchers = [
+                    workers.create_task(fetch_worker()) for _ in range(concurrency)
+                ]
+                parsers = [
+                    workers.create_task(parse_worker()) for _ in range(concurrency)
+                ]
+                persisters = [
+                    workers.create_task(persist_worker()) for _ in range(concurrency)
+                ]
+
+                # Drain each stage in order, then signal the next one to stop
+                await asyncio.gather(*fetchers)
+                for _ in parsers:
+                    await parse_queue.put(None)
+                await asyncio.gather(*parsers)
+                for _ in persisters:
+                    await persist_queue.put(None)
+                await asyncio.gather(*persisters)
+        finally:
+            progress["running"] = False
+            update_throughput()
 
     async def update_popular_stocks(self):
         """Update popular stock data"""
@@ -123,17 +399,31 @@ class SchedulerService:
             async with async_session() as db:
                 logger.info(f"Updating {len(self.popular_symbols)} popular stocks")
 
-                # Update each popular stock
-                for symbol in self.popular_symbols:
-                    try:
-                        # Force refresh by invalidating cache
-                        await CacheRepository.invalidate_cache(
-                            db, f"stock_data_{symbol}"
-                        )
-                        await StockService.get_stock_data(symbol, db)
-                        await asyncio.sleep(0.5)  # Avoid hitting API rate limits
-                    except Exception as e:
-                        logger.error(f"Error updating popular stock {symbol}: {e}")
+                # Update each popular stock, paced by the shared rate limiter;
+                # cache entries are replaced in place so readers never miss,
+                # and written together in one transaction
+                refreshed = []
+                async with tiered_cache.batch(db):
+                    for symbol in self.popular_symbols:
+                        try:
+                            stock_data = await StockService.refresh_stock_data(
+                                symbol, db, invalidate=False
+                            )
+                            if stock_data:
+                                refreshed.append(symbol)
+                        except Exception as e:
+                            logger.error(
+                                f"Error updating popular stock {symbol}: {e}"
+                            )
+
+                # Invalidating inside the batch would flush it once per symbol;
+                # entries derived from the old data are dropped in one pass
+                if refreshed:
+                    await StockService.invalidate_symbols(
+                        db,
+                        refreshed,
+                        keep=tuple(cache_keys.key("data", s) for s in refreshed),
+                    )
 
                 logger.info("Popular stocks update completed")
         except Exception as e:
@@ -143,12 +433,84 @@ class SchedulerService:
         """Clean up expired cache entries"""
         logger.info("Running scheduled cache cleanup")
         try:
-            async with async_session() as db:
+            async with write_session() as db:
                 deleted_count = await CacheRepository.clear_expired_cache(db)
+                deleted_count += tiered_cache.memory.clear_expired()
                 logger.info(f"Cleaned up {deleted_count} expired cache entries")
+
+                # Rows orphaned by namespace version bumps or old key formats
+                purged_count = await tiered_cache.purge_unreachable(db)
+                logger.info(f"Purged {purged_count} unreachable cache entries")
+
+                # Every server has replayed invalidations this old
+                await CacheRepository.prune_invalidations(
+                    db, datetime.now() - timedelta(days=1)
+                )
         except Exception as e:
             logger.error(f"Error in scheduled cache cleanup: {e}")
 
+    async def archive_price_history(self):
+        """Move closed bars beyond the hot window into the price archive"""
+        logger.info("Running scheduled price archive")
+        try:
+            async with async_session() as db:
+                result = await db.execute(select(Stock.id, Stock.symbol))
+                stocks = result.all()
+                latest_dates = await StockRepository.get_latest_price_dates(
+                    db, [symbol for _, symbol in stocks]
+                )
+
+                archived = 0
+                for stock_id, symbol in stocks:
+                    if symbol not in latest_dates:
+                        continue
+                    try:
+                        archived += await StockService.archive_price_history(
+                            db, stock_id, symbol, latest_dates[symbol]
+                        )
+                    except Exception as e:
+                        logger.error(f"Error archiving prices for {symbol}: {e}")
+
+                logger.info(f"Archived {archived} price bars")
+        except Exception as e:
+            logger.error(f"Error in scheduled price archive: {e}")
+
+    async def sync_cache(self):
+        """Apply cache invalidations made by other processes to the memory tier"""
+        try:
+            async with read_session() as db:
+                dropped = await tiered_cache.sync(db)
+            if dropped:
+                logger.info(f"Dropped {dropped} cache entries invalidated elsewhere")
+        except Exception as e:
+            logger.error(f"Error syncing cache invalidations: {e}")
+
+    async def sync_search_index(self):
+        """Add stocks stored or renamed by other processes to autocomplete"""
+        try:
+            async with read_session() as db:
+                await StockService.sync_search_index(db)
+        except Exception as e:
+            logger.error(f"Error syncing autocomplete index: {e}")
+
+    async def rebuild_search_index(self):
+        """Rebuild the autocomplete index from the stocks table"""
+        try:
+            async with read_session() as db:
+                indexed = await StockService.rebuild_search_index(db)
+            if indexed is not None:
+                logger.info(f"Indexed {indexed} stocks for autocomplete")
+        except Exception as e:
+            logger.error(f"Error rebuilding autocomplete index: {e}")
+
+    async def enforce_cache_budget(self):
+        """Evict least recently used cache entries beyond the cache budget"""
+        try:
+            async with write_session() as db:
+                await tiered_cache.enforce_budget(db)
+        except Exception as e:
+            logger.error(f"Error enforcing cache budget: {e}")
+
 
 # Global instance
 scheduler_service = SchedulerService()
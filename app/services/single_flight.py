@@ -0,0 +1,69 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one in-flight execution
+
+    The first caller for a key runs the work; callers arriving while it is in
+    flight wait for the same result instead of repeating the work.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: Dict[str, asyncio.Future] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run `fn` for `key`, or join the execution already in flight"""
+        self.calls += 1
+
+        while key in self._flights:
+            self.coalesced += 1
+            future = self._flights[key]
+            try:
+                # Shield so a cancelled waiter does not cancel the shared flight
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # Retry only if the leader was cancelled, not this waiter
+                if not future.cancelled():
+                    raise
+                self.coalesced -= 1
+
+        future = asyncio.get_running_loop().create_future()
+        # Mark the outcome as retrieved when nobody else is waiting on it
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._flights[key] = future
+        self.executions += 1
+
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._flights.pop(key, None)
+
+    def is_in_flight(self, key: str) -> bool:
+        """Check whether an execution for `key` is running"""
+        return key in self._flights
+
+    def stats(self) -> Dict[str, Any]:
+        """Get counters for this single-flight group"""
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._flights),
+        }
@@ -1,25 +1,77 @@
+import asyncio
 import json
 import logging
 import os
 import random
+import re
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
 
+import aiohttp
 import pandas as pd
-import requests
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.database import get_db
-from app.models.stock import StockData, StockOverview, StockPrice
-from app.services.db_service import CacheRepository, StockRepository
+from app.core.database import async_session, get_db
+from app.models.stock import PriceSeries, StockData, StockOverview
+from app.services.alpha_vantage_client import alpha_vantage_client
+from app.services.autocomplete_index import AutocompleteIndex, autocomplete_index
+from app.services.cache_keys import cache_keys, symbol_tag, symbol_tags
+from app.services.cache_service import tiered_cache
+from app.services.daily_series_parser import DailySeriesStreamParser
+from app.services.db_service import StockRepository
+from app.services.market_calendar import (
+    latest_session,
+    market_time,
+    session_close,
+    trading_days_between,
+)
+from app.services.market_data_generator import mock_price_series
+from app.services.price_archive import price_archive
+from app.services.rate_limiter import (
+    RateLimitExceeded,
+    background_priority,
+)
+from app.services.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
 # We'll use Alpha Vantage as our free stock API
 # You should get your own API key at https://www.alphavantage.co/support/#api-key
 ALPHA_VANTAGE_API_KEY = os.getenv("ALPHA_VANTAGE_API_KEY", "demo")
-BASE_URL = "https://www.alphavantage.co/query"
+BASE_URL = settings.ALPHA_VANTAGE_BASE_URL
+
+# Number of bars returned by a compact TIME_SERIES_DAILY request
+COMPACT_BARS = 100
+
+# Stock search results returned, and stored matches below which the API is
+# searched as well
+SEARCH_RESULTS = 10
+SEARCH_STORED_MIN = 5
+
+# Stocks updated this long before a search index sync are read again, so
+# writes committed after the previous sync's query are not missed
+SEARCH_SYNC_OVERLAP = timedelta(minutes=1)
+
+# Ticker symbols, optionally with an exchange or share class suffix
+# (e.g. "AAPL", "BRK.B", "TSCO.LON")
+SYMBOL_PATTERN = re.compile(r"[A-Z0-9]{1,10}(?:[.\-][A-Z0-9]{1,4})?")
+
+# Single-flight groups so concurrent misses for one key share a single fetch
+stock_data_flights = SingleFlight("stock_data")
+company_name_flights = SingleFlight("company_name")
+stock_overview_flights = SingleFlight("stock_overview")
+
+# Background refreshes of stale cache entries, at most one per symbol
+stock_data_refreshes = SingleFlight("stock_data_refresh")
+stock_overview_refreshes = SingleFlight("stock_overview_refresh")
+
+# Full history backfills of symbols first served a compact window
+history_backfills = SingleFlight("history_backfill")
+backfill_slots = asyncio.Semaphore(settings.HISTORY_BACKFILL_CONCURRENCY)
+
+# Background refresh and backfill tasks, referenced until they finish
+background_refreshes: Set[asyncio.Task] = set()
 
 # Mock company data for demo mode
 MOCK_COMPANIES = {
@@ -75,6 +127,12 @@ MOCK_COMPANIES = {
     },
 }
 
+# Prefix index over the mock companies, searched in demo mode
+mock_company_index = AutocompleteIndex()
+mock_company_index.build(
+    (symbol, company["name"]) for symbol, company in MOCK_COMPANIES.items()
+)
+
 
 class StockService:
     """Service for fetching and processing stock data with caching and database persistence"""
@@ -82,67 +140,8 @@ class StockService:
     @staticmethod
     def _generate_mock_stock_data(symbol: str) -> StockData:
         """Generate mock stock data for demo purposes"""
-        logger.info(f"Generating mock data for {symbol}")
-
-        # Base price and volatility for different stocks
-        base_prices = {
-            "AAPL": 175.0,
-            "MSFT": 390.0,
-            "GOOGL": 147.0,
-            "AMZN": 182.0,
-            "TSLA": 172.0,
-            "META": 485.0,
-            "NVDA": 880.0,
-            "JPM": 196.0,
-            "V": 275.0,
-            "WMT": 60.0,
-        }
-
-        # Default base price for unknown symbols
-        base_price = base_prices.get(symbol, 100.0)
-        volatility = base_price * 0.02  # 2% volatility
-
-        # Generate 30 days of price data
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=30)
-        current_date = start_date
-        prices = []
-
-        current_price = base_price
-        while current_date <= end_date:
-            # Skip weekends (simple approach)
-            if current_date.weekday() < 5:  # 0-4 is Monday-Friday
-                # Random price movement
-                daily_volatility = random.uniform(-volatility, volatility)
-                open_price = current_price
-                close_price = round(open_price + daily_volatility, 2)
-                high_price = round(
-                    max(open_price, close_price) + random.uniform(0, volatility * 0.5),
-                    2,
-                )
-                low_price = round(
-                    min(open_price, close_price) - random.uniform(0, volatility * 0.5),
-                    2,
-                )
-                volume = int(random.uniform(5000000, 50000000))
-
-                prices.append(
-                    StockPrice(
-                        date=current_date,
-                        open=open_price,
-                        high=high_price,
-                        low=low_price,
-                        close=close_price,
-                        volume=volume,
-                    )
-                )
-
-                current_price = close_price
-
-            current_date += timedelta(days=1)
-
-        # Sort prices by date (newest first)
-        prices.sort(key=lambda x: x.date, reverse=True)
+        # The series is deterministic and memoized per symbol and day
+        prices = mock_price_series(symbol, datetime.now().date())
 
         # Get company name from mock data or use symbol
         company_info = MOCK_COMPANIES.get(symbol, {"name": f"{symbol} Inc."})
@@ -154,11 +153,214 @@ class StockService:
             last_updated=datetime.now(),
         )
 
+    @staticmethod
+    def normalize_symbol(symbol: str) -> Optional[str]:
+        """Uppercase a ticker symbol, returning None if it is not a valid one"""
+        symbol = symbol.strip().upper()
+        return symbol if SYMBOL_PATTERN.fullmatch(symbol) else None
+
+    @staticmethod
+    async def invalidate_symbol(
+        db: AsyncSession,
+        symbol: str,
+        keep: Tuple[str, ...] = (),
+        broadcast: bool = False,
+    ) -> int:
+        """Drop every cache entry derived from a symbol, except the `keep` keys
+
+        With `broadcast`, running servers also drop the entries from memory.
+        """
+        return await StockService.invalidate_symbols(db, [symbol], keep, broadcast)
+
+    @staticmethod
+    async def invalidate_symbols(
+        db: AsyncSession,
+        symbols: List[str],
+        keep: Tuple[str, ...] = (),
+        broadcast: bool = False,
+    ) -> int:
+        """Drop every cache entry derived from any of the symbols in one pass"""
+        return await tiered_cache.invalidate_tags(
+            db, [symbol_tag(symbol) for symbol in symbols], keep, broadcast=broadcast
+        )
+
+    @staticmethod
+    async def _get_negative(db: AsyncSession, cache_key: str) -> Optional[Dict]:
+        """Get the recorded failure for a cache key while its TTL lasts"""
+        cached = await tiered_cache.get(
+            db, cache_keys.key("negative", cache_key), json.loads
+        )
+        return cached[0] if cached else None
+
+    @staticmethod
+    async def _cache_negative(
+        db: AsyncSession, cache_key: str, symbol: str, error_class: str, message: str
+    ):
+        """Remember a failed fetch so repeats skip the upstream for a while
+
+        The TTL depends on the error class, so invalid symbols stay blocked
+        much longer than transient upstream failures.
+        """
+        ttl = settings.NEGATIVE_CACHE_TTL_SECONDS.get(error_class, 0)
+        if ttl <= 0:
+            return
+        entry = {"error": error_class, "message": str(message)[:200]}
+        await tiered_cache.set(
+            db,
+            cache_keys.key("negative", cache_key),
+            entry,
+            entry,
+            expire_seconds=ttl,
+            tags=[symbol_tag(symbol)],
+        )
+
+    @staticmethod
+    def _error_class(error: Exception) -> Optional[str]:
+        """Classify an exception raised by an upstream fetch for negative caching"""
+        if isinstance(error, RateLimitExceeded):
+            return "rate_limited"
+        if isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError)):
+            return "upstream_error"
+        return None
+
     @staticmethod
     async def get_stock_data(
         symbol: str, db: AsyncSession = None
     ) -> Optional[StockData]:
         """Fetch stock data for a given symbol, using cache if available"""
+        return await stock_data_flights.do(
+            symbol, lambda: StockService._get_stock_data(symbol, db)
+        )
+
+    @staticmethod
+    async def get_stock_data_json(
+        symbol: str, db: AsyncSession = None
+    ) -> Optional[bytes]:
+        """Get stock data for a symbol as a JSON response body
+
+        Cache hits return the stored body without decoding it.
+        """
+        body = await StockService._get_cached_body(
+            db,
+            cache_keys.key("data", symbol),
+            symbol,
+            stock_data_refreshes,
+            StockService.refresh_stock_data,
+        )
+        if body is not None:
+            return body
+
+        stock_data = await StockService.get_stock_data(symbol, db)
+        return stock_data.model_dump_json().encode() if stock_data else None
+
+    @staticmethod
+    async def _get_cached_body(
+        db: AsyncSession,
+        cache_key: str,
+        symbol: str,
+        refreshes: SingleFlight,
+        refresh: Callable[[str], Awaitable[Any]],
+    ) -> Optional[bytes]:
+        """Get a cached JSON body, revalidating it in the background if stale"""
+        if db is None:
+            return None
+        cached = await tiered_cache.get_raw(db, cache_key)
+        if cached is None:
+            return None
+
+        body, stale = cached
+        if stale:
+            StockService._revalidate_in_background(refreshes, symbol, refresh)
+        return body
+
+    @staticmethod
+    async def refresh_stock_data(
+        symbol: str, db: AsyncSession = None, invalidate: bool = True
+    ) -> Optional[StockData]:
+        """Rebuild the cached stock data for a symbol, replacing the entry in place
+
+        Runs at background priority and at most once per symbol at a time.
+        Other entries tagged with the symbol are dropped afterwards, unless
+        `invalidate` is False and the caller drops them itself, e.g. once for
+        a whole batch with invalidate_symbols().
+        """
+
+        async def refresh_with(session: AsyncSession):
+            stock_data = await StockService._get_stock_data(
+                symbol, session, force_refresh=True
+            )
+            if stock_data and invalidate:
+                # Entries derived from the old data go, the rewritten one stays
+                await StockService.invalidate_symbol(
+                    session, symbol, keep=(cache_keys.key("data", symbol),)
+                )
+            return stock_data
+
+        async def refresh():
+            with background_priority():
+                if db is not None:
+                    return await refresh_with(db)
+                async with async_session() as session:
+                    return await refresh_with(session)
+
+        return await stock_data_refreshes.do(symbol, refresh)
+
+    @staticmethod
+    def _revalidate_in_background(
+        flights: SingleFlight,
+        symbol: str,
+        refresh: Callable[[str], Awaitable[Any]],
+    ):
+        """Start a background refresh of a stale entry unless one is running"""
+        if flights.is_in_flight(symbol):
+            return
+        # Keep a reference so the task is not garbage collected mid-flight
+        task = asyncio.create_task(refresh(symbol))
+        background_refreshes.add(task)
+        task.add_done_callback(background_refreshes.discard)
+
+    @staticmethod
+    def _backfill_in_background(symbol: str, latest_stored: Optional[datetime]):
+        """Start streaming a symbol's full history unless a backfill is running
+
+        Backfills run at background priority, a few at a time, so requests
+        never wait for thousands of bars to be written.
+        """
+        if history_backfills.is_in_flight(symbol):
+            return
+
+        async def backfill():
+            async with backfill_slots:
+                with background_priority():
+                    async with async_session() as session:
+                        await StockService.ingest_daily_series(
+                            session, symbol, latest_stored
+                        )
+
+        async def run():
+            try:
+                await history_backfills.do(symbol, backfill)
+            except Exception as e:
+                logger.error(f"Error backfilling history for {symbol}: {e}")
+
+        # Keep a reference so the task is not garbage collected mid-flight
+        task = asyncio.create_task(run())
+        background_refreshes.add(task)
+        task.add_done_callback(background_refreshes.discard)
+
+    @staticmethod
+    async def _get_stock_data(
+        symbol: str, db: AsyncSession = None, force_refresh: bool = False
+    ) -> Optional[StockData]:
+        """Fetch stock data for a symbol without coalescing concurrent calls
+
+        With `force_refresh`, the cache is bypassed and stored prices are only
+        reused if they were fetched after the latest session closed. Failed
+        fetches are negatively cached, except during forced refreshes.
+        """
+        if not SYMBOL_PATTERN.fullmatch(symbol):
+            return None
+        cache_key = cache_keys.key("data", symbol)
         try:
             # Get database session if not provided
             session_provided = db is not None
@@ -167,40 +369,52 @@ class StockService:
                 db = await anext(db_gen)
 
             # Try to get data from cache first
-            cache_key = f"stock_data_{symbol}"
-            cached_data = await CacheRepository.get_cached_data(db, cache_key)
+            cached = (
+                None
+                if force_refresh
+                else await tiered_cache.get(
+                    db, cache_key, StockService._decode_stock_data
+                )
+            )
 
-            if cached_data:
-                logger.info(f"Using cached data for {symbol}")
-                # Parse cached data
-                stock_data_dict = json.loads(cached_data)
+            if cached:
+                stock_data, stale = cached
+                if stale:
+                    # Serve the stale copy now and refresh it behind the caller
+                    logger.info(f"Using stale cached data for {symbol}")
+                    StockService._revalidate_in_background(
+                        stock_data_refreshes, symbol, StockService.refresh_stock_data
+                    )
+                else:
+                    logger.info(f"Using cached data for {symbol}")
+                return stock_data
 
-                # Convert to StockData model
-                return StockService._dict_to_stock_data(stock_data_dict)
+            # Skip symbols whose fetch failed recently
+            if not force_refresh:
+                failure = await StockService._get_negative(db, cache_key)
+                if failure:
+                    logger.info(
+                        f"Skipping {symbol}, fetch failed recently ({failure['error']})"
+                    )
+                    return None
 
             # Check if we have this stock in our database
             db_stock = await StockRepository.get_stock_by_symbol(db, symbol)
 
             if db_stock:
                 # We have the stock, check if we have recent prices
-                db_prices = await StockRepository.get_stock_prices(
+                prices = await StockRepository.get_price_series(
                     db, db_stock.id, days=5
                 )
 
-                if db_prices and len(db_prices) > 0:
-                    # Convert database models to API models
-                    prices = [
-                        StockPrice(
-                            date=price.date,
-                            open=price.open,
-                            high=price.high,
-                            low=price.low,
-                            close=price.close,
-                            volume=price.volume,
-                        )
-                        for price in db_prices
-                    ]
-
+                if len(prices) > 0 and (
+                    not force_refresh
+                    or StockService.plan_history_fetch(
+                        prices[0].date,
+                        fetched_at=market_time(db_stock.last_updated),
+                    )
+                    is None
+                ):
                     # Create StockData object
                     stock_data = StockData(
                         symbol=db_stock.symbol,
@@ -210,12 +424,7 @@ class StockService:
                     )
 
                     # Cache this data for future use
-                    await CacheRepository.set_cached_data(
-                        db,
-                        cache_key,
-                        StockService._stock_data_to_dict(stock_data),
-                        expire_seconds=3600,  # Cache for 1 hour
-                    )
+                    await StockService.cache_stock_data(db, stock_data)
 
                     return stock_data
 
@@ -226,17 +435,7 @@ class StockService:
 
                 # Save to database
                 # Create a basic stock entry with mock data
-                mock_company = MOCK_COMPANIES.get(symbol, {})
-                overview = StockOverview(
-                    symbol=symbol,
-                    name=stock_data.name,
-                    sector=mock_company.get("sector"),
-                    industry=mock_company.get("industry"),
-                    market_cap=random.uniform(100000000, 2000000000000),
-                    pe_ratio=random.uniform(10, 30),
-                    dividend_yield=random.uniform(0, 0.03),
-                )
-
+                overview = StockService._get_mock_overview(symbol)
                 db_stock = await StockRepository.save_stock(db, overview)
 
                 # Save prices if we have a valid stock ID
@@ -246,12 +445,7 @@ class StockService:
                     )
 
                 # Cache this data
-                await CacheRepository.set_cached_data(
-                    db,
-                    cache_key,
-                    StockService._stock_data_to_dict(stock_data),
-                    expire_seconds=3600,  # Cache for 1 hour
-                )
+                await StockService.cache_stock_data(db, stock_data)
 
                 # Close session if we opened it
                 if not session_provided:
@@ -259,56 +453,57 @@ class StockService:
 
                 return stock_data
 
-            # If we get here, we need to fetch from the API
-            # Fetch daily stock prices
-            params = {
-                "function": "TIME_SERIES_DAILY",
-                "symbol": symbol,
-                "outputsize": "compact",
-                "apikey": ALPHA_VANTAGE_API_KEY,
-            }
-
-            logger.info(f"Fetching stock data for {symbol} from API")
-            response = requests.get(BASE_URL, params=params)
-            response.raise_for_status()
-            data = response.json()
+            # If we get here, we need to fetch from the API. The caller gets
+            # the compact window; a longer gap is backfilled afterwards
+            latest_stored = (
+                await StockRepository.get_latest_price_date(db, db_stock.id)
+                if db_stock
+                else None
+            )
+            backfill = StockService.plan_history_fetch(latest_stored) == "full"
+            data = await StockService.fetch_daily_series(symbol, "compact")
 
             if "Error Message" in data:
                 logger.error(f"Alpha Vantage API error: {data['Error Message']}")
+                if not force_refresh:
+                    await StockService._cache_negative(
+                        db, cache_key, symbol, "invalid_symbol", data["Error Message"]
+                    )
                 return None
 
             if "Information" in data:
+                # The upstream throttled us; made-up prices would be cached
+                # as real ones, so answer nothing until the budget recovers
                 logger.warning(f"Alpha Vantage API info: {data['Information']}")
-                # Fall back to mock data if we received information about demo key limitations
-                return StockService._generate_mock_stock_data(symbol)
+                if not force_refresh:
+                    await StockService._cache_negative(
+                        db, cache_key, symbol, "rate_limited", data["Information"]
+                    )
+                return None
 
             if "Time Series (Daily)" not in data:
                 logger.error(f"Unexpected API response format: {data}")
+                if not force_refresh:
+                    await StockService._cache_negative(
+                        db, cache_key, symbol, "unexpected_response", json.dumps(data)
+                    )
                 return None
 
             # Get company name from symbol lookup
             company_name = await StockService.get_company_name(symbol, db)
 
-            # Process time series data
-            time_series = data["Time Series (Daily)"]
-            prices = []
-
-            for date_str, daily_data in time_series.items():
-                try:
-                    price = StockPrice(
-                        date=datetime.strptime(date_str, "%Y-%m-%d"),
-                        open=float(daily_data["1. open"]),
-                        high=float(daily_data["2. high"]),
-                        low=float(daily_data["3. low"]),
-                        close=float(daily_data["4. close"]),
-                        volume=int(daily_data["5. volume"]),
-                    )
-                    prices.append(price)
-                except (ValueError, KeyError) as e:
-                    logger.warning(f"Error processing data point for {date_str}: {e}")
+            prices = StockService.parse_daily_series(data)
 
-            # Sort prices by date (newest first)
-            prices.sort(key=lambda x: x.date, reverse=True)
+            # Save to database
+            overview = await StockService.get_stock_overview(symbol, db)
+            await StockService.persist_stock_data(
+                db,
+                StockData(symbol=symbol, name=company_name or symbol, prices=prices),
+                overview,
+                latest_stored=latest_stored,
+            )
+            if backfill:
+                StockService._backfill_in_background(symbol, latest_stored)
 
             stock_data = StockData(
                 symbol=symbol,
@@ -316,30 +511,7 @@ class StockService:
                 prices=prices,
                 last_updated=datetime.now(),
             )
-
-            # Save to database
-            # First save/update stock info
-            overview = await StockService.get_stock_overview(symbol, db)
-            if overview:
-                db_stock = await StockRepository.save_stock(db, overview)
-            else:
-                # Create a basic stock entry if we don't have full overview
-                dummy_overview = StockOverview(
-                    symbol=symbol, name=company_name or symbol
-                )
-                db_stock = await StockRepository.save_stock(db, dummy_overview)
-
-            # Save prices if we have a valid stock ID
-            if db_stock and db_stock.id:
-                await StockRepository.save_stock_prices(db, db_stock.id, prices)
-
-            # Cache this data
-            await CacheRepository.set_cached_data(
-                db,
-                cache_key,
-                StockService._stock_data_to_dict(stock_data),
-                expire_seconds=3600,  # Cache for 1 hour
-            )
+            await StockService.cache_stock_data(db, stock_data)
 
             # Close session if we opened it
             if not session_provided:
@@ -349,14 +521,267 @@ class StockService:
 
         except Exception as e:
             logger.error(f"Error fetching stock data for {symbol}: {e}")
+            error_class = StockService._error_class(e)
+            if error_class and db and not force_refresh:
+                await StockService._cache_negative(
+                    db, cache_key, symbol, error_class, e
+                )
             # Close session if we opened it
             if not session_provided and db:
                 await db.close()
             return None
 
+    @staticmethod
+    def plan_history_fetch(
+        latest_stored: Optional[datetime],
+        now: Optional[datetime] = None,
+        fetched_at: Optional[datetime] = None,
+    ) -> Optional[str]:
+        """Choose the TIME_SERIES_DAILY output size needed to fill the history
+
+        Times are naive exchange times (see market_calendar.market_time);
+        `fetched_at` is when the symbol was last fetched. Returns "full" for a
+        first backfill or a gap wider than a compact response and "compact"
+        for a gap it covers. A stored bar for the latest session is fetched
+        again as "compact" so its close gets rewritten, unless it was fetched
+        after that session closed, in which case None is returned.
+        """
+        if latest_stored is None:
+            return "full"
+
+        now = now or market_time()
+        session = latest_session(now)
+        if latest_stored.date() >= session:
+            if fetched_at is not None and fetched_at >= session_close(session):
+                return None
+            return "compact"
+
+        missing_bars = trading_days_between(latest_stored.date(), session)
+        return "compact" if missing_bars < COMPACT_BARS else "full"
+
+    @staticmethod
+    async def fetch_daily_series(
+        symbol: str, outputsize: str = "compact"
+    ) -> Dict[str, Any]:
+        """Fetch the raw TIME_SERIES_DAILY payload for a symbol"""
+        params = {
+            "function": "TIME_SERIES_DAILY",
+            "symbol": symbol,
+            "outputsize": outputsize,
+            "apikey": ALPHA_VANTAGE_API_KEY,
+        }
+
+        logger.info(f"Fetching stock data ({outputsize}) for {symbol} from API")
+        return await alpha_vantage_client.query(params)
+
+    @staticmethod
+    def parse_daily_series(data: Dict[str, Any]) -> PriceSeries:
+        """Parse a TIME_SERIES_DAILY payload into prices, newest first"""
+        records = []
+
+        for date_str, daily_data in data["Time Series (Daily)"].items():
+            try:
+                records.append(
+                    (
+                        date_str,
+                        float(daily_data["1. open"]),
+                        float(daily_data["2. high"]),
+                        float(daily_data["3. low"]),
+                        float(daily_data["4. close"]),
+                        int(daily_data["5. volume"]),
+                    )
+                )
+            except (ValueError, KeyError) as e:
+                logger.warning(f"Error processing data point for {date_str}: {e}")
+
+        # Sort prices by date (newest first)
+        return PriceSeries.from_records(records).sorted(descending=True)
+
+    @staticmethod
+    async def ingest_daily_series(
+        db: AsyncSession,
+        symbol: str,
+        latest_stored: Optional[datetime] = None,
+        overview: Optional[StockOverview] = None,
+    ) -> Tuple[Dict[str, Any], Optional[PriceSeries]]:
+        """Stream a full TIME_SERIES_DAILY payload straight into the database
+
+        Bars are parsed incrementally and saved in chunks, so memory stays
+        bounded regardless of the history length. Parsed chunks pass through a
+        bounded queue to a separate writer task, so database writes never hold
+        up the socket reads unless the queue is full. Returns the payload's other
+        top-level keys (meta data or error notes) and the newest COMPACT_BARS
+        bars, or None instead of the bars if the payload had no time series.
+        """
+        params = {
+            "function": "TIME_SERIES_DAILY",
+            "symbol": symbol,
+            "outputsize": "full",
+            "apikey": ALPHA_VANTAGE_API_KEY,
+        }
+        parser = DailySeriesStreamParser(chunk_size=settings.STREAM_CHUNK_BARS)
+        recent: List[PriceSeries] = []
+        recent_count = 0
+        db_stock = None
+
+        async def save_chunk(bars: PriceSeries):
+            nonlocal db_stock, overview, recent_count
+            if db_stock is None:
+                # Only create the stock once the payload proves it exists
+                if overview is None:
+                    overview = await StockService.get_stock_overview(symbol, db)
+                if overview is None:
+                    company_name = await StockService.get_company_name(symbol, db)
+                    overview = StockOverview(
+                        symbol=symbol, name=company_name or symbol
+                    )
+                db_stock = await StockRepository.save_stock(db, overview)
+
+            if recent_count < COMPACT_BARS:
+                # Copy so the retained window does not pin the whole chunk
+                head = bars[: COMPACT_BARS - recent_count]
+                recent.append(PriceSeries.concat([head]))
+                recent_count += len(head)
+
+            if latest_stored is not None:
+                bars = bars.since(latest_stored)
+            if db_stock and db_stock.id and len(bars) > 0:
+                await StockRepository.save_stock_prices(db, db_stock.id, bars)
+
+        chunks: asyncio.Queue = asyncio.Queue(maxsize=settings.STREAM_QUEUE_CHUNKS)
+
+        async def read():
+            async for text in alpha_vantage_client.iter_text(params):
+                for bars in parser.feed(text):
+                    await chunks.put(bars)
+            for bars in parser.close():
+                await chunks.put(bars)
+            await chunks.put(None)
+
+        async def persist():
+            while (bars := await chunks.get()) is not None:
+                await save_chunk(bars)
+
+        logger.info(f"Streaming full history for {symbol} from API")
+        reader = asyncio.create_task(read())
+        writer = asyncio.create_task(persist())
+        try:
+            # Stop at the first failure on either side
+            done, _ = await asyncio.wait(
+                (reader, writer), return_when=asyncio.FIRST_EXCEPTION
+            )
+            for task in done:
+                task.result()
+        finally:
+            reader.cancel()
+            writer.cancel()
+
+        if not parser.has_series:
+            return parser.header, None
+
+        logger.info(f"Stored {parser.bar_count} bars for {symbol}")
+        return parser.header, PriceSeries.concat(recent).sorted(descending=True)
+
+    @staticmethod
+    async def fetch_overview(symbol: str) -> Dict[str, Any]:
+        """Fetch the raw OVERVIEW payload for a symbol"""
+        params = {
+            "function": "OVERVIEW",
+            "symbol": symbol,
+            "apikey": ALPHA_VANTAGE_API_KEY,
+        }
+
+        return await alpha_vantage_client.query(params)
+
+    @staticmethod
+    def parse_overview(data: Dict[str, Any]) -> Optional[StockOverview]:
+        """Parse an OVERVIEW payload, returning None if it has no company data"""
+        if not data or "Symbol" not in data:
+            return None
+
+        return StockOverview(
+            symbol=data["Symbol"],
+            name=data["Name"],
+            sector=data.get("Sector"),
+            industry=data.get("Industry"),
+            market_cap=float(data.get("MarketCapitalization", 0))
+            if data.get("MarketCapitalization")
+            else None,
+            pe_ratio=float(data.get("PERatio")) if data.get("PERatio") else None,
+            dividend_yield=float(data.get("DividendYield", 0))
+            if data.get("DividendYield")
+            else None,
+        )
+
+    @staticmethod
+    async def persist_stock_data(
+        db: AsyncSession,
+        stock_data: StockData,
+        overview: Optional[StockOverview] = None,
+        latest_stored: Optional[datetime] = None,
+    ):
+        """Save stock info and prices to the database
+
+        When `latest_stored` is given, only bars from that date on are written.
+        The newest stored bar is rewritten because it may have been saved
+        before the trading day closed.
+        """
+        # First save/update stock info
+        if overview:
+            db_stock = await StockRepository.save_stock(db, overview)
+        else:
+            # Create a basic stock entry if we don't have full overview
+            dummy_overview = StockOverview(
+                symbol=stock_data.symbol, name=stock_data.name
+            )
+            db_stock = await StockRepository.save_stock(db, dummy_overview)
+
+        prices = stock_data.prices
+        if latest_stored is not None:
+            prices = prices.since(latest_stored)
+
+        # Save prices if we have a valid stock ID
+        if db_stock and db_stock.id and len(prices) > 0:
+            await StockRepository.save_stock_prices(db, db_stock.id, prices)
+
+    @staticmethod
+    async def cache_stock_data(db: AsyncSession, stock_data: StockData):
+        """Cache stock data under its symbol"""
+        await tiered_cache.set(
+            db,
+            cache_keys.key("data", stock_data.symbol),
+            stock_data,
+            StockService._stock_data_to_dict(stock_data),
+            expire_seconds=settings.STOCK_DATA_HARD_TTL_SECONDS,
+            stale_seconds=settings.STOCK_DATA_SOFT_TTL_SECONDS,
+            tags=[symbol_tag(stock_data.symbol)],
+        )
+
+    @staticmethod
+    async def cache_stock_overview(db: AsyncSession, overview: StockOverview):
+        """Cache a company overview under its symbol"""
+        await tiered_cache.set(
+            db,
+            cache_keys.key("overview", overview.symbol),
+            overview,
+            overview.dict(),
+            expire_seconds=settings.STOCK_OVERVIEW_HARD_TTL_SECONDS,
+            stale_seconds=settings.STOCK_OVERVIEW_SOFT_TTL_SECONDS,
+            tags=[symbol_tag(overview.symbol)],
+        )
+
     @staticmethod
     async def get_company_name(symbol: str, db: AsyncSession = None) -> Optional[str]:
         """Get company name from symbol, using cache if available"""
+        return await company_name_flights.do(
+            symbol, lambda: StockService._get_company_name(symbol, db)
+        )
+
+    @staticmethod
+    async def _get_company_name(
+        symbol: str, db: AsyncSession = None
+    ) -> Optional[str]:
+        """Get company name for a symbol without coalescing concurrent calls"""
         try:
             # Get database session if not provided
             session_provided = db is not None
@@ -365,22 +790,24 @@ class StockService:
                 db = await anext(db_gen)
 
             # Try to get from cache
-            cache_key = f"company_name_{symbol}"
-            cached_data = await CacheRepository.get_cached_data(db, cache_key)
+            cache_key = cache_keys.key("company_name", symbol)
+            cached = await tiered_cache.get(db, cache_key, json.loads)
 
-            if cached_data:
+            if cached:
                 # Return cached name
-                return json.loads(cached_data)
+                return cached[0]
 
             # Check if we have this stock in database
             db_stock = await StockRepository.get_stock_by_symbol(db, symbol)
             if db_stock and db_stock.name:
                 # Cache this for future use
-                await CacheRepository.set_cached_data(
+                await tiered_cache.set(
                     db,
                     cache_key,
-                    json.dumps(db_stock.name),
+                    db_stock.name,
+                    db_stock.name,
                     expire_seconds=86400,  # Cache for 24 hours
+                    tags=[symbol_tag(symbol)],
                 )
                 return db_stock.name
 
@@ -391,11 +818,13 @@ class StockService:
                 company_name = company_info["name"]
 
                 # Cache the name
-                await CacheRepository.set_cached_data(
+                await tiered_cache.set(
                     db,
                     cache_key,
-                    json.dumps(company_name),
+                    company_name,
+                    company_name,
                     expire_seconds=86400,  # Cache for 24 hours
+                    tags=[symbol_tag(symbol)],
                 )
 
                 # Close session if we opened it
@@ -411,16 +840,15 @@ class StockService:
                 "apikey": ALPHA_VANTAGE_API_KEY,
             }
 
-            response = requests.get(BASE_URL, params=params)
-            response.raise_for_status()
-            data = response.json()
+            data = await alpha_vantage_client.query(params)
 
             # Check for API limitations message
             if "Information" in data:
+                # Throttled; a made-up name would be stored with the stock
                 logger.warning(f"Alpha Vantage API info: {data['Information']}")
-                # Fall back to mock data
-                company_info = MOCK_COMPANIES.get(symbol, {"name": f"{symbol} Inc."})
-                return company_info["name"]
+                if not session_provided:
+                    await db.close()
+                return None
 
             name = None
             if "bestMatches" in data and data["bestMatches"]:
@@ -431,11 +859,13 @@ class StockService:
 
             if name:
                 # Cache the name
-                await CacheRepository.set_cached_data(
+                await tiered_cache.set(
                     db,
                     cache_key,
-                    json.dumps(name),
+                    name,
+                    name,
                     expire_seconds=86400,  # Cache for 24 hours
+                    tags=[symbol_tag(symbol)],
                 )
 
             # Close session if we opened it
@@ -456,6 +886,72 @@ class StockService:
         symbol: str, db: AsyncSession = None
     ) -> Optional[StockOverview]:
         """Get company overview information, using cache if available"""
+        return await stock_overview_flights.do(
+            symbol, lambda: StockService._get_stock_overview(symbol, db)
+        )
+
+    @staticmethod
+    async def get_stock_overview_json(
+        symbol: str, db: AsyncSession = None
+    ) -> Optional[bytes]:
+        """Get the company overview for a symbol as a JSON response body
+
+        Cache hits return the stored body without decoding it.
+        """
+        body = await StockService._get_cached_body(
+            db,
+            cache_keys.key("overview", symbol),
+            symbol,
+            stock_overview_refreshes,
+            StockService.refresh_stock_overview,
+        )
+        if body is not None:
+            return body
+
+        overview = await StockService.get_stock_overview(symbol, db)
+        return overview.model_dump_json().encode() if overview else None
+
+    @staticmethod
+    async def refresh_stock_overview(
+        symbol: str, db: AsyncSession = None
+    ) -> Optional[StockOverview]:
+        """Re-fetch the company overview for a symbol and replace its cache entry
+
+        Runs at background priority and at most once per symbol at a time.
+        """
+
+        async def refresh_with(session: AsyncSession):
+            overview = await StockService._get_stock_overview(
+                symbol, session, force_refresh=True
+            )
+            if overview:
+                # Names in search results and company_name entries may change
+                await StockService.invalidate_symbol(
+                    session, symbol, keep=(cache_keys.key("overview", symbol),)
+                )
+            return overview
+
+        async def refresh():
+            with background_priority():
+                if db is not None:
+                    return await refresh_with(db)
+                async with async_session() as session:
+                    return await refresh_with(session)
+
+        return await stock_overview_refreshes.do(symbol, refresh)
+
+    @staticmethod
+    async def _get_stock_overview(
+        symbol: str, db: AsyncSession = None, force_refresh: bool = False
+    ) -> Optional[StockOverview]:
+        """Get company overview for a symbol without coalescing concurrent calls
+
+        With `force_refresh`, the cache and database are bypassed. Failed
+        fetches are negatively cached, except during forced refreshes.
+        """
+        if not SYMBOL_PATTERN.fullmatch(symbol):
+            return None
+        cache_key = cache_keys.key("overview", symbol)
         try:
             # Get database session if not provided
             session_provided = db is not None
@@ -464,16 +960,37 @@ class StockService:
                 db = await anext(db_gen)
 
             # Try to get from cache
-            cache_key = f"stock_overview_{symbol}"
-            cached_data = await CacheRepository.get_cached_data(db, cache_key)
+            cached = (
+                None
+                if force_refresh
+                else await tiered_cache.get(
+                    db, cache_key, lambda body: StockOverview(**json.loads(body))
+                )
+            )
+
+            if cached:
+                overview, stale = cached
+                if stale:
+                    # Serve the stale copy now and refresh it behind the caller
+                    StockService._revalidate_in_background(
+                        stock_overview_refreshes,
+                        symbol,
+                        StockService.refresh_stock_overview,
+                    )
+                return overview
 
-            if cached_data:
-                # Parse cached data into StockOverview
-                overview_dict = json.loads(cached_data)
-                return StockOverview(**overview_dict)
+            # Skip symbols whose fetch failed recently
+            if not force_refresh:
+                failure = await StockService._get_negative(db, cache_key)
+                if failure:
+                    return None
 
             # If not in cache, check if we have in database
-            db_stock = await StockRepository.get_stock_by_symbol(db, symbol)
+            db_stock = (
+                None
+                if force_refresh
+                else await StockRepository.get_stock_by_symbol(db, symbol)
+            )
             if db_stock and all(
                 [db_stock.sector, db_stock.industry, db_stock.market_cap]
             ):
@@ -489,37 +1006,17 @@ class StockService:
                 )
 
                 # Cache this data
-                await CacheRepository.set_cached_data(
-                    db,
-                    cache_key,
-                    json.dumps(overview.dict()),
-                    expire_seconds=86400,  # Cache for 24 hours
-                )
+                await StockService.cache_stock_overview(db, overview)
 
                 return overview
 
             # Check if we're using the demo API key
             if ALPHA_VANTAGE_API_KEY == "demo":
                 # Generate mock overview data
-                mock_company = MOCK_COMPANIES.get(symbol, {})
-                company_name = mock_company.get("name", f"{symbol} Inc.")
-                overview = StockOverview(
-                    symbol=symbol,
-                    name=company_name,
-                    sector=mock_company.get("sector", "Technology"),
-                    industry=mock_company.get("industry", "Software"),
-                    market_cap=random.uniform(100000000, 2000000000000),
-                    pe_ratio=random.uniform(10, 30),
-                    dividend_yield=random.uniform(0, 0.03),
-                )
+                overview = StockService._get_mock_overview(symbol)
 
                 # Cache the overview
-                await CacheRepository.set_cached_data(
-                    db,
-                    cache_key,
-                    json.dumps(overview.dict()),
-                    expire_seconds=86400,  # Cache for 24 hours
-                )
+                await StockService.cache_stock_overview(db, overview)
 
                 # Close session if we opened it
                 if not session_provided:
@@ -528,47 +1025,35 @@ class StockService:
                 return overview
 
             # Fetch from API if not in cache or database
-            params = {
-                "function": "OVERVIEW",
-                "symbol": symbol,
-                "apikey": ALPHA_VANTAGE_API_KEY,
-            }
-
-            response = requests.get(BASE_URL, params=params)
-            response.raise_for_status()
-            data = response.json()
+            data = await StockService.fetch_overview(symbol)
 
             # Check for API limitations message
             if "Information" in data:
+                # Throttled; answer nothing rather than a made-up overview
                 logger.warning(f"Alpha Vantage API info: {data['Information']}")
-                # Fall back to mock data
-                return StockService._get_mock_overview(symbol)
+                if not force_refresh:
+                    await StockService._cache_negative(
+                        db, cache_key, symbol, "rate_limited", data["Information"]
+                    )
+                if not session_provided:
+                    await db.close()
+                return None
 
-            if not data or "Symbol" not in data:
+            overview = StockService.parse_overview(data)
+            if not overview:
                 logger.error(f"Failed to get overview for {symbol}")
+                if not force_refresh:
+                    # An empty payload means the upstream has no such company
+                    error_class = (
+                        "invalid_symbol" if "Error Message" in data else "not_found"
+                    )
+                    await StockService._cache_negative(
+                        db, cache_key, symbol, error_class, json.dumps(data)
+                    )
                 return None
 
-            overview = StockOverview(
-                symbol=data["Symbol"],
-                name=data["Name"],
-                sector=data.get("Sector"),
-                industry=data.get("Industry"),
-                market_cap=float(data.get("MarketCapitalization", 0))
-                if data.get("MarketCapitalization")
-                else None,
-                pe_ratio=float(data.get("PERatio")) if data.get("PERatio") else None,
-                dividend_yield=float(data.get("DividendYield", 0))
-                if data.get("DividendYield")
-                else None,
-            )
-
             # Cache the overview
-            await CacheRepository.set_cached_data(
-                db,
-                cache_key,
-                json.dumps(overview.dict()),
-                expire_seconds=86400,  # Cache for 24 hours
-            )
+            await StockService.cache_stock_overview(db, overview)
 
             # Close session if we opened it
             if not session_provided:
@@ -578,6 +1063,11 @@ class StockService:
 
         except Exception as e:
             logger.error(f"Error fetching stock overview for {symbol}: {e}")
+            error_class = StockService._error_class(e)
+            if error_class and db and not force_refresh:
+                await StockService._cache_negative(
+                    db, cache_key, symbol, error_class, e
+                )
             # Close session if we opened it
             if not session_provided and db:
                 await db.close()
@@ -648,8 +1138,9 @@ class StockService:
                         )
 
             # If we still have no results, generate mock data for all symbols
-            # This ensures we always return something useful, especially with demo API key
-            if not formatted_results:
+            # This ensures we always return something useful with the demo API
+            # key; live mode never passes made-up prices off as real ones
+            if not formatted_results and ALPHA_VANTAGE_API_KEY == "demo":
                 logger.warning(
                     "No stocks found in database or API, generating mock data"
                 )
@@ -679,6 +1170,8 @@ class StockService:
                 await db.close()
 
             # Generate mock data as fallback when an exception occurs
+            if ALPHA_VANTAGE_API_KEY != "demo":
+                return []
             logger.warning("Generating mock data due to exception")
             formatted_results = []
             for symbol in symbols:
@@ -696,11 +1189,45 @@ class StockService:
 
             return formatted_results
 
+    @staticmethod
+    def _search_result(symbol: str, name: str) -> Dict[str, Any]:
+        """Format a stored or mock stock as a search result"""
+        return {
+            "symbol": symbol,
+            "name": name,
+            "type": "Common Stock",  # Default type
+            "region": "United States",  # Default region
+        }
+
+    @staticmethod
+    def _search_mock_companies(query: str) -> List[Dict[str, Any]]:
+        """Search the mock companies used in demo mode"""
+        return [
+            StockService._search_result(symbol, name)
+            for symbol, name in mock_company_index.search(
+                query, limit=len(MOCK_COMPANIES)
+            )
+        ]
+
     @staticmethod
     async def search_stocks(
         query: str, db: AsyncSession = None
     ) -> List[Dict[str, Any]]:
-        """Search for stocks by symbol or name, using database first"""
+        """Search for stocks by symbol or name, using stored stocks first
+
+        Once built, the in-process autocomplete index stands in for the
+        database search. save_stock keeps it current within this process,
+        and the scheduler's index syncs add stocks stored by scripts, other
+        workers and other nodes.
+        """
+        if autocomplete_index.ready:
+            results = [
+                StockService._search_result(symbol, name)
+                for symbol, name in autocomplete_index.search(query, SEARCH_RESULTS)
+            ]
+            if len(results) >= SEARCH_STORED_MIN:
+                return results
+
         try:
             # Get database session if not provided
             session_provided = db is not None
@@ -708,58 +1235,39 @@ class StockService:
                 db_gen = get_db()
                 db = await anext(db_gen)
 
-            # Try to search in database first
-            db_stocks = await StockRepository.search_stocks(db, query)
-
-            results = []
-
-            if db_stocks:
-                # Format database results
-                for stock in db_stocks:
-                    results.append(
-                        {
-                            "symbol": stock.symbol,
-                            "name": stock.name,
-                            "type": "Common Stock",  # Default type
-                            "region": "United States",  # Default region
-                        }
-                    )
+            if not autocomplete_index.ready:
+                # Search in database first
+                db_stocks = await StockRepository.search_stocks(
+                    db, query, SEARCH_RESULTS
+                )
+                results = [
+                    StockService._search_result(stock.symbol, stock.name)
+                    for stock in db_stocks
+                ]
 
             # If we don't have enough results, search in API
-            if len(results) < 5:
+            if len(results) < SEARCH_STORED_MIN:
                 # Cache key for this search
-                cache_key = f"stock_search_{query}"
-                cached_data = await CacheRepository.get_cached_data(db, cache_key)
+                cache_key = cache_keys.key("search", query)
+                cached = await tiered_cache.get(db, cache_key, json.loads)
 
-                if cached_data:
+                if cached:
                     # Use cached search results
-                    api_results = json.loads(cached_data)
+                    api_results = cached[0]
                 else:
                     # Check if we're using the demo API key
                     if ALPHA_VANTAGE_API_KEY == "demo":
                         # Generate mock search results
-                        api_results = []
-                        query_upper = query.upper()
-                        for symbol, company in MOCK_COMPANIES.items():
-                            if (
-                                query_upper in symbol
-                                or query.lower() in company["name"].lower()
-                            ):
-                                api_results.append(
-                                    {
-                                        "symbol": symbol,
-                                        "name": company["name"],
-                                        "type": "Common Stock",
-                                        "region": "United States",
-                                    }
-                                )
+                        api_results = StockService._search_mock_companies(query)
 
                         # Cache these results
-                        await CacheRepository.set_cached_data(
+                        await tiered_cache.set(
                             db,
                             cache_key,
-                            json.dumps(api_results),
+                            api_results,
+                            api_results,
                             expire_seconds=3600,  # Cache for 1 hour
+                            tags=symbol_tags([r["symbol"] for r in api_results]),
                         )
                     else:
                         # Search using API
@@ -769,31 +1277,15 @@ class StockService:
                             "apikey": ALPHA_VANTAGE_API_KEY,
                         }
 
-                        response = requests.get(BASE_URL, params=params)
-                        response.raise_for_status()
-                        data = response.json()
+                        data = await alpha_vantage_client.query(params)
 
                         # Check for API limitations message
                         if "Information" in data:
+                            # Throttled; keep the stored matches only
                             logger.warning(
                                 f"Alpha Vantage API info: {data['Information']}"
                             )
-                            # Generate mock search results instead
                             api_results = []
-                            query_upper = query.upper()
-                            for symbol, company in MOCK_COMPANIES.items():
-                                if (
-                                    query_upper in symbol
-                                    or query.lower() in company["name"].lower()
-                                ):
-                                    api_results.append(
-                                        {
-                                            "symbol": symbol,
-                                            "name": company["name"],
-                                            "type": "Common Stock",
-                                            "region": "United States",
-                                        }
-                                    )
                         else:
                             api_results = []
                             if "bestMatches" in data:
@@ -807,19 +1299,23 @@ class StockService:
                                         }
                                     )
 
-                        # Cache these results
-                        await CacheRepository.set_cached_data(
-                            db,
-                            cache_key,
-                            json.dumps(api_results),
-                            expire_seconds=3600,  # Cache for 1 hour
-                        )
+                            # Cache these results
+                            await tiered_cache.set(
+                                db,
+                                cache_key,
+                                api_results,
+                                api_results,
+                                expire_seconds=3600,  # Cache for 1 hour
+                                tags=symbol_tags(
+                                    [r["symbol"] for r in api_results]
+                                ),
+                            )
 
-                # Merge API results with database results
+                # Merge API results with stored results
                 # Avoid duplicates by symbol
-                db_symbols = {stock.symbol for stock in db_stocks}
+                stored_symbols = {result["symbol"] for result in results}
                 for api_result in api_results:
-                    if api_result["symbol"] not in db_symbols:
+                    if api_result["symbol"] not in stored_symbols:
                         results.append(api_result)
 
             # Close session if we opened it
@@ -835,26 +1331,115 @@ class StockService:
                 await db.close()
             return []
 
+    @staticmethod
+    async def rebuild_search_index(db: AsyncSession) -> Optional[int]:
+        """Rebuild the autocomplete index from the stocks table
+
+        Returns the number of stocks indexed, or None if they could not be read.
+        """
+        started = datetime.now()
+        stock_names = await StockRepository.get_stock_names(db)
+        if stock_names is None:
+            return None
+        autocomplete_index.build(stock_names)
+        autocomplete_index.synced_at = started
+        return len(stock_names)
+
+    @staticmethod
+    async def sync_search_index(db: AsyncSession) -> int:
+        """Add stocks stored or renamed since the last sync to the index
+
+        Reads only the stocks updated since then, so it is cheap enough to
+        run every few seconds. Returns the number of stocks read.
+        """
+        if autocomplete_index.synced_at is None:
+            return 0
+        started = datetime.now()
+        changed = await StockRepository.get_stock_names(
+            db, autocomplete_index.synced_at - SEARCH_SYNC_OVERLAP
+        )
+        if changed is None:
+            return 0
+        for symbol, name in changed:
+            autocomplete_index.add(symbol, name)
+        autocomplete_index.synced_at = started
+        return len(changed)
+
+    @staticmethod
+    def single_flight_stats() -> Dict[str, Dict[str, Any]]:
+        """Get coalescing counters for each single-flight group"""
+        return {
+            group.name: group.stats()
+            for group in (
+                stock_data_flights,
+                company_name_flights,
+                stock_overview_flights,
+                stock_data_refreshes,
+                stock_overview_refreshes,
+                history_backfills,
+            )
+        }
+
+    @staticmethod
+    async def get_price_history(
+        symbol: str, db: AsyncSession, days: Optional[int] = None
+    ) -> Optional[StockData]:
+        """Get stored prices for a symbol, archived bars included, newest first
+
+        The recent window comes from the database and older bars from the
+        memory-mapped archive, joined with one array copy.
+        """
+        db_stock = await StockRepository.get_stock_by_symbol(db, symbol)
+        if not db_stock:
+            return None
+
+        recent = await StockRepository.get_price_series(db, db_stock.id, days=days)
+        # The database wins where both hold a date, e.g. after a re-backfill
+        archived = price_archive.read(
+            symbol,
+            since=datetime.now() - timedelta(days=days) if days else None,
+            before=recent.dates[-1].item() if len(recent) else None,
+        )
+        prices = PriceSeries.concat([recent, archived]) if len(archived) else recent
+
+        return StockData(
+            symbol=db_stock.symbol,
+            name=db_stock.name,
+            prices=prices,
+            last_updated=db_stock.last_updated,
+        )
+
+    @staticmethod
+    async def archive_price_history(
+        db: AsyncSession, stock_id: int, symbol: str, latest_stored: datetime
+    ) -> int:
+        """Move a symbol's bars older than the hot window into the archive
+
+        The window is PRICE_ARCHIVE_HOT_DAYS before the newest stored bar, so
+        the newest bars always stay in the database for fetch planning.
+        Returns the number of moved bars.
+        """
+        if not price_archive.enabled:
+            return 0
+        cutoff = latest_stored - timedelta(days=settings.PRICE_ARCHIVE_HOT_DAYS)
+        closed = await StockRepository.get_price_series(db, stock_id, before=cutoff)
+        if len(closed) == 0:
+            return 0
+
+        # Delete only once the bars are safely in the archive file, and only
+        # the archived ones: a bar stored after the read stays in the database
+        await asyncio.to_thread(price_archive.write, symbol, closed)
+        return await StockRepository.delete_prices(
+            db, stock_id, closed.dates.tolist()
+        )
+
     @staticmethod
     def process_to_dataframe(stock_data: StockData) -> pd.DataFrame:
         """Convert stock data to pandas DataFrame for easier processing"""
         if not stock_data or not stock_data.prices:
             return pd.DataFrame()
 
-        data = [
-            {
-                "date": price.date,
-                "open": price.open,
-                "high": price.high,
-                "low": price.low,
-                "close": price.close,
-                "volume": price.volume,
-            }
-            for price in stock_data.prices
-        ]
-
-        df = pd.DataFrame(data)
-        df.set_index("date", inplace=True)
+        df = stock_data.prices.to_dataframe()
         df.sort_index(inplace=True)  # Sort by date in ascending order
 
         return df
@@ -865,36 +1450,21 @@ class StockService:
         return {
             "symbol": stock_data.symbol,
             "name": stock_data.name,
-            "prices": [
-                {
-                    "date": price.date.isoformat(),
-                    "open": price.open,
-                    "high": price.high,
-                    "low": price.low,
-                    "close": price.close,
-                    "volume": price.volume,
-                }
-                for price in stock_data.prices
-            ],
+            "prices": stock_data.prices.to_json_rows(),
             "last_updated": stock_data.last_updated.isoformat(),
         }
 
+    @staticmethod
+    def _decode_stock_data(body: bytes) -> StockData:
+        """Convert cached JSON to a StockData model"""
+        return StockService._dict_to_stock_data(json.loads(body))
+
     @staticmethod
     def _dict_to_stock_data(data: Dict[str, Any]) -> StockData:
         """Convert dictionary to StockData model"""
         return StockData(
             symbol=data["symbol"],
             name=data["name"],
-            prices=[
-                StockPrice(
-                    date=datetime.fromisoformat(price["date"]),
-                    open=price["open"],
-                    high=price["high"],
-                    low=price["low"],
-                    close=price["close"],
-                    volume=price["volume"],
-                )
-                for price in data["prices"]
-            ],
+            prices=PriceSeries.from_json_rows(data["prices"]),
             last_updated=datetime.fromisoformat(data["last_updated"]),
         )
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List
+
+from app.core.config import settings
+from app.core.database import async_session, read_session, write_session
+from app.services.cache_service import tiered_cache
+from app.services.db_service import RequestStatsRepository
+from app.services.rate_limiter import background_priority
+from app.services.stock_service import StockService
+
+logger = logging.getLogger(__name__)
+
+
+class WarmupService:
+    """Preloads the caches with hot symbols before the app reports ready
+
+    The hot set is the configured popular symbols plus the symbols requested
+    most in previous runs. Request counts are kept in memory and added to the
+    database periodically and at shutdown.
+    """
+
+    def __init__(self):
+        self.request_counts: Counter = Counter()
+        self.progress: Dict[str, Any] = {"state": "pending"}
+
+    @property
+    def ready(self) -> bool:
+        """Whether warm-up has finished, or will not run"""
+        return self.progress["state"] not in ("pending", "running")
+
+    def record_request(self, symbol: str):
+        """Count a request for a symbol"""
+        self.request_counts[symbol.upper()] += 1
+
+    async def save_request_counts(self):
+        """Add the request counts since the last save to the database"""
+        counts, self.request_counts = self.request_counts, Counter()
+        if not counts:
+            return
+        async with write_session() as db:
+            if not await RequestStatsRepository.add_request_counts(db, counts):
+                # Keep the counts for the next save
+                self.request_counts.update(counts)
+
+    async def hot_symbols(self, popular_symbols: List[str]) -> List[str]:
+        """Get the symbols to warm, popular ones first, without duplicates"""
+        async with read_session() as db:
+            requested = await RequestStatsRepository.get_most_requested(
+                db, settings.WARMUP_MAX_SYMBOLS
+            )
+        symbols = list(dict.fromkeys([*popular_symbols, *requested]))
+        return symbols[: max(settings.WARMUP_MAX_SYMBOLS, len(popular_symbols))]
+
+    async def warm_up(self, popular_symbols: List[str]):
+        """Load stock data and overviews for the hot set into the caches
+
+        Symbols are loaded by a bounded number of workers, each writing its
+        cache entries through one batch. Warm-up gives up after
+        WARMUP_TIMEOUT_SECONDS so a slow upstream cannot hold readiness back.
+        """
+        if not settings.WARMUP_ENABLED:
+            self.progress = {"state": "disabled"}
+            return
+
+        symbols = await self.hot_symbols(popular_symbols)
+        progress = {
+            "state": "running",
+            "total": len(symbols),
+            "loaded": 0,
+            "failed": 0,
+            "started_at": datetime.now().isoformat(),
+            "elapsed_seconds": 0.0,
+        }
+        self.progress = progress
+        started = time.monotonic()
+        queue: asyncio.Queue = asyncio.Queue()
+        for symbol in symbols:
+            queue.put_nowait(symbol)
+
+        async def worker():
+            async with async_session() as db, tiered_cache.batch(db):
+                while True:
+                    try:
+                        symbol = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    try:
+                        if await StockService.get_stock_data_json(symbol, db) is None:
+                            raise ValueError("no data")
+                        await StockService.get_stock_overview_json(symbol, db)
+                        progress["loaded"] += 1
+                    except Exception as e:
+                        progress["failed"] += 1
+                        logger.error(f"Error warming {symbol}: {e}")
+
+        logger.info(f"Warming caches with {len(symbols)} symbols")
+        # Upstream misses wait behind interactive requests; workers inherit
+        # the priority when they are created
+        with background_priority():
+            workers = [
+                asyncio.create_task(worker())
+                for _ in range(max(1, settings.WARMUP_CONCURRENCY))
+            ]
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*workers), settings.WARMUP_TIMEOUT_SECONDS
+            )
+            progress["state"] = "done"
+        except asyncio.TimeoutError:
+            progress["state"] = "timed_out"
+            logger.warning("Cache warm-up timed out, reporting ready anyway")
+        except Exception as e:
+            progress["state"] = "failed"
+            logger.error(f"Error warming caches: {e}")
+        finally:
+            for task in workers:
+                task.cancel()
+            progress["elapsed_seconds"] = time.monotonic() - started
+
+        logger.info(
+            f"Cache warm-up {progress['state']}: {progress['loaded']} loaded, "
+            f"{progress['failed']} failed in {progress['elapsed_seconds']:.1f}s"
+        )
+
+
+# Global instance
+warmup_service = WarmupService()
@@ -0,0 +1,107 @@
+"""Benchmark the in-process autocomplete index against the FTS5 search
+
+Builds AutocompleteIndex over synthetic securities (100k by default) and
+replays the search-box keystrokes of bench_stock_search.py, timing the index
+against StockRepository.search_stocks on a temporary SQLite database with
+the FTS5 index. Also reports the index build time and the cost of
+incremental adds and renames, as save_stock performs them.
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.database import Base, Stock, build_engine, create_stock_search_index
+from app.services.autocomplete_index import AutocompleteIndex
+from app.services.db_service import StockRepository
+from scripts.bench_stock_search import QUERIES, generate_securities
+
+
+def _print_latencies(label: str, latencies):
+    values = np.array(latencies) * 1e6
+    print(
+        f"{label:>10} {np.percentile(values, 50):>10.1f} "
+        f"{np.percentile(values, 99):>10.1f}"
+    )
+
+
+async def _run(args):
+    securities = generate_securities(args.securities)
+    index = AutocompleteIndex()
+    start = time.perf_counter()
+    index.build((row["symbol"], row["name"]) for row in securities)
+    print(
+        f"securities={args.securities} "
+        f"index build {time.perf_counter() - start:.2f}s"
+    )
+
+    keystrokes = [
+        query[:length]
+        for _ in range(args.repeat)
+        for query in QUERIES
+        for length in range(1, len(query) + 1)
+    ]
+    print(f"{'method':>10} {'p50 us':>10} {'p99 us':>10}")
+
+    latencies = []
+    for keystroke in keystrokes:
+        start = time.perf_counter()
+        index.search(keystroke)
+        latencies.append(time.perf_counter() - start)
+    _print_latencies("index", latencies)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = build_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}", "tuned")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(insert(Stock), securities)
+            await conn.run_sync(create_stock_search_index)
+        session_factory = async_sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+        latencies = []
+        async with session_factory() as db:
+            for keystroke in keystrokes:
+                start = time.perf_counter()
+                await StockRepository.search_stocks(db, keystroke)
+                latencies.append(time.perf_counter() - start)
+        await engine.dispose()
+    _print_latencies("fts5", latencies)
+
+    # New listings, then renames of existing ones
+    latencies = []
+    for i in range(args.updates):
+        start = time.perf_counter()
+        index.add(f"NEW{i:05d}", f"Newly Listed Company {i}")
+        latencies.append(time.perf_counter() - start)
+    _print_latencies("add", latencies)
+    latencies = []
+    for row in securities[: args.updates]:
+        start = time.perf_counter()
+        index.add(row["symbol"], f"{row['name']} Renamed")
+        latencies.append(time.perf_counter() - start)
+    _print_latencies("rename", latencies)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Autocomplete index benchmark")
+    parser.add_argument("--securities", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--updates", type=int, default=1000)
+    args = parser.parse_args()
+
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
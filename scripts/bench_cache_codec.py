@@ -0,0 +1,108 @@
+"""Benchmark api_cache storage size and read throughput per payload format
+
+Fills temporary SQLite databases with the same stock_data entries stored as
+legacy JSON text and through CacheCodec (uncompressed, zlib and, when
+installed, zstd), then reports the database file size and how fast
+CacheRepository reads the entries back into JSON bodies.
+"""
+
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.database import Base
+from app.services.cache_codec import CacheCodec, zstandard
+from app.services.cache_keys import cache_keys
+from app.services.db_service import CacheRepository
+from app.services.market_data_generator import generate_universe
+from app.services.stock_service import StockService
+from app.models.stock import StockData
+
+
+def _payloads(symbols: int, bars: int) -> dict:
+    """Cached stock_data dictionaries keyed like the application does"""
+    names = [f"SYM{i:05d}" for i in range(symbols)]
+    universe = generate_universe(names, bars=bars)
+    return {
+        cache_keys.key("data", name): StockService._stock_data_to_dict(
+            StockData(
+                symbol=name,
+                name=f"{name} Inc.",
+                prices=prices,
+                last_updated=datetime(2024, 1, 2),
+            )
+        )
+        for name, prices in universe.items()
+    }
+
+
+async def _run_format(path: Path, payloads: dict, encode, reads: int):
+    """Store payloads with `encode`, returning (file bytes, reads per second)"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        expires_at = datetime.now() + timedelta(days=1)
+        await conn.exec_driver_sql(
+            "INSERT INTO api_cache (key, data, expires_at) VALUES (?, ?, ?)",
+            [(key, encode(data), expires_at) for key, data in payloads.items()],
+        )
+
+    session_factory = async_sessionmaker(engine, class_=AsyncSession)
+    keys = list(payloads)
+    async with session_factory() as db:
+        start = time.perf_counter()
+        for i in range(reads):
+            await CacheRepository.get_cached_entry(db, keys[i % len(keys)])
+        elapsed = time.perf_counter() - start
+
+    await engine.dispose()
+    return path.stat().st_size, reads / elapsed
+
+
+async def _run(symbols: int, bars: int, reads: int):
+    payloads = _payloads(symbols, bars)
+    formats = [
+        ("legacy text", lambda data: json.dumps(data)),
+        ("codec none", CacheCodec("none")),
+        ("codec zlib", CacheCodec("zlib")),
+    ]
+    if zstandard is not None:
+        formats.append(("codec zstd", CacheCodec("zstd")))
+
+    print(f"entries={symbols} bars={bars} reads={reads}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, codec in formats:
+            if isinstance(codec, CacheCodec):
+                encode = lambda data, codec=codec: codec.encode(  # noqa: E731
+                    json.dumps(data, separators=(",", ":")).encode()
+                )
+            else:
+                encode = codec
+            size, rate = await _run_format(
+                Path(tmp) / f"{label.replace(' ', '_')}.db", payloads, encode, reads
+            )
+            print(f"{label:>12}: size={size / 1024:9.0f} KiB reads={rate:8.0f}/s")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Cache payload format benchmark")
+    parser.add_argument("--entries", type=int, default=500)
+    parser.add_argument("--bars", type=int, default=100)
+    parser.add_argument("--reads", type=int, default=5000)
+    args = parser.parse_args()
+
+    asyncio.run(_run(args.entries, args.bars, args.reads))
+
+
+if __name__ == "__main__":
+    main()
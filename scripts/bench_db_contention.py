@@ -0,0 +1,178 @@
+"""Benchmark read latency under concurrent writes for each SQLite engine profile
+
+For every profile in ENGINE_PROFILES, seeds a temporary database with price
+histories, then runs reader tasks that load the newest bars of random symbols
+while a writer keeps rewriting whole histories through
+StockRepository.save_stock_prices, as the scheduler's refresh does. The writer
+runs in its own process so the numbers reflect database locking rather than
+event loop sharing. Reports read throughput, p50/p99 latency and failed reads
+and writes.
+"""
+
+import asyncio
+import multiprocessing
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.database import ENGINE_PROFILES, Base, Stock, StockPrice, build_engine
+from app.services.db_service import StockRepository
+from app.services.market_data_generator import generate_universe
+
+
+async def _seed(session_factory, symbols: int, bars: int):
+    """Store `symbols` histories of `bars` bars, returning their stock ids"""
+    names = [f"SYM{i:04d}" for i in range(symbols)]
+    universe = generate_universe(names, bars=bars)
+    stock_ids = []
+    async with session_factory() as db:
+        for name in names:
+            stock = Stock(symbol=name, name=name)
+            db.add(stock)
+            await db.commit()
+            await StockRepository.save_stock_prices(db, stock.id, universe[name])
+            stock_ids.append(stock.id)
+    return stock_ids
+
+
+async def _write_until(url: str, profile: str, seconds: float, stats) -> None:
+    """Rewrite random stored histories until `seconds` have passed"""
+    engine = build_engine(url, profile)
+    session_factory = async_sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False
+    )
+    async with session_factory() as db:
+        stock_ids = (await db.execute(select(Stock.id))).scalars().all()
+        histories = {}
+        for stock_id in stock_ids:
+            histories[stock_id] = await StockRepository.get_price_series(db, stock_id)
+        await db.rollback()
+
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            stock_id = random.choice(stock_ids)
+            counts = await StockRepository.save_stock_prices(
+                db, stock_id, histories[stock_id]
+            )
+            if counts is None:
+                stats["write_errors"] += 1
+            else:
+                stats["writes"] += len(histories[stock_id])
+    await engine.dispose()
+
+
+def _writer_process(url: str, profile: str, seconds: float, stats):
+    asyncio.run(_write_until(url, profile, seconds, stats))
+
+
+async def _run_profile(profile: str, args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}"
+        engine = build_engine(url, profile)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+        stock_ids = await _seed(session_factory, args.symbols, args.bars)
+        await engine.dispose()
+
+        manager = multiprocessing.Manager()
+        stats = manager.dict(writes=0, write_errors=0)
+        writer = multiprocessing.Process(
+            target=_writer_process, args=(url, profile, args.seconds, stats)
+        )
+        writer.start()
+        # Let the writer load its histories before reads are measured
+        await asyncio.sleep(1.0)
+
+        deadline = time.perf_counter() + args.seconds - 1.0
+        latencies = []
+        read_errors = 0
+
+        async def reader():
+            nonlocal read_errors
+            async with session_factory() as db:
+                while time.perf_counter() < deadline:
+                    stock_id = random.choice(stock_ids)
+                    start = time.perf_counter()
+                    try:
+                        result = await db.execute(
+                            select(StockPrice.date, StockPrice.close)
+                            .where(StockPrice.stock_id == stock_id)
+                            .order_by(StockPrice.date.desc())
+                            .limit(100)
+                        )
+                        result.all()
+                        await db.rollback()
+                        latencies.append(time.perf_counter() - start)
+                    except OperationalError:
+                        await db.rollback()
+                        read_errors += 1
+
+        await asyncio.gather(*(reader() for _ in range(args.readers)))
+        await asyncio.to_thread(writer.join)
+        await engine.dispose()
+        writes, write_errors = stats["writes"], stats["write_errors"]
+        manager.shutdown()
+
+    values = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        "reads_per_second": len(latencies) / (args.seconds - 1.0),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "written_rows_per_second": writes / args.seconds,
+        "read_errors": read_errors,
+        "write_errors": write_errors,
+    }
+
+
+async def _run(args):
+    print(
+        f"symbols={args.symbols} bars={args.bars} readers={args.readers} "
+        f"seconds={args.seconds}"
+    )
+    print(
+        f"{'profile':>8} {'reads/s':>9} {'p50 ms':>8} {'p99 ms':>8} "
+        f"{'rows/s':>9} {'read err':>9} {'write err':>10}"
+    )
+    for profile in args.profiles:
+        result = await _run_profile(profile, args)
+        print(
+            f"{profile:>8} {result['reads_per_second']:>9.0f} "
+            f"{result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+            f"{result['written_rows_per_second']:>9.0f} "
+            f"{result['read_errors']:>9} {result['write_errors']:>10}"
+        )
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="SQLite read/write contention")
+    parser.add_argument(
+        "--profiles",
+        nargs="+",
+        choices=list(ENGINE_PROFILES),
+        default=list(ENGINE_PROFILES),
+    )
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--bars", type=int, default=2000)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=6.0)
+    args = parser.parse_args()
+
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
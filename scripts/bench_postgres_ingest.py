@@ -0,0 +1,113 @@
+"""Benchmark bulk price ingest on SQLite and PostgreSQL
+
+Generates synthetic daily histories (2.5 million bars by default) and stores
+them through StockRepository.save_stock_prices into a temporary SQLite
+database, into PostgreSQL with the chunked upsert and into PostgreSQL with
+COPY, then rewrites them once as updates. Reports rows per second for each.
+
+PostgreSQL needs the `postgres` extra and a server; the tables are created in
+a scratch schema that is dropped afterwards:
+
+    python scripts/bench_postgres_ingest.py \\
+        --postgres-url postgresql+asyncpg://postgres@localhost/stock_dashboard
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.database import Base, Stock, build_engine
+from app.services import db_service
+from app.services.db_service import StockRepository
+from app.services.market_data_generator import generate_universe
+
+BENCH_SCHEMA = "bench_ingest"
+
+
+async def _ingest(engine, universe, label: str):
+    """Store every history twice, printing rows per second for each pass"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False
+    )
+    async with session_factory() as db:
+        stock_ids = {}
+        for symbol in universe:
+            stock = Stock(symbol=symbol, name=symbol)
+            db.add(stock)
+            await db.commit()
+            stock_ids[symbol] = stock.id
+
+        rows = sum(len(prices) for prices in universe.values())
+        for phase in ("insert", "update"):
+            start = time.perf_counter()
+            for symbol, prices in universe.items():
+                counts = await StockRepository.save_stock_prices(
+                    db, stock_ids[symbol], prices
+                )
+                assert counts is not None, f"{label} failed for {symbol}"
+            elapsed = time.perf_counter() - start
+            print(f"{label:>17} {phase:>7} {rows:>10} {rows / elapsed:>10.0f}")
+
+
+async def _run(args):
+    names = [f"SYM{i:04d}" for i in range(args.symbols)]
+    universe = generate_universe(names, bars=args.bars)
+    print(f"{'backend':>17} {'phase':>7} {'rows':>10} {'rows/s':>10}")
+
+    if not args.skip_sqlite:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = build_engine(
+                f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}", args.profile
+            )
+            await _ingest(engine, universe, f"sqlite {args.profile}")
+            await engine.dispose()
+
+    if args.postgres_url:
+        admin = create_async_engine(args.postgres_url)
+        async with admin.begin() as conn:
+            await conn.exec_driver_sql(f"DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE")
+            await conn.exec_driver_sql(f"CREATE SCHEMA {BENCH_SCHEMA}")
+        try:
+            for method, copy_min_rows in (
+                ("upsert", sys.maxsize),
+                ("copy", db_service.PRICE_COPY_MIN_ROWS),
+            ):
+                engine = create_async_engine(
+                    args.postgres_url,
+                    connect_args={"server_settings": {"search_path": BENCH_SCHEMA}},
+                )
+                async with engine.begin() as conn:
+                    await conn.run_sync(Base.metadata.drop_all)
+                db_service.PRICE_COPY_MIN_ROWS = copy_min_rows
+                await _ingest(engine, universe, f"postgres {method}")
+                await engine.dispose()
+        finally:
+            async with admin.begin() as conn:
+                await conn.exec_driver_sql(f"DROP SCHEMA {BENCH_SCHEMA} CASCADE")
+            await admin.dispose()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Bulk price ingest by backend")
+    parser.add_argument("--postgres-url", default=None)
+    parser.add_argument("--profile", default="tuned")
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--bars", type=int, default=5040)
+    parser.add_argument("--skip-sqlite", action="store_true")
+    args = parser.parse_args()
+
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Benchmark long-history reads with and without the columnar price archive
+
+Stores multi-decade synthetic histories in a temporary SQLite database, then
+reads every full history three ways: ORM rows through get_stock_prices, the
+columnar get_price_series query, and StockService.get_price_history after the
+bars beyond the hot window were moved to a temporary Arrow archive. Reports
+reads per second and bars per second for each. Requires pyarrow.
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.database import Base, Stock
+from app.services import price_archive as archive_module
+from app.services.db_service import StockRepository
+from app.services.market_data_generator import generate_universe
+from app.services.stock_service import StockService
+
+
+async def _time_reads(label: str, read, symbols, repeat: int, bars: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for stock_id, symbol in symbols:
+            count = await read(stock_id, symbol)
+            assert count == bars, (label, count)
+    elapsed = time.perf_counter() - start
+    reads = repeat * len(symbols)
+    print(
+        f"{label:>16} {reads / elapsed:>9.1f} {reads * bars / elapsed:>12.0f} "
+        f"{elapsed / reads * 1000:>9.2f}"
+    )
+
+
+async def _run(args):
+    if not archive_module.price_archive.enabled:
+        raise SystemExit("pyarrow is required: pip install -e '.[archive]'")
+
+    bars = args.years * 252
+    with tempfile.TemporaryDirectory() as tmp:
+        # Point the global archive at the temporary directory
+        archive_module.price_archive.root = Path(tmp) / "archive"
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+
+        names = [f"SYM{i:03d}" for i in range(args.symbols)]
+        universe = generate_universe(names, bars=bars)
+        symbols = []
+        async with session_factory() as db:
+            for name in names:
+                stock = Stock(symbol=name, name=name)
+                db.add(stock)
+                await db.commit()
+                await StockRepository.save_stock_prices(db, stock.id, universe[name])
+                symbols.append((stock.id, name))
+
+        print(f"symbols={args.symbols} bars={bars} repeat={args.repeat}")
+        print(f"{'method':>16} {'reads/s':>9} {'bars/s':>12} {'ms/read':>9}")
+        async with session_factory() as db:
+
+            async def orm_rows(stock_id, symbol):
+                return len(await StockRepository.get_stock_prices(db, stock_id))
+
+            async def columnar(stock_id, symbol):
+                return len(await StockRepository.get_price_series(db, stock_id))
+
+            await _time_reads("orm rows", orm_rows, symbols, args.repeat, bars)
+            await _time_reads("sqlite columnar", columnar, symbols, args.repeat, bars)
+
+            latest_dates = await StockRepository.get_latest_price_dates(db, names)
+            for stock_id, symbol in symbols:
+                await StockService.archive_price_history(
+                    db, stock_id, symbol, latest_dates[symbol]
+                )
+
+            async def archived(stock_id, symbol):
+                stock_data = await StockService.get_price_history(symbol, db)
+                return len(stock_data.prices)
+
+            await _time_reads("archive + hot", archived, symbols, args.repeat, bars)
+
+        await engine.dispose()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Price archive read benchmark")
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--years", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
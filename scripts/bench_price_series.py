@@ -0,0 +1,135 @@
+"""Benchmark memory and serialization of columnar vs row-based price histories
+
+Compares a StockData carrying a columnar PriceSeries with the previous
+representation (a list of pydantic StockPrice objects) on 5,000-bar series:
+memory held, JSON encoding, decoding cached JSON back into a model, and
+slicing a recent window.
+"""
+
+import json
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+from pydantic import BaseModel
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.models.stock import PriceSeries, StockData, StockPrice
+
+LAST_UPDATED = datetime(2024, 1, 2)
+
+
+class RowStockData(BaseModel):
+    """Row-based StockData as it was before PriceSeries"""
+
+    symbol: str
+    name: str
+    prices: List[StockPrice] = []
+    last_updated: Optional[datetime] = None
+
+
+def _columns(bars: int):
+    """Build raw price columns for a synthetic series"""
+    rng = np.random.default_rng(0)
+    start = datetime(2000, 1, 3)
+    dates = [start + timedelta(days=i) for i in range(bars)]
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, bars)))
+    volume = rng.integers(1_000_000, 50_000_000, bars)
+    return dates, close * 0.99, close * 1.01, close * 0.98, close, volume
+
+
+def _build_rows(columns) -> RowStockData:
+    dates, open_, high, low, close, volume = columns
+    return RowStockData(
+        symbol="BENCH",
+        name="Bench Inc.",
+        prices=[
+            StockPrice(date=d, open=o, high=h, low=l, close=c, volume=int(v))
+            for d, o, h, l, c, v in zip(dates, open_, high, low, close, volume)
+        ],
+        last_updated=LAST_UPDATED,
+    )
+
+
+def _build_series(columns) -> StockData:
+    return StockData(
+        symbol="BENCH",
+        name="Bench Inc.",
+        prices=PriceSeries(*columns),
+        last_updated=LAST_UPDATED,
+    )
+
+
+def _measure_memory(build, columns) -> int:
+    """Peak bytes allocated while building and holding the model"""
+    tracemalloc.start()
+    model = build(columns)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del model
+    return peak
+
+
+def _time(fn, repeat: int) -> float:
+    """Best-of-three mean time per call in milliseconds"""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best * 1000
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="PriceSeries benchmark")
+    parser.add_argument("--bars", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    columns = _columns(args.bars)
+    rows = _build_rows(columns)
+    series = _build_series(columns)
+    assert rows.model_dump_json() == series.model_dump_json()
+
+    cached = rows.model_dump_json()
+
+    def decode_rows():
+        return RowStockData(**json.loads(cached))
+
+    def decode_series():
+        data = json.loads(cached)
+        return StockData(
+            symbol=data["symbol"],
+            name=data["name"],
+            prices=PriceSeries.from_json_rows(data["prices"]),
+            last_updated=data["last_updated"],
+        )
+
+    assert decode_series().prices == series.prices
+
+    print(f"bars={args.bars}")
+    for label, build, model, decode in (
+        ("List[StockPrice]", _build_rows, rows, decode_rows),
+        ("PriceSeries", _build_series, series, decode_series),
+    ):
+        memory = _measure_memory(build, columns)
+        encode_ms = _time(model.model_dump_json, args.repeat)
+        decode_ms = _time(decode, args.repeat)
+        slice_ms = _time(lambda: model.prices[:100], args.repeat)
+        print(
+            f"{label:>18}: memory={memory / 1024:8.1f} KiB "
+            f"encode={encode_ms:6.2f} ms decode={decode_ms:6.2f} ms "
+            f"slice={slice_ms:.4f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
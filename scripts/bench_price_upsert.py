@@ -0,0 +1,112 @@
+"""Benchmark StockRepository.save_stock_prices ingest throughput
+
+Writes synthetic price batches of several sizes into a temporary SQLite
+database, first as new bars and then again as updates, with the bulk upsert
+and with the previous select-then-insert/update loop, and reports rows per
+second for each.
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.database import Base, Stock, StockPrice
+from app.services.db_service import StockRepository
+from app.services.market_data_generator import generate_universe
+
+
+async def legacy_save_stock_prices(db: AsyncSession, stock_id: int, prices):
+    """The previous implementation: one SELECT per bar, then ORM writes"""
+    for price in prices:
+        result = await db.execute(
+            select(StockPrice).where(
+                StockPrice.stock_id == stock_id, StockPrice.date == price.date
+            )
+        )
+        existing_price = result.scalars().first()
+        if existing_price:
+            existing_price.open = price.open
+            existing_price.high = price.high
+            existing_price.low = price.low
+            existing_price.close = price.close
+            existing_price.volume = price.volume
+        else:
+            db.add(
+                StockPrice(
+                    stock_id=stock_id,
+                    date=price.date,
+                    open=price.open,
+                    high=price.high,
+                    low=price.low,
+                    close=price.close,
+                    volume=price.volume,
+                )
+            )
+    await db.commit()
+
+
+async def _run(sizes, repeat: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+
+        print(f"{'bars':>6} {'method':>7} {'phase':>7} {'rows/s':>10} {'counts':>14}")
+        next_id = 0
+        for bars in sizes:
+            for method in ("upsert", "legacy"):
+                totals = {"insert": [0.0, 0], "update": [0.0, 0]}
+                counts = {}
+                for _ in range(repeat):
+                    next_id += 1
+                    name = f"SYM{next_id:05d}"
+                    prices = generate_universe([name], bars=bars)[name]
+                    async with session_factory() as db:
+                        stock = Stock(symbol=name, name=name)
+                        db.add(stock)
+                        await db.commit()
+                        for phase in ("insert", "update"):
+                            start = time.perf_counter()
+                            if method == "upsert":
+                                counts[phase] = await StockRepository.save_stock_prices(
+                                    db, stock.id, prices
+                                )
+                            else:
+                                await legacy_save_stock_prices(
+                                    db, stock.id, prices.to_rows()
+                                )
+                            totals[phase][0] += time.perf_counter() - start
+                            totals[phase][1] += bars
+                for phase, (elapsed, rows) in totals.items():
+                    label = str(counts.get(phase, ""))
+                    print(
+                        f"{bars:>6} {method:>7} {phase:>7} "
+                        f"{rows / elapsed:>10.0f} {label:>14}"
+                    )
+
+        await engine.dispose()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Price ingest benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 5000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    asyncio.run(_run(args.sizes, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""Benchmark API-style read latency while a full refresh writes prices
+
+For each engine profile, seeds a temporary database with price histories and
+measures reads of recent bars, each in a fresh session like a request, first
+on an idle database and then while refresh workers rewrite every stored
+history and stock row. Runs once with one shared engine for reads and writes
+and once with the query-only read engine and single writer engine routed by
+routing_sessionmaker. Reports read p50/p99 per phase, failed reads and the
+refresh duration.
+"""
+
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.database import (
+    ENGINE_PROFILES,
+    Base,
+    Stock,
+    build_engine,
+    routing_sessionmaker,
+)
+from app.models.stock import StockOverview
+from app.services.db_service import StockRepository
+from app.services.market_data_generator import generate_universe
+
+
+def _session_factories(url: str, profile: str, mode: str):
+    """Build the session factories for readers and the refresh, and engines"""
+    if mode == "shared":
+        engine = build_engine(url, profile)
+        factory = async_sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+        return factory, factory, [engine]
+    read_engine = build_engine(url, profile, role="read")
+    write_engine = build_engine(url, profile, role="write")
+    factory = routing_sessionmaker(read_engine, write_engine)
+    return factory, factory, [read_engine, write_engine]
+
+
+async def _read_for(session_factory, stock_ids, seconds: float, latencies, errors):
+    """Read the newest bars of random stocks until `seconds` have passed"""
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        stock_id = random.choice(stock_ids)
+        start = time.perf_counter()
+        try:
+            async with session_factory() as db:
+                series = await StockRepository.get_price_series(db, stock_id, days=100)
+            if series is None:
+                errors.append(stock_id)
+            else:
+                latencies.append(time.perf_counter() - start)
+        except SQLAlchemyError:
+            errors.append(stock_id)
+        # Pace readers like independent requests
+        await asyncio.sleep(0.002)
+
+
+async def _refresh(session_factory, stocks, histories, workers: int) -> float:
+    """Rewrite every history and stock row with `workers` concurrent workers"""
+    queue: asyncio.Queue = asyncio.Queue()
+    for stock in stocks:
+        queue.put_nowait(stock)
+
+    async def worker():
+        async with session_factory() as db:
+            while not queue.empty():
+                stock_id, symbol = queue.get_nowait()
+                await StockRepository.save_stock(
+                    db, StockOverview(symbol=symbol, name=f"{symbol} Inc.")
+                )
+                await StockRepository.save_stock_prices(db, stock_id, histories[symbol])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    return time.perf_counter() - start
+
+
+def _percentiles(latencies):
+    values = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return float(np.percentile(values, 50)), float(np.percentile(values, 99))
+
+
+async def _run_mode(profile: str, mode: str, args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}"
+        setup_engine = build_engine(url, profile)
+        async with setup_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        setup_factory = async_sessionmaker(
+            setup_engine, class_=AsyncSession, expire_on_commit=False
+        )
+        names = [f"SYM{i:04d}" for i in range(args.symbols)]
+        histories = generate_universe(names, bars=args.bars)
+        stocks = []
+        async with setup_factory() as db:
+            for name in names:
+                stock = Stock(symbol=name, name=name)
+                db.add(stock)
+                await db.commit()
+                await StockRepository.save_stock_prices(db, stock.id, histories[name])
+                stocks.append((stock.id, name))
+        await setup_engine.dispose()
+
+        read_factory, write_factory, engines = _session_factories(url, profile, mode)
+        stock_ids = [stock_id for stock_id, _ in stocks]
+
+        idle, idle_errors = [], []
+        await asyncio.gather(
+            *(
+                _read_for(read_factory, stock_ids, args.idle_seconds, idle, idle_errors)
+                for _ in range(args.readers)
+            )
+        )
+
+        busy, busy_errors = [], []
+        refresh = asyncio.create_task(
+            _refresh(write_factory, stocks, histories, args.workers)
+        )
+        readers = [
+            asyncio.create_task(
+                _read_for(read_factory, stock_ids, 3600, busy, busy_errors)
+            )
+            for _ in range(args.readers)
+        ]
+        refresh_seconds = await refresh
+        for reader in readers:
+            reader.cancel()
+        await asyncio.gather(*readers, return_exceptions=True)
+
+        for engine in engines:
+            await engine.dispose()
+
+    return {
+        "idle": _percentiles(idle),
+        "busy": _percentiles(busy),
+        "errors": len(idle_errors) + len(busy_errors),
+        "refresh_seconds": refresh_seconds,
+    }
+
+
+async def _run(args):
+    print(
+        f"symbols={args.symbols} bars={args.bars} readers={args.readers} "
+        f"workers={args.workers}"
+    )
+    print(
+        f"{'profile':>8} {'mode':>7} {'idle p50':>9} {'idle p99':>9} "
+        f"{'busy p50':>9} {'busy p99':>9} {'errors':>7} {'refresh s':>10}"
+    )
+    for profile in args.profiles:
+        for mode in ("shared", "split"):
+            result = await _run_mode(profile, mode, args)
+            print(
+                f"{profile:>8} {mode:>7} "
+                f"{result['idle'][0]:>9.2f} {result['idle'][1]:>9.2f} "
+                f"{result['busy'][0]:>9.2f} {result['busy'][1]:>9.2f} "
+                f"{result['errors']:>7} {result['refresh_seconds']:>10.2f}"
+            )
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Read latency during a refresh")
+    parser.add_argument(
+        "--profiles",
+        nargs="+",
+        choices=list(ENGINE_PROFILES),
+        default=list(ENGINE_PROFILES),
+    )
+    parser.add_argument("--symbols", type=int, default=40)
+    parser.add_argument("--bars", type=int, default=2500)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--idle-seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Benchmark /api/v1/stocks/{symbol} latency under concurrent cold-cache load
+
+Starts the local Alpha Vantage stand-in (fake_alpha_vantage.py), runs the
+application in a uvicorn subprocess pointed at it, and fires concurrent
+requests for symbols that are not cached yet. Any non-200 response or client
+timeout fails the run. The application runs on a temporary database, never
+the one under data/.
+"""
+
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Tuple
+
+import aiohttp
+
+from fake_alpha_vantage import FakeUpstreamConfig, run_in_thread
+
+ROOT_DIR = Path(__file__).parent.parent
+
+SYMBOL_DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def _cold_symbol(run_id: str, i: int) -> str:
+    """Build a 10-character ticker that is unique per run and request index"""
+    digits = ""
+    for _ in range(5):
+        i, digit = divmod(i, len(SYMBOL_DIGITS))
+        digits = SYMBOL_DIGITS[digit] + digits
+    if i:
+        raise ValueError("Too many requests for unique cold symbols")
+    return f"B{run_id}{digits}"
+
+
+def _free_port() -> int:
+    """Find a free TCP port on localhost"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_for_app(base_url: str, timeout: float = 30.0):
+    """Wait until the application answers its health check"""
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            try:
+                async with session.get(f"{base_url}/api/v1/") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("Application did not start in time")
+
+
+async def _load(
+    base_url: str, requests: int, concurrency: int, timeout: float
+) -> Tuple[list, Counter]:
+    """Fire cold-cache requests and return successful latencies and failures
+
+    Only 200 responses are timed; other statuses and client errors are
+    counted by kind so they cannot flatter the latency quantiles.
+    """
+    run_id = uuid.uuid4().hex[:4].upper()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    failures: Counter = Counter()
+
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    async with aiohttp.ClientSession(timeout=client_timeout) as session:
+
+        async def one(i: int):
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    async with session.get(
+                        f"{base_url}/api/v1/stocks/{_cold_symbol(run_id, i)}"
+                    ) as response:
+                        await response.read()
+                        status = response.status
+                except asyncio.TimeoutError:
+                    failures["timeout"] += 1
+                    return
+                except aiohttp.ClientError as e:
+                    failures[type(e).__name__] += 1
+                    return
+                if status != 200:
+                    failures[str(status)] += 1
+                    return
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(one(i) for i in range(requests)))
+
+    return latencies, failures
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Cold-cache stock API benchmark")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="Upstream latency in seconds"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--timeout", type=float, default=60.0, help="Per-request client timeout"
+    )
+    args = parser.parse_args()
+
+    upstream_url = run_in_thread(
+        FakeUpstreamConfig(
+            latency_ms=args.latency * 1000,
+            error_rate=args.error_rate,
+            throttle_rate=args.throttle_rate,
+        ),
+        port=_free_port(),
+    )
+
+    app_port = _free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite+aiosqlite:///{tmp}/stock_data.db",
+            PRICE_ARCHIVE_DIR=f"{tmp}/archive",
+            ALPHA_VANTAGE_API_KEY="bench",
+            ALPHA_VANTAGE_CALLS_PER_MINUTE="1000000",
+            ALPHA_VANTAGE_CALLS_PER_DAY="1000000",
+            ALPHA_VANTAGE_BASE_URL=upstream_url,
+        )
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "app.app:app",
+                "--port",
+                str(app_port),
+                "--log-level",
+                "warning",
+            ],
+            cwd=ROOT_DIR,
+            env=env,
+        )
+        try:
+            base_url = f"http://127.0.0.1:{app_port}"
+            asyncio.run(_wait_for_app(base_url))
+            start = time.perf_counter()
+            latencies, failures = asyncio.run(
+                _load(base_url, args.requests, args.concurrency, args.timeout)
+            )
+            elapsed = time.perf_counter() - start
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(
+        f"requests={args.requests} ok={len(latencies)} "
+        f"failed={sum(failures.values())} concurrency={args.concurrency}"
+    )
+    if failures:
+        details = ", ".join(f"{kind}={count}" for kind, count in failures.items())
+        print(f"failures: {details}")
+        sys.exit(1)
+
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    print(f"throughput={len(latencies) / elapsed:.1f} req/s")
+    print(
+        f"p50={quantiles[49] * 1000:.1f}ms p95={quantiles[94] * 1000:.1f}ms "
+        f"p99={quantiles[98] * 1000:.1f}ms max={latencies[-1] * 1000:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
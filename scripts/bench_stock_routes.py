@@ -0,0 +1,126 @@
+"""Benchmark /api/v1/stocks/{symbol} throughput on warm-cache hits
+
+Serves the application with uvicorn next to a copy of the previous handler
+(decode the cached StockData, then validate and re-encode it through
+response_model) and hammers one cached symbol through each, reporting
+requests per second. Runs in demo mode on a temporary database, never the
+application's own.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import aiohttp
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+os.environ.setdefault("ALPHA_VANTAGE_API_KEY", "demo")
+
+# Settings are read when app is imported, so point them at a scratch directory
+# first; it is removed when the benchmark exits
+BENCH_DIR = tempfile.TemporaryDirectory(prefix="bench_stock_routes_")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{BENCH_DIR.name}/stock_data.db"
+os.environ["PRICE_ARCHIVE_DIR"] = f"{BENCH_DIR.name}/archive"
+
+import uvicorn
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.app import app
+from app.core.database import get_db
+from app.models.stock import StockData
+from app.services.stock_service import StockService
+
+
+@app.get("/bench/model/stocks/{symbol}", response_model=StockData)
+async def get_stock_through_model(symbol: str, db: AsyncSession = Depends(get_db)):
+    """The handler as it was before pre-encoded responses"""
+    return await StockService.get_stock_data(symbol, db)
+
+
+def _free_port() -> int:
+    """Find a free TCP port on localhost"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _serve(port: int) -> uvicorn.Server:
+    """Run the application on a daemon thread"""
+    server = uvicorn.Server(
+        uvicorn.Config(app, port=port, log_level="warning", access_log=False)
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def _load(url: str, seconds: float, concurrency: int) -> float:
+    """Request `url` from `concurrency` clients for `seconds`, returning req/s"""
+    count = 0
+    deadline = time.perf_counter() + seconds
+
+    async with aiohttp.ClientSession() as session:
+
+        async def client():
+            nonlocal count
+            while time.perf_counter() < deadline:
+                async with session.get(url) as response:
+                    await response.read()
+                    assert response.status == 200
+                count += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        return count / (time.perf_counter() - start)
+
+
+async def _run(base_url: str, symbol: str, seconds: float, concurrency: int):
+    async with aiohttp.ClientSession() as session:
+        # Populate the cache before measuring
+        async with session.get(f"{base_url}/api/v1/stocks/{symbol}") as response:
+            await response.read()
+
+    for label, path in (
+        ("response_model", f"/bench/model/stocks/{symbol}"),
+        ("pre-encoded", f"/api/v1/stocks/{symbol}"),
+    ):
+        rate = await _load(f"{base_url}{path}", seconds, concurrency)
+        print(f"{label:>15}: {rate:8.1f} req/s")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Warm-cache stock route benchmark")
+    parser.add_argument("--symbol", default="AAPL")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    # Per-request INFO logging would dominate both paths
+    logging.disable(logging.INFO)
+
+    port = _free_port()
+    server = _serve(port)
+    try:
+        print(f"symbol={args.symbol} concurrency={args.concurrency}")
+        asyncio.run(
+            _run(
+                f"http://127.0.0.1:{port}", args.symbol, args.seconds, args.concurrency
+            )
+        )
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Benchmark stock search autocomplete latency at a large listing
+
+Fills a temporary SQLite database with synthetic securities (100k by default)
+and replays typing queries one keystroke at a time, timing the previous
+substring LIKE search against StockRepository.search_stocks on the FTS5
+index. Reports p50/p99 latency per query length for each.
+"""
+
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.database import Base, Stock, build_engine, create_stock_search_index
+from app.services.db_service import StockRepository
+
+WORDS = [
+    "Advanced", "Alpha", "American", "Apple", "Atlantic", "Bancorp", "Bio",
+    "Blue", "Capital", "Clean", "Digital", "Dynamic", "Energy", "First",
+    "Global", "Green", "Health", "Holdings", "Industrial", "Infinity",
+    "Micro", "National", "Networks", "North", "Pacific", "Pharma", "Power",
+    "Quantum", "Realty", "Resources", "Semiconductor", "Silver", "Software",
+    "Solar", "Systems", "Technologies", "Therapeutics", "United", "Vector",
+]
+SUFFIXES = ["Inc.", "Corp.", "Holdings", "Group", "Ltd.", "Trust", "ETF"]
+QUERIES = ["apple", "micro", "quantum", "sol", "glob", "brk", "xyz", "a", "tech"]
+
+
+def generate_securities(count: int, seed: int = 7):
+    """Generate unique symbols with names made of common company words"""
+    rng = random.Random(seed)
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    symbols = set()
+    while len(symbols) < count:
+        symbols.add("".join(rng.choices(letters, k=rng.randint(1, 5))))
+    return [
+        {
+            "symbol": symbol,
+            "name": " ".join(
+                [*rng.sample(WORDS, rng.randint(1, 3)), rng.choice(SUFFIXES)]
+            ),
+        }
+        for symbol in sorted(symbols)
+    ]
+
+
+async def legacy_search_stocks(db: AsyncSession, query: str, limit: int = 10):
+    """The previous implementation: unanchored LIKE on symbol and name"""
+    result = await db.execute(
+        select(Stock)
+        .where((Stock.symbol.ilike(f"%{query}%")) | (Stock.name.ilike(f"%{query}%")))
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+
+async def _run(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = build_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}", "tuned")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(insert(Stock), generate_securities(args.securities))
+            start = time.perf_counter()
+            await conn.run_sync(create_stock_search_index)
+            print(
+                f"securities={args.securities} "
+                f"index build {time.perf_counter() - start:.2f}s"
+            )
+        session_factory = async_sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+
+        methods = {"like": legacy_search_stocks, "fts5": StockRepository.search_stocks}
+        latencies = {name: {} for name in methods}
+        async with session_factory() as db:
+            for _ in range(args.repeat):
+                for query in QUERIES:
+                    # One search per keystroke, as the search box sends them
+                    for length in range(1, len(query) + 1):
+                        for name, search in methods.items():
+                            start = time.perf_counter()
+                            await search(db, query[:length])
+                            latencies[name].setdefault(length, []).append(
+                                time.perf_counter() - start
+                            )
+
+        print(f"{'chars':>5} {'method':>6} {'p50 ms':>8} {'p99 ms':>8}")
+        for length in sorted(latencies["like"]):
+            for name in methods:
+                values = np.array(latencies[name][length]) * 1000
+                print(
+                    f"{length:>5} {name:>6} {np.percentile(values, 50):>8.2f} "
+                    f"{np.percentile(values, 99):>8.2f}"
+                )
+        for name in methods:
+            values = np.concatenate(
+                [np.array(v) * 1000 for v in latencies[name].values()]
+            )
+            print(
+                f"{'all':>5} {name:>6} {np.percentile(values, 50):>8.2f} "
+                f"{np.percentile(values, 99):>8.2f}"
+            )
+        await engine.dispose()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Stock search benchmark")
+    parser.add_argument("--securities", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -9,8 +9,11 @@ from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent))
 
-from app.core.database import async_session, init_db
+from app.core.database import SQLALCHEMY_DATABASE_URL, async_session, engine, init_db
+from app.services.cache_keys import CACHE_NAMESPACES
+from app.services.cache_service import tiered_cache
 from app.services.db_service import CacheRepository, StockRepository
+from app.services.rate_limiter import background_priority
 from app.services.stock_service import StockService
 
 logging.basicConfig(
@@ -40,21 +43,20 @@ async def seed_database():
     await init_db()
 
     logger.info("Seeding the database with popular stocks...")
+    # Upstream calls are paced by the shared rate limiter
     async with async_session() as db:
-        for symbol in POPULAR_STOCKS:
-            logger.info(f"Fetching data for {symbol}...")
-            try:
-                # Get stock data (this will save to DB)
-                stock_data = await StockService.get_stock_data(symbol, db)
-                if stock_data:
-                    logger.info(f"Successfully added {symbol} to database")
-                else:
-                    logger.error(f"Failed to fetch data for {symbol}")
-
-                # Add a small delay to avoid API rate limits
-                await asyncio.sleep(1)
-            except Exception as e:
-                logger.error(f"Error seeding {symbol}: {e}")
+        with background_priority():
+            for symbol in POPULAR_STOCKS:
+                logger.info(f"Fetching data for {symbol}...")
+                try:
+                    # Get stock data (this will save to DB)
+                    stock_data = await StockService.get_stock_data(symbol, db)
+                    if stock_data:
+                        logger.info(f"Successfully added {symbol} to database")
+                    else:
+                        logger.error(f"Failed to fetch data for {symbol}")
+                except Exception as e:
+                    logger.error(f"Error seeding {symbol}: {e}")
 
     logger.info("Database seeding completed")
 
@@ -72,6 +74,53 @@ async def clear_cache():
             logger.error(f"Error clearing cache: {e}")
 
 
+async def migrate_cache():
+    """Rewrite cache entries in the compact binary format"""
+    logger.info("Migrating API cache payloads...")
+    await init_db()
+    async with async_session() as db:
+        if engine.dialect.name != "sqlite":
+            rewritten = await CacheRepository.migrate_cache_payloads(db)
+            logger.info(f"Rewrote {rewritten} cache entries")
+            return
+        db_path = Path(SQLALCHEMY_DATABASE_URL.split("///", 1)[1])
+        size_before = db_path.stat().st_size
+        rewritten = await CacheRepository.migrate_cache_payloads(db)
+
+    # Give the freed pages back to the filesystem
+    async with engine.connect() as conn:
+        await conn.exec_driver_sql("VACUUM")
+
+    size_after = db_path.stat().st_size
+    logger.info(
+        f"Rewrote {rewritten} cache entries, database size "
+        f"{size_before / 1024:.0f} KiB -> {size_after / 1024:.0f} KiB"
+    )
+
+
+async def invalidate_symbol(symbol: str):
+    """Drop every cache entry tagged with a symbol"""
+    await init_db()
+    async with async_session() as db:
+        await tiered_cache.load_namespace_versions(db)
+        dropped = await StockService.invalidate_symbol(
+            db, symbol.upper(), broadcast=True
+        )
+    logger.info(f"Dropped {dropped} cache entries for {symbol.upper()}")
+
+
+async def bump_namespace(namespace: str):
+    """Move a cache namespace to a new key version and purge its old entries"""
+    await init_db()
+    async with async_session() as db:
+        await tiered_cache.load_namespace_versions(db)
+        version = await tiered_cache.bump_namespace(db, namespace)
+        purged = await tiered_cache.purge_unreachable(db)
+    logger.info(
+        f"Cache namespace {namespace} is now v{version}, purged {purged} entries"
+    )
+
+
 async def show_database_info():
     """Display information about the database"""
     logger.info("Fetching database information...")
@@ -117,6 +166,23 @@ if __name__ == "__main__":
         "--clear-cache", action="store_true", help="Clear all cache entries"
     )
     parser.add_argument("--info", action="store_true", help="Show database information")
+    parser.add_argument(
+        "--migrate-cache",
+        action="store_true",
+        help="Rewrite cache entries in the compact binary format",
+    )
+    parser.add_argument(
+        "--invalidate-symbol",
+        metavar="SYMBOL",
+        help="Drop every cache entry derived from a symbol; running servers "
+        "drop them from memory within CACHE_SYNC_INTERVAL_SECONDS",
+    )
+    parser.add_argument(
+        "--bump-namespace",
+        choices=CACHE_NAMESPACES,
+        help="Move a cache namespace to a new key version; running servers "
+        "switch to it within CACHE_SYNC_INTERVAL_SECONDS",
+    )
 
     args = parser.parse_args()
 
@@ -126,5 +192,11 @@ if __name__ == "__main__":
         asyncio.run(clear_cache())
     elif args.info:
         asyncio.run(show_database_info())
+    elif args.migrate_cache:
+        asyncio.run(migrate_cache())
+    elif args.invalidate_symbol:
+        asyncio.run(invalidate_symbol(args.invalidate_symbol))
+    elif args.bump_namespace:
+        asyncio.run(bump_namespace(args.bump_namespace))
     else:
         parser.print_help()
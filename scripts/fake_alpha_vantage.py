@@ -0,0 +1,310 @@
+"""Local stand-in for the Alpha Vantage API
+
+Serves TIME_SERIES_DAILY, OVERVIEW and SYMBOL_SEARCH so the production code
+path (HTTP, parse and persist) can be exercised without the network. Responses
+are replayed from recorded files when available and synthesized otherwise.
+Latency, HTTP errors and "Information" throttle notes can be injected.
+
+Point the application at it with:
+
+    ALPHA_VANTAGE_BASE_URL=http://127.0.0.1:8765/query ALPHA_VANTAGE_API_KEY=fake
+"""
+
+import asyncio
+import json
+import logging
+import random
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import aiohttp
+from aiohttp import web
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.models.stock import PriceSeries
+from app.services.market_data_generator import generate_universe, symbol_seed
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_NOTE = (
+    "Thank you for using Alpha Vantage! Our standard API rate limit is 25 "
+    "requests per day."
+)
+
+
+@dataclass
+class FakeUpstreamConfig:
+    """Behaviour of the fake upstream"""
+
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    calls_per_minute: Optional[int] = None
+    compact_bars: int = 100
+    full_years: int = 20
+    unknown_prefix: str = "ZZ"
+    replay_dir: Optional[Path] = None
+    record_from: Optional[str] = None
+    record_apikey: Optional[str] = None
+    seed: int = 0
+    stats: Dict[str, int] = field(
+        default_factory=lambda: {
+            "requests": 0,
+            "replayed": 0,
+            "recorded": 0,
+            "synthetic": 0,
+            "errors": 0,
+            "throttled": 0,
+        }
+    )
+
+
+def synthetic_daily_series(
+    symbol: str, bars: int, seed: int = 0, end: Optional[date] = None
+) -> Dict[str, Any]:
+    """Build a deterministic TIME_SERIES_DAILY payload, newest bar first"""
+    prices = generate_universe([symbol], end=end, salt=seed, bars=bars)[symbol]
+    days = prices.dates.astype("datetime64[D]")
+    open_, high, low, close, volume = (
+        getattr(prices, column) for column in PriceSeries.COLUMNS
+    )
+
+    series = {
+        str(day): {
+            "1. open": f"{o:.4f}",
+            "2. high": f"{h:.4f}",
+            "3. low": f"{l:.4f}",
+            "4. close": f"{c:.4f}",
+            "5. volume": str(v),
+        }
+        for day, o, h, l, c, v in zip(days, open_, high, low, close, volume)
+    }
+    return {
+        "Meta Data": {
+            "1. Information": "Daily Prices (open, high, low, close) and Volumes",
+            "2. Symbol": symbol,
+            "3. Last Refreshed": str(days[0]),
+            "4. Output Size": "Compact" if bars <= 100 else "Full size",
+            "5. Time Zone": "US/Eastern",
+        },
+        "Time Series (Daily)": series,
+    }
+
+
+def synthetic_overview(symbol: str, seed: int = 0) -> Dict[str, Any]:
+    """Build a deterministic OVERVIEW payload"""
+    rng = random.Random(symbol_seed(symbol, seed))
+    return {
+        "Symbol": symbol,
+        "Name": f"{symbol} Inc.",
+        "Sector": rng.choice(["Technology", "Financial Services", "Healthcare"]),
+        "Industry": rng.choice(["Software", "Banks", "Biotechnology"]),
+        "MarketCapitalization": str(rng.randint(10**8, 2 * 10**12)),
+        "PERatio": f"{rng.uniform(5, 40):.2f}",
+        "DividendYield": f"{rng.uniform(0, 0.04):.4f}",
+    }
+
+
+def synthetic_search(keywords: str) -> Dict[str, Any]:
+    """Build a SYMBOL_SEARCH payload that matches the keywords as a symbol"""
+    symbol = keywords.upper()
+    return {
+        "bestMatches": [
+            {
+                "1. symbol": symbol,
+                "2. name": f"{symbol} Inc.",
+                "3. type": "Equity",
+                "4. region": "United States",
+                "5. marketOpen": "09:30",
+                "6. marketClose": "16:00",
+                "7. timezone": "UTC-04",
+                "8. currency": "USD",
+                "9. matchScore": "1.0000",
+            }
+        ]
+    }
+
+
+def _replay_path(config: FakeUpstreamConfig, function: str, key: str) -> Path:
+    """Location of a recorded response"""
+    return config.replay_dir / function / f"{key.upper()}.json"
+
+
+def create_app(config: FakeUpstreamConfig) -> web.Application:
+    """Create the fake upstream application"""
+    rng = random.Random(config.seed)
+    recent_calls: deque = deque()
+
+    async def synthesize(function: str, request: web.Request) -> Dict[str, Any]:
+        symbol = request.query.get("symbol", "")
+        if function == "TIME_SERIES_DAILY":
+            if symbol.upper().startswith(config.unknown_prefix):
+                return {
+                    "Error Message": "Invalid API call. Please retry or visit the "
+                    "documentation for TIME_SERIES_DAILY."
+                }
+            full = request.query.get("outputsize") == "full"
+            bars = config.full_years * 252 if full else config.compact_bars
+            return synthetic_daily_series(symbol, bars, config.seed)
+        if function == "OVERVIEW":
+            if symbol.upper().startswith(config.unknown_prefix):
+                return {}
+            return synthetic_overview(symbol, config.seed)
+        if function == "SYMBOL_SEARCH":
+            return synthetic_search(request.query.get("keywords", ""))
+        return {"Error Message": "This API function does not exist."}
+
+    async def record(function: str, key: str, request: web.Request) -> bytes:
+        params = dict(request.query)
+        params["apikey"] = config.record_apikey or params.get("apikey", "demo")
+        async with aiohttp.ClientSession() as session:
+            async with session.get(config.record_from, params=params) as response:
+                body = await response.read()
+        data = json.loads(body)
+        # Throttle notes and errors are not worth replaying
+        if "Information" not in data and "Error Message" not in data:
+            path = _replay_path(config, function, key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(body)
+            config.stats["recorded"] += 1
+        return body
+
+    async def handle(request: web.Request) -> web.StreamResponse:
+        config.stats["requests"] += 1
+
+        delay = config.latency_ms + rng.uniform(-1, 1) * config.jitter_ms
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+        if rng.random() < config.error_rate:
+            config.stats["errors"] += 1
+            return web.Response(status=500, text="Internal Server Error")
+
+        now = time.monotonic()
+        while recent_calls and now - recent_calls[0] > 60:
+            recent_calls.popleft()
+        recent_calls.append(now)
+        over_quota = (
+            config.calls_per_minute is not None
+            and len(recent_calls) > config.calls_per_minute
+        )
+        if over_quota or rng.random() < config.throttle_rate:
+            config.stats["throttled"] += 1
+            return web.json_response({"Information": THROTTLE_NOTE})
+
+        function = request.query.get("function", "")
+        key = request.query.get("symbol") or request.query.get("keywords", "")
+        if function == "TIME_SERIES_DAILY":
+            key = f"{key}_{request.query.get('outputsize', 'compact')}"
+
+        if config.replay_dir is not None:
+            path = _replay_path(config, function, key)
+            if path.exists():
+                config.stats["replayed"] += 1
+                return web.Response(
+                    body=path.read_bytes(), content_type="application/json"
+                )
+            if config.record_from:
+                body = await record(function, key, request)
+                return web.Response(body=body, content_type="application/json")
+
+        config.stats["synthetic"] += 1
+        return web.json_response(await synthesize(function, request))
+
+    async def stats(request: web.Request) -> web.Response:
+        return web.json_response(config.stats)
+
+    app = web.Application()
+    app.router.add_get("/query", handle)
+    app.router.add_get("/stats", stats)
+    return app
+
+
+def run_in_thread(
+    config: FakeUpstreamConfig, host: str = "127.0.0.1", port: int = 8765
+) -> str:
+    """Start the fake upstream on a daemon thread and return its query URL"""
+    started = threading.Event()
+
+    async def serve():
+        runner = web.AppRunner(create_app(config), access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        started.set()
+        await asyncio.Event().wait()
+
+    threading.Thread(target=lambda: asyncio.run(serve()), daemon=True).start()
+    started.wait()
+    return f"http://{host}:{port}/query"
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local Alpha Vantage stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Fraction of HTTP 500s"
+    )
+    parser.add_argument(
+        "--throttle-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of 'Information' throttle responses",
+    )
+    parser.add_argument(
+        "--calls-per-minute",
+        type=int,
+        default=None,
+        help="Throttle calls above this rate, like the real quota",
+    )
+    parser.add_argument("--full-years", type=int, default=20)
+    parser.add_argument(
+        "--unknown-prefix",
+        default="ZZ",
+        help="Symbols with this prefix get an 'Error Message' response",
+    )
+    parser.add_argument(
+        "--replay-dir", type=Path, help="Directory of recorded responses to serve"
+    )
+    parser.add_argument(
+        "--record-from",
+        help="Upstream URL to record misses from into --replay-dir",
+    )
+    parser.add_argument("--record-apikey", help="API key used when recording")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.record_from and not args.replay_dir:
+        parser.error("--record-from requires --replay-dir")
+
+    config = FakeUpstreamConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        calls_per_minute=args.calls_per_minute,
+        full_years=args.full_years,
+        unknown_prefix=args.unknown_prefix.upper(),
+        replay_dir=args.replay_dir,
+        record_from=args.record_from,
+        record_apikey=args.record_apikey,
+        seed=args.seed,
+    )
+    print(f"Serving fake Alpha Vantage at http://{args.host}:{args.port}/query")
+    web.run_app(create_app(config), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Shared test setup: an isolated database and settings for every test run"""
+
+import asyncio
+import os
+import socket
+import sys
+import tempfile
+from pathlib import Path
+
+# Settings are read at import time, so point them at a scratch directory
+# before any app module is imported
+TEST_DIR = tempfile.mkdtemp(prefix="stock_dashboard_tests_")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{TEST_DIR}/stock_data.db"
+os.environ["PRICE_ARCHIVE_DIR"] = f"{TEST_DIR}/archive"
+os.environ["ALPHA_VANTAGE_API_KEY"] = "test"
+os.environ["ALPHA_VANTAGE_CALLS_PER_MINUTE"] = "1000000"
+os.environ["ALPHA_VANTAGE_CALLS_PER_DAY"] = "1000000"
+os.environ["WARMUP_ENABLED"] = "false"
+
+# The fake upstream lives with the benchmark scripts
+sys.path.append(str(Path(__file__).parent.parent / "scripts"))
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture
+def run():
+    """Run a coroutine on a fresh event loop, releasing pooled connections after
+
+    Pooled aiosqlite connections and the upstream HTTP session are bound to
+    the loop that opened them, so they are closed before the loop is.
+    """
+    from app.core.database import read_engine, write_engine
+    from app.services.alpha_vantage_client import alpha_vantage_client
+
+    def runner(coro):
+        async def main():
+            try:
+                return await coro
+            finally:
+                await alpha_vantage_client.close()
+                await read_engine.dispose()
+                await write_engine.dispose()
+
+        return asyncio.run(main())
+
+    return runner
+
+
+@pytest.fixture
+def fake_upstream():
+    """Start a fake Alpha Vantage upstream and return its URL and config"""
+    from fake_alpha_vantage import FakeUpstreamConfig, run_in_thread
+
+    def start(**options):
+        config = FakeUpstreamConfig(**options)
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        return run_in_thread(config, port=port), config
+
+    return start
+
+
+@pytest.fixture
+def live_upstream(fake_upstream, monkeypatch):
+    """Point the shared Alpha Vantage client at a fake upstream
+
+    Returns the fake upstream's config, whose stats count the calls made.
+    """
+    from app.services.alpha_vantage_client import alpha_vantage_client
+
+    def start(**options):
+        url, config = fake_upstream(**options)
+        monkeypatch.setattr(alpha_vantage_client, "base_url", url)
+        return config
+
+    return start
+
+
+@pytest.fixture(scope="session")
+def database():
+    """Create the test database schema once per session"""
+    from app.core.database import init_db, write_engine
+
+    async def main():
+        await init_db()
+        await write_engine.dispose()
+
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, func, select
+
+from app.core.database import APICache, APICacheTag, async_session
+from app.services.cache_keys import cache_keys, symbol_tag
+from app.services.cache_manager import CacheManager
+from app.services.cache_service import MemoryCache, TieredCache
+from app.services.db_service import CacheRepository
+
+
+@pytest.fixture
+def empty_cache(run, database):
+    """Start from an empty api_cache table, since budgets span every row"""
+
+    async def main():
+        async with async_session() as db:
+            await db.execute(delete(APICacheTag))
+            await db.execute(delete(APICache))
+            await db.commit()
+
+    run(main())
+
+
+async def seed(cache: TieredCache, db, keys):
+    """Cache an entry per key, tagged by key and used in the given order"""
+    for key in keys:
+        await cache.set(db, key, {}, {}, tags=[symbol_tag(key)])
+    start = datetime.now() - timedelta(hours=1)
+    await CacheRepository.touch_cache_entries(
+        db, {key: start + timedelta(seconds=i) for i, key in enumerate(keys)}
+    )
+
+
+async def stored(db):
+    keys = await db.execute(select(APICache.key).order_by(APICache.key))
+    tagged = await db.scalar(select(func.count()).select_from(APICacheTag))
+    return keys.scalars().all(), tagged
+
+
+def test_evict_lru_drops_the_oldest_rows_and_their_tags(run, empty_cache):
+    keys = [cache_keys.key("data", f"LRU{i}") for i in range(4)]
+
+    async def main():
+        async with async_session() as db:
+            await seed(TieredCache(MemoryCache()), db, keys)
+            by_rows = await CacheRepository.evict_lru(db, "data", max_rows=3)
+            size = await db.scalar(select(APICache.size_bytes).limit(1))
+            # Two rows' worth of bytes keeps the two most recently used
+            by_bytes = await CacheRepository.evict_lru(db, max_bytes=2 * size)
+            return by_rows, by_bytes, await stored(db)
+
+    by_rows, by_bytes, (remaining, tagged) = run(main())
+    assert by_rows == [keys[0]]
+    assert by_bytes == [keys[1]]
+    assert remaining == keys[2:]
+    assert tagged == 2
+
+
+def test_enforce_applies_namespace_quotas_then_the_table_budget(run, empty_cache):
+    manager = CacheManager(max_rows=3, namespace_max_rows={"search": 1})
+    cache = TieredCache(MemoryCache(), manager)
+    searches = [cache_keys.key("search", f"q{i}") for i in range(3)]
+    data = [cache_keys.key("data", f"QUOTA{i}") for i in range(3)]
+
+    async def main():
+        async with async_session() as db:
+            await seed(cache, db, data + searches)
+            evicted = await cache.enforce_budget(db)
+            return evicted, await stored(db)
+
+    evicted, (remaining, tagged) = run(main())
+    # Search keeps its newest entry, then the oldest data entry goes
+    assert evicted == 3
+    assert remaining == sorted(data[1:] + searches[2:])
+    assert tagged == 3
+    for key in (data[0], *searches[:2]):
+        assert cache.memory.get(key) is None
+    for key in remaining:
+        assert cache.memory.get(key) is not None
+    namespaces = manager.stats()["namespaces"]
+    assert namespaces["search"]["evictions"] == 2
+    assert namespaces["data"]["evictions"] == 1
+    assert namespaces["search"]["rows"] == 1
@@ -0,0 +1,84 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from app.models.stock import StockData
+from app.services.cache_codec import (
+    CODEC_RAW,
+    CODEC_ZLIB,
+    CODEC_ZSTD,
+    FORMAT_VERSION,
+    CacheCodec,
+)
+from app.services.market_data_generator import mock_price_series
+from app.services.stock_service import StockService
+
+BODY = json.dumps({"prices": [{"close": 100.0 + i} for i in range(200)]}).encode()
+
+
+@pytest.mark.parametrize(
+    "compression, codec", [("none", CODEC_RAW), ("zlib", CODEC_ZLIB)]
+)
+def test_round_trip(compression, codec):
+    cache_codec = CacheCodec(compression=compression, min_bytes=64)
+    stored = cache_codec.encode(BODY)
+    assert stored[:2] == bytes((FORMAT_VERSION, codec))
+    assert CacheCodec.is_current(stored)
+    assert cache_codec.decode(stored) == BODY
+
+
+def test_zstd_round_trip():
+    pytest.importorskip("zstandard")
+    cache_codec = CacheCodec(compression="zstd", min_bytes=64)
+    stored = cache_codec.encode(BODY)
+    assert stored[1] == CODEC_ZSTD
+    assert len(stored) < len(BODY)
+    assert cache_codec.decode(stored) == BODY
+
+
+def test_small_bodies_are_stored_raw():
+    cache_codec = CacheCodec(compression="zlib", min_bytes=1024)
+    stored = cache_codec.encode(b'{"a": 1}')
+    assert stored == bytes((FORMAT_VERSION, CODEC_RAW)) + b'{"a": 1}'
+    assert cache_codec.decode(stored) == b'{"a": 1}'
+
+
+def test_legacy_json_rows_decode_unchanged():
+    cache_codec = CacheCodec()
+    assert cache_codec.decode('{"a": 1}') == b'{"a": 1}'
+    assert cache_codec.decode(b'{"a": 1}') == b'{"a": 1}'
+    assert not CacheCodec.is_current('{"a": 1}')
+    assert not CacheCodec.is_current(b'{"a": 1}')
+
+
+def test_values_from_any_codec_decode_with_another():
+    stored = CacheCodec(compression="zlib", min_bytes=0).encode(BODY)
+    assert CacheCodec(compression="none").decode(stored) == BODY
+
+
+def test_unknown_codecs_are_rejected():
+    with pytest.raises(ValueError):
+        CacheCodec(compression="lz4")
+    with pytest.raises(ValueError):
+        CacheCodec().decode(bytes((FORMAT_VERSION, 99)) + BODY)
+
+
+def test_stock_data_round_trip():
+    stock_data = StockData(
+        symbol="ACME",
+        name="Acme Corp",
+        prices=mock_price_series("ACME", datetime(2024, 1, 2).date()),
+        last_updated=datetime(2024, 1, 2, 16, 30),
+    )
+    cache_codec = CacheCodec(compression="zlib", min_bytes=0)
+    body = json.dumps(StockService._stock_data_to_dict(stock_data)).encode()
+
+    stored = cache_codec.encode(body)
+    decoded = StockService._decode_stock_data(cache_codec.decode(stored))
+
+    assert decoded.symbol == "ACME" and decoded.name == "Acme Corp"
+    assert decoded.last_updated == stock_data.last_updated
+    assert decoded.prices.dates.tolist() == stock_data.prices.dates.tolist()
+    assert decoded.prices.close.tolist() == stock_data.prices.close.tolist()
+    assert decoded.prices.volume.tolist() == stock_data.prices.volume.tolist()
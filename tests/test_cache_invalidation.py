@@ -0,0 +1,110 @@
+import json
+
+from app.core.database import async_session
+from app.services.cache_keys import cache_keys, symbol_tag
+from app.services.cache_service import MemoryCache, TieredCache
+from app.services.db_service import CacheRepository
+
+
+def new_cache() -> TieredCache:
+    """Create a tiered cache with its own memory tier, like another process"""
+    return TieredCache(MemoryCache())
+
+
+async def cache_entry(cache: TieredCache, db, key: str, symbols):
+    await cache.set(db, key, key, key, tags=[symbol_tag(s) for s in symbols])
+
+
+async def cached(cache: TieredCache, db, key: str):
+    result = await cache.get(db, key, json.loads)
+    return result[0] if result else None
+
+
+def test_tags_drop_entries_from_both_tiers(run, database):
+    cache = new_cache()
+    data, overview, search = (
+        cache_keys.key("data", "TAGA"),
+        cache_keys.key("overview", "TAGA"),
+        cache_keys.key("search", "taga-or-tagb"),
+    )
+
+    async def main():
+        async with async_session() as db:
+            await cache_entry(cache, db, data, ["TAGA"])
+            await cache_entry(cache, db, overview, ["TAGA"])
+            await cache_entry(cache, db, search, ["TAGA", "TAGB"])
+            dropped = await cache.invalidate_tags(
+                db, [symbol_tag("TAGA")], keep=(data,)
+            )
+            # A fresh memory tier proves the rows are gone too
+            reader = new_cache()
+            return dropped, [
+                await cached(tier, db, key)
+                for tier in (cache, reader)
+                for key in (data, overview, search)
+            ]
+
+    dropped, values = run(main())
+    assert dropped == 2
+    assert values == [data, None, None, data, None, None]
+
+
+def test_namespace_bump_orphans_old_keys(run, database):
+    cache = new_cache()
+
+    async def main():
+        async with async_session() as db:
+            await cache.load_namespace_versions(db)
+            old_key = cache_keys.key("company_name", "BUMP")
+            await cache_entry(cache, db, old_key, ["BUMP"])
+            version = await cache.bump_namespace(db, "company_name")
+            new_key = cache_keys.key("company_name", "BUMP")
+            purged = await cache.purge_unreachable(db)
+            return old_key, new_key, version, purged, await cached(cache, db, old_key)
+
+    old_key, new_key, version, purged, old_value = run(main())
+    assert new_key == f"company_name:v{version}:BUMP" and new_key != old_key
+    assert purged >= 1
+    assert old_value is None
+
+
+def test_sync_applies_changes_made_by_other_processes(run, database):
+    server = new_cache()
+    admin = new_cache()
+
+    async def main():
+        async with async_session() as db:
+            await server.load_namespace_versions(db)
+            data = cache_keys.key("data", "SYNC")
+            search = cache_keys.key("search", "sync")
+            await cache_entry(server, db, data, ["SYNC"])
+            await cache_entry(server, db, search, ["SYNC"])
+
+            # What scripts/db_util.py does from its own process
+            await admin.invalidate_tags(db, [symbol_tag("SYNC")], broadcast=True)
+            version = await CacheRepository.bump_namespace_version(db, "search")
+            before = [await cached(server, db, key) for key in (data, search)]
+
+            dropped = await server.sync(db)
+            after = [await cached(server, db, key) for key in (data, search)]
+            return before, dropped, after, version
+
+    before, dropped, after, version = run(main())
+    # Memory kept serving both entries until the sync
+    assert before == [cache_keys.key("data", "SYNC"), f"search:v{version - 1}:sync"]
+    assert dropped == 2
+    assert after == [None, None]
+    assert cache_keys.version("search") == version
+
+
+def test_sync_skips_invalidations_logged_before_startup(run, database):
+    async def main():
+        async with async_session() as db:
+            await CacheRepository.record_invalidations(db, ["data:v1:OLD"])
+            server = new_cache()
+            await server.load_namespace_versions(db)
+            return await server.sync(db), server.invalidation_cursor
+
+    dropped, cursor = run(main())
+    assert dropped == 0
+    assert cursor >= 1
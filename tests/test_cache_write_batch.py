@@ -0,0 +1,139 @@
+import json
+
+from sqlalchemy import select
+
+from app.core.database import APICache, APICacheTag, async_session
+from app.services.cache_keys import cache_keys, symbol_tag
+from app.services.cache_service import MemoryCache, TieredCache, tiered_cache
+from app.services.db_service import CacheRepository
+from app.services.scheduler_service import scheduler_service
+
+
+def count_calls(monkeypatch, owner, name: str) -> list:
+    """Record the arguments of every call to a static method, still calling it"""
+    calls = []
+    original = getattr(owner, name)
+
+    async def counted(*args, **kwargs):
+        calls.append((args, kwargs))
+        return await original(*args, **kwargs)
+
+    monkeypatch.setattr(owner, name, counted)
+    return calls
+
+
+def test_set_many_cached_bodies_upserts_rows_and_tags(run, database):
+    async def main():
+        async with async_session() as db:
+            await CacheRepository.set_many_cached_bodies(
+                db,
+                [("wb:a", b'{"v":1}'), ("wb:b", b'{"v":1}')],
+                expire_seconds=3600,
+                stale_seconds=60,
+                tags={"wb:a": ["t1", "t2"], "wb:b": ["t1"]},
+            )
+            # Rewriting a key replaces its body and its tags
+            await CacheRepository.set_many_cached_bodies(
+                db, [("wb:a", b'{"v":2}')], tags={"wb:a": ["t3"]}
+            )
+            bodies = [
+                await CacheRepository.get_cached_data(db, key)
+                for key in ("wb:a", "wb:b")
+            ]
+            result = await db.execute(
+                select(APICacheTag.cache_key, APICacheTag.tag)
+                .where(APICacheTag.cache_key.in_(["wb:a", "wb:b"]))
+                .order_by(APICacheTag.cache_key, APICacheTag.tag)
+            )
+            stale = await db.scalar(
+                select(APICache.stale_at).where(APICache.key == "wb:b")
+            )
+            return bodies, result.all(), stale
+
+    bodies, tags, stale = run(main())
+    assert bodies == [b'{"v":2}', b'{"v":1}']
+    assert tags == [("wb:a", "t3"), ("wb:b", "t1")]
+    assert stale is not None
+
+
+def test_batched_sets_are_written_in_one_statement(run, database, monkeypatch):
+    writes = count_calls(monkeypatch, CacheRepository, "set_many_cached_bodies")
+    cache = TieredCache(MemoryCache())
+    keys = [f"wb:batch:{i}" for i in range(5)]
+
+    async def main():
+        async with async_session() as db:
+            async with cache.batch(db):
+                for key in keys:
+                    await cache.set(db, key, {"key": key}, {"key": key})
+                # Memory is updated at once, the database on exit
+                in_memory = all(cache.memory.get(key) for key in keys)
+                deferred = len(writes)
+            reader = TieredCache(MemoryCache())
+            stored = [await reader.get(db, key, json.loads) for key in keys]
+            return in_memory, deferred, stored
+
+    in_memory, deferred, stored = run(main())
+    assert in_memory
+    assert deferred == 0
+    assert len(writes) == 1
+    assert [row for row, _ in writes[0][0][1]] == keys
+    assert [value for value, _ in stored] == [{"key": key} for key in keys]
+
+
+def test_batches_flush_every_max_pending_writes(run, database, monkeypatch):
+    writes = count_calls(monkeypatch, CacheRepository, "set_many_cached_bodies")
+    cache = TieredCache(MemoryCache())
+
+    async def main():
+        async with async_session() as db:
+            async with cache.batch(db, max_pending=2):
+                for i in range(5):
+                    await cache.set(db, f"wb:pending:{i}", i, i)
+
+    run(main())
+    assert [len(args[1]) for args, _ in writes] == [2, 2, 1]
+
+
+def test_popular_stocks_update_writes_and_invalidates_once(
+    run, database, live_upstream, monkeypatch
+):
+    live_upstream()
+    symbols = ["WBPA", "WBPB", "WBPC"]
+    monkeypatch.setattr(scheduler_service, "popular_symbols", symbols)
+    writes = count_calls(monkeypatch, CacheRepository, "set_many_cached_bodies")
+    invalidations = count_calls(monkeypatch, CacheRepository, "invalidate_tags")
+
+    async def main():
+        async with async_session() as db:
+            # An entry derived from each symbol that the update must drop
+            for symbol in symbols:
+                await tiered_cache.set(
+                    db,
+                    cache_keys.key("overview", symbol),
+                    {},
+                    {},
+                    tags=[symbol_tag(symbol)],
+                )
+        writes.clear()
+        await scheduler_service.update_popular_stocks()
+        async with async_session() as db:
+            reader = TieredCache(MemoryCache())
+            return [
+                [
+                    await reader.get(db, cache_keys.key(namespace, symbol), json.loads)
+                    for namespace in ("data", "overview")
+                ]
+                for symbol in symbols
+            ]
+
+    stored = run(main())
+    # The refreshed entries are written together, then invalidated together
+    data_writes = [
+        [key for key, _ in args[1]]
+        for args, _ in writes
+        if any(key.startswith("data:") for key, _ in args[1])
+    ]
+    assert data_writes == [[cache_keys.key("data", symbol) for symbol in symbols]]
+    assert len(invalidations) == 1
+    assert all(data is not None and overview is None for data, overview in stored)
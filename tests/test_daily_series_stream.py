@@ -0,0 +1,116 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.database import Stock, StockPrice, async_session
+from app.services.alpha_vantage_client import alpha_vantage_client
+from app.services.daily_series_parser import DailySeriesStreamParser
+from app.services.db_service import StockRepository
+from app.services.stock_service import (
+    COMPACT_BARS,
+    StockService,
+    background_refreshes,
+)
+from fake_alpha_vantage import synthetic_daily_series
+
+
+def parse_in_pieces(payload: str, piece: int, chunk_size: int = 50):
+    """Feed a payload to a stream parser in fixed-size pieces"""
+    parser = DailySeriesStreamParser(chunk_size=chunk_size)
+    chunks = []
+    for start in range(0, len(payload), piece):
+        chunks.extend(parser.feed(payload[start : start + piece]))
+    chunks.extend(parser.close())
+    return parser, chunks
+
+
+@pytest.mark.parametrize("piece", [1, 7, 64, 1 << 20])
+def test_stream_parser_matches_whole_payload_parse(piece):
+    data = synthetic_daily_series("ACME", 120)
+    payload = json.dumps(data, indent=2)
+
+    parser, chunks = parse_in_pieces(payload, piece)
+
+    expected = StockService.parse_daily_series(data).sorted(descending=True)
+    parsed = chunks[0].concat(chunks).sorted(descending=True)
+    assert parser.header == {"Meta Data": data["Meta Data"]}
+    assert parser.has_series and parser.bar_count == 120
+    assert [len(chunk) for chunk in chunks] == [50, 50, 20]
+    assert parsed.dates.tolist() == expected.dates.tolist()
+    assert parsed.close.tolist() == expected.close.tolist()
+    assert parsed.volume.tolist() == expected.volume.tolist()
+
+
+def test_stream_parser_keeps_error_payloads_in_the_header():
+    parser, chunks = parse_in_pieces('{"Error Message": "Invalid API call."}', 5)
+    assert chunks == []
+    assert not parser.has_series
+    assert parser.header == {"Error Message": "Invalid API call."}
+
+
+def test_stream_parser_rejects_truncated_payloads():
+    payload = json.dumps(synthetic_daily_series("ACME", 10))
+    with pytest.raises(ValueError):
+        parse_in_pieces(payload[:-10], 16)
+
+
+def test_concurrent_cold_ingest_outlasts_the_request_timeout(
+    run, database, live_upstream, monkeypatch
+):
+    live_upstream(latency_ms=50, full_years=20)
+    symbols = [f"STRM{i}" for i in range(10)]
+
+    # Streams may take far longer than one request's deadline as long as
+    # data keeps arriving, even when database writes are slow
+    monkeypatch.setattr(alpha_vantage_client, "timeout", 1.0)
+    save_stock_prices = StockRepository.save_stock_prices
+
+    async def slow_save_stock_prices(db, stock_id, prices):
+        await asyncio.sleep(0.25)
+        return await save_stock_prices(db, stock_id, prices)
+
+    monkeypatch.setattr(StockRepository, "save_stock_prices", slow_save_stock_prices)
+
+    async def ingest(symbol: str):
+        async with async_session() as db:
+            return await StockService.ingest_daily_series(db, symbol)
+
+    async def main():
+        results = await asyncio.gather(*(ingest(symbol) for symbol in symbols))
+        async with async_session() as db:
+            stored = await db.execute(
+                select(Stock.symbol, func.count())
+                .join(StockPrice)
+                .where(Stock.symbol.in_(symbols))
+                .group_by(Stock.symbol)
+            )
+        return results, dict(stored.all())
+
+    results, stored = run(main())
+    assert all(len(prices) == COMPACT_BARS for _, prices in results)
+    assert stored == {symbol: 20 * 252 for symbol in symbols}
+
+
+def test_concurrent_cold_requests_all_succeed(run, database, live_upstream):
+    live_upstream(latency_ms=50, full_years=5)
+    symbols = [f"LOAD{i}" for i in range(20)]
+
+    async def main():
+        served = await asyncio.gather(
+            *(StockService.get_stock_data(symbol) for symbol in symbols)
+        )
+        await asyncio.gather(*background_refreshes)
+        async with async_session() as db:
+            stored = await db.execute(
+                select(Stock.symbol, func.count())
+                .join(StockPrice)
+                .where(Stock.symbol.in_(symbols))
+                .group_by(Stock.symbol)
+            )
+        return served, dict(stored.all())
+
+    served, stored = run(main())
+    assert [stock_data.symbol for stock_data in served] == symbols
+    assert stored == {symbol: 5 * 252 for symbol in symbols}
@@ -0,0 +1,86 @@
+import time
+
+import httpx
+import pytest
+from sqlalchemy import exc, text
+
+from app.core.config import settings
+from app.core.database import (
+    ReportingQueuePool,
+    build_engine,
+    pool_timeouts,
+    read_engine,
+)
+
+
+def test_read_pool_is_sized_from_settings(monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_POOL_SIZE", 3)
+    monkeypatch.setattr(settings, "DATABASE_MAX_OVERFLOW", 2)
+    monkeypatch.setattr(settings, "DATABASE_POOL_TIMEOUT_SECONDS", 0.5)
+    engine = build_engine(settings.DATABASE_URL, "tuned", role="read")
+
+    pool = engine.sync_engine.pool
+    assert isinstance(pool, ReportingQueuePool)
+    assert (pool.size(), pool._max_overflow, pool._timeout) == (3, 2, 0.5)
+
+    writer = build_engine(settings.DATABASE_URL, "tuned", role="write").sync_engine
+    assert (writer.pool.size(), writer.pool._max_overflow) == (1, 0)
+
+
+def test_pool_timeout_is_recorded_for_the_request(run, database, monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_POOL_SIZE", 1)
+    monkeypatch.setattr(settings, "DATABASE_MAX_OVERFLOW", 0)
+    monkeypatch.setattr(settings, "DATABASE_POOL_TIMEOUT_SECONDS", 0.1)
+    engine = build_engine(settings.DATABASE_URL, "tuned", role="read")
+
+    async def main():
+        timeouts = []
+        pool_timeouts.set(timeouts)
+        try:
+            async with engine.connect() as held:
+                await held.execute(text("SELECT 1"))
+                with pytest.raises(exc.TimeoutError):
+                    async with engine.connect():
+                        pass
+        finally:
+            await engine.dispose()
+        return timeouts
+
+    timeouts = run(main())
+    assert len(timeouts) == 1 and "QueuePool limit" in timeouts[0]
+
+
+def test_exhausted_read_pool_answers_503_quickly(run, database, monkeypatch):
+    from app.app import app
+
+    # A one-connection pool with a short timeout, keeping the engine's
+    # connect listeners (PRAGMAs) through the shared dispatch
+    pool = read_engine.sync_engine.pool
+    tiny = ReportingQueuePool(
+        pool._creator,
+        pool_size=1,
+        max_overflow=0,
+        timeout=0.2,
+        dialect=pool._dialect,
+        _dispatch=pool.dispatch,
+    )
+    monkeypatch.setattr(read_engine.sync_engine, "pool", tiny)
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        client = httpx.AsyncClient(transport=transport, base_url="http://test")
+        async with client:
+            async with read_engine.connect() as held:
+                await held.execute(text("SELECT 1"))
+                started = time.monotonic()
+                busy = await client.get("/api/v1/stocks/POOL/history")
+                elapsed = time.monotonic() - started
+            # Once the connection is back the same request is served normally
+            served = await client.get("/api/v1/stocks/POOL/history")
+        return busy, elapsed, served
+
+    busy, elapsed, served = run(main())
+    assert busy.status_code == 503
+    assert busy.headers["Retry-After"] == "1"
+    assert elapsed < 2
+    assert served.status_code == 404
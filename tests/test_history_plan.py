@@ -0,0 +1,138 @@
+import asyncio
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.database import Stock, StockPrice, async_session
+from app.services.market_calendar import (
+    is_trading_day,
+    latest_session,
+    market_time,
+    trading_days_between,
+)
+from app.services.stock_service import (
+    COMPACT_BARS,
+    StockService,
+    background_refreshes,
+)
+
+plan = StockService.plan_history_fetch
+
+
+@pytest.mark.parametrize(
+    "day, expected",
+    [
+        (date(2024, 3, 28), True),  # Thursday before Good Friday
+        (date(2024, 3, 29), False),  # Good Friday
+        (date(2024, 9, 2), False),  # Labor Day
+        (date(2024, 9, 7), False),  # Saturday
+        (date(2021, 12, 31), True),  # New Year's Day 2022 falls on a Saturday
+        (date(2022, 6, 20), False),  # Juneteenth observed on Monday
+        (date(2021, 6, 18), True),  # Before Juneteenth became a market holiday
+        (date(2026, 7, 3), False),  # Independence Day observed on Friday
+    ],
+)
+def test_trading_days(day, expected):
+    assert is_trading_day(day) is expected
+
+
+def test_latest_session_waits_for_the_open():
+    assert latest_session(datetime(2024, 9, 4, 9, 0)) == date(2024, 9, 3)
+    assert latest_session(datetime(2024, 9, 4, 9, 30)) == date(2024, 9, 4)
+    # Labor Day weekend falls back to the Friday before
+    assert latest_session(datetime(2024, 9, 2, 12, 0)) == date(2024, 8, 30)
+    assert latest_session(datetime(2024, 9, 3, 8, 0)) == date(2024, 8, 30)
+
+
+def test_trading_days_between_skips_holidays():
+    assert trading_days_between(date(2024, 8, 30), date(2024, 9, 3)) == 1
+    assert trading_days_between(date(2024, 9, 3), date(2024, 9, 3)) == 0
+
+
+def test_market_time_converts_aware_datetimes():
+    moment = datetime.fromisoformat("2024-01-02T15:00:00+00:00")
+    assert market_time(moment) == datetime(2024, 1, 2, 10, 0)
+
+
+def test_plan_without_history_is_full():
+    assert plan(None, now=datetime(2024, 9, 4, 12, 0)) == "full"
+
+
+def test_plan_rewrites_an_intraday_bar():
+    now = datetime(2024, 9, 4, 12, 0)
+    stored = datetime(2024, 9, 4)
+    assert plan(stored, now=now, fetched_at=datetime(2024, 9, 4, 11, 0)) == "compact"
+    assert plan(stored, now=now) == "compact"
+
+
+def test_plan_skips_a_bar_fetched_after_the_close():
+    now = datetime(2024, 9, 4, 18, 0)
+    stored = datetime(2024, 9, 4)
+    assert plan(stored, now=now, fetched_at=datetime(2024, 9, 4, 16, 30)) is None
+    assert plan(stored, now=now, fetched_at=datetime(2024, 9, 4, 15, 0)) == "compact"
+
+
+def test_plan_skips_before_the_open():
+    now = datetime(2024, 9, 5, 8, 0)
+    stored = datetime(2024, 9, 4)
+    assert plan(stored, now=now, fetched_at=datetime(2024, 9, 4, 17, 0)) is None
+
+
+def test_plan_fetches_the_new_session_once_it_opens():
+    now = datetime(2024, 9, 5, 10, 0)
+    stored = datetime(2024, 9, 4)
+    assert plan(stored, now=now, fetched_at=datetime(2024, 9, 4, 17, 0)) == "compact"
+
+
+def test_plan_skips_holidays_and_weekends():
+    fetched_at = datetime(2024, 8, 30, 16, 5)
+    stored = datetime(2024, 8, 30)
+    # Saturday, Labor Day and the Tuesday after, before the open
+    for now in (
+        datetime(2024, 8, 31, 12, 0),
+        datetime(2024, 9, 2, 12, 0),
+        datetime(2024, 9, 3, 9, 0),
+    ):
+        assert plan(stored, now=now, fetched_at=fetched_at) is None
+    # Good Friday
+    assert (
+        plan(
+            datetime(2024, 3, 28),
+            now=datetime(2024, 3, 29, 12, 0),
+            fetched_at=datetime(2024, 3, 28, 18, 0),
+        )
+        is None
+    )
+
+
+def test_plan_sizes_gaps_in_trading_days():
+    now = datetime(2024, 9, 4, 18, 0)
+    assert plan(datetime(2024, 8, 20), now=now) == "compact"
+    assert plan(datetime(2023, 9, 1), now=now) == "full"
+    # Exactly one compact window of missing sessions needs the full history
+    assert trading_days_between(date(2024, 4, 11), date(2024, 9, 4)) == COMPACT_BARS
+    assert plan(datetime(2024, 4, 11), now=now) == "full"
+
+
+def test_cold_symbol_is_served_compact_and_backfilled_later(
+    run, database, live_upstream
+):
+    live_upstream(full_years=2)
+
+    async def main():
+        stock_data = await StockService.get_stock_data("COLD")
+        await asyncio.gather(*background_refreshes)
+        async with async_session() as db:
+            stored = await db.scalar(
+                select(func.count())
+                .select_from(StockPrice)
+                .join(Stock)
+                .where(Stock.symbol == "COLD")
+            )
+        return stock_data, stored
+
+    stock_data, stored = run(main())
+    assert len(stock_data.prices) == COMPACT_BARS
+    # The full history was streamed in by the background backfill
+    assert stored == 2 * 252
@@ -0,0 +1,60 @@
+from datetime import date
+
+import numpy as np
+
+from app.core.database import async_session
+from app.services import stock_service as stock_module
+from app.services.market_data_generator import (
+    BASE_PRICES,
+    generate_universe,
+    mock_price_series,
+    symbol_seed,
+)
+from app.services.stock_service import StockService
+
+END = date(2024, 9, 4)
+
+
+def test_universe_is_deterministic_per_symbol_and_seed():
+    first = generate_universe(["AAPL", "GEN1"], bars=50, end=END)
+    again = generate_universe(["AAPL", "GEN1"], bars=50, end=END)
+    assert first == again
+    # A symbol's path does not depend on the other symbols generated with it
+    alone = generate_universe(["GEN1"], bars=50, end=END)
+    assert alone["GEN1"] == first["GEN1"]
+    assert symbol_seed("gen1") == symbol_seed("GEN1")
+    # Another salt draws another path
+    salted = generate_universe(["GEN1"], bars=50, end=END, salt=1)
+    assert not np.array_equal(salted["GEN1"].close, first["GEN1"].close)
+
+
+def test_universe_ends_at_the_base_price_on_business_days():
+    prices = generate_universe(["MSFT"], bars=10, end=date(2024, 9, 7))["MSFT"]
+    assert prices[0].close == BASE_PRICES["MSFT"]
+    # Saturday rolls back to Friday, newest first
+    assert prices[0].date.date() == date(2024, 9, 6)
+    assert all(row.date.weekday() < 5 for row in prices)
+    assert all(row.low <= min(row.open, row.close) for row in prices)
+    assert all(row.high >= max(row.open, row.close) for row in prices)
+
+
+def test_mock_series_is_shared_and_read_only():
+    series = mock_price_series("GEN2", END)
+    assert mock_price_series("GEN2", END) is series
+    assert not series.close.flags.writeable
+
+
+def test_demo_overview_uses_the_mock_companies(run, database, monkeypatch):
+    monkeypatch.setattr(stock_module, "ALPHA_VANTAGE_API_KEY", "demo")
+
+    async def main():
+        async with async_session() as db:
+            return (
+                await StockService.get_stock_overview("NVDA", db),
+                await StockService.get_stock_overview("GENDEMO", db),
+            )
+
+    known, unknown = run(main())
+    assert known.name == stock_module.MOCK_COMPANIES["NVDA"]["name"]
+    assert known.sector == stock_module.MOCK_COMPANIES["NVDA"]["sector"]
+    assert (unknown.name, unknown.sector) == ("GENDEMO Inc.", "Technology")
@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+
+from app.core.database import async_session
+from app.services.cache_service import MemoryCache, TieredCache
+
+
+def later(seconds: float = 3600) -> datetime:
+    return datetime.now() + timedelta(seconds=seconds)
+
+
+def test_least_recently_used_entry_is_evicted_first():
+    memory = MemoryCache(max_entries=3)
+    for key in "abc":
+        memory.set(key, key, 1, None, later())
+    # Reading "a" makes "b" the least recently used
+    assert memory.get("a") == ("a", False)
+    memory.set("d", "d", 1, None, later())
+
+    assert memory.get("b") is None
+    assert [key for key in "acd" if memory.get(key)] == ["a", "c", "d"]
+    assert memory.stats()["evictions"] == 1
+
+
+def test_entry_cap_bounds_the_entry_count():
+    memory = MemoryCache(max_entries=2)
+    for i in range(5):
+        memory.set(f"k{i}", i, 1, None, later())
+    stats = memory.stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 3
+    assert memory.get("k3") == (3, False) and memory.get("k4") == (4, False)
+
+
+def test_byte_cap_evicts_until_the_new_entry_fits():
+    memory = MemoryCache(max_bytes=100)
+    memory.set("a", "a", 40, None, later())
+    memory.set("b", "b", 40, None, later())
+    memory.set("c", "c", 50, None, later())
+    assert memory.get("a") is None
+    assert memory.stats()["bytes"] == 90
+
+    # Replacing a key releases its old size first
+    memory.set("b", "b", 10, None, later())
+    assert memory.stats()["bytes"] == 60
+    # Entries larger than the whole budget are not stored
+    memory.set("huge", "huge", 101, None, later())
+    assert memory.get("huge") is None
+    assert memory.stats()["entries"] == 2
+
+
+def test_expired_entries_are_dropped_on_read_and_sweep():
+    memory = MemoryCache()
+    memory.set("read", "v", 5, None, later(-1))
+    memory.set("swept", "v", 7, None, later(-1))
+    memory.set("live", "v", 11, None, later())
+
+    assert memory.get("read") is None
+    assert memory.clear_expired() == 1
+    stats = memory.stats()
+    assert stats["expirations"] == 2
+    assert stats["entries"] == 1
+    assert stats["bytes"] == 11
+
+
+def test_tiered_cache_sizes_entries_by_their_body(run, database):
+    # The byte budget counts encoded bodies, not the decoded values beside them
+    cache = TieredCache(MemoryCache())
+    data = {"symbol": "SIZE", "prices": list(range(100))}
+
+    async def main():
+        async with async_session() as db:
+            await cache.set(db, "size:SIZE", data, data)
+            return await cache.get_raw(db, "size:SIZE")
+
+    body, _ = run(main())
+    assert cache.memory.stats()["bytes"] == len(body)
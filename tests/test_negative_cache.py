@@ -0,0 +1,123 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from app.core.database import async_session
+from app.services.alpha_vantage_client import alpha_vantage_client
+from app.services.cache_keys import cache_keys
+from app.services.rate_limiter import RateLimiter, RateLimitExceeded
+from app.services.stock_service import StockService
+
+
+@pytest.mark.parametrize(
+    "error, expected",
+    [
+        (RateLimitExceeded("budget"), "rate_limited"),
+        (aiohttp.ClientConnectionError(), "upstream_error"),
+        (asyncio.TimeoutError(), "upstream_error"),
+        (ValueError("bug"), None),
+    ],
+)
+def test_error_classes(error, expected):
+    assert StockService._error_class(error) == expected
+
+
+async def fetch_twice(symbol: str, namespace: str = "data"):
+    """Fetch a symbol twice and return both results and its negative entry"""
+    fetch = (
+        StockService.get_stock_data
+        if namespace == "data"
+        else StockService.get_stock_overview
+    )
+    first = await fetch(symbol)
+    second = await fetch(symbol)
+    async with async_session() as db:
+        failure = await StockService._get_negative(
+            db, cache_keys.key(namespace, symbol)
+        )
+    return first, second, failure
+
+
+def test_invalid_symbols_are_negatively_cached(run, database, live_upstream):
+    upstream = live_upstream()
+
+    first, second, failure = run(fetch_twice("ZZBAD"))
+
+    assert first is None and second is None
+    assert failure["error"] == "invalid_symbol"
+    # The second call was answered by the negative entry
+    assert upstream.stats["requests"] == 1
+
+
+def test_unknown_companies_are_not_found(run, database, live_upstream):
+    upstream = live_upstream()
+
+    first, second, failure = run(fetch_twice("ZZNONE", "overview"))
+
+    assert first is None and second is None
+    assert failure["error"] == "not_found"
+    assert upstream.stats["requests"] == 1
+
+
+def test_unexpected_responses_are_negatively_cached(
+    run, database, live_upstream, monkeypatch
+):
+    live_upstream()
+
+    async def fetch_daily_series(symbol, outputsize="compact"):
+        return {"Unexpected": "payload"}
+
+    monkeypatch.setattr(StockService, "fetch_daily_series", fetch_daily_series)
+
+    first, _, failure = run(fetch_twice("ODD"))
+
+    assert first is None
+    assert failure["error"] == "unexpected_response"
+
+
+def test_upstream_errors_are_negatively_cached(run, database, live_upstream):
+    upstream = live_upstream(error_rate=1.0)
+
+    first, second, failure = run(fetch_twice("DOWN"))
+
+    assert first is None and second is None
+    assert failure["error"] == "upstream_error"
+    assert upstream.stats["errors"] == 1
+
+
+def test_local_rate_limit_is_negatively_cached_without_mock_data(
+    run, database, live_upstream, monkeypatch
+):
+    upstream = live_upstream()
+    limiter = RateLimiter(per_minute=5, per_day=1)
+    limiter.day_bucket.tokens = 0.0
+    monkeypatch.setattr(alpha_vantage_client, "rate_limiter", limiter)
+
+    first, second, failure = run(fetch_twice("BUSY"))
+
+    assert first is None and second is None
+    assert failure["error"] == "rate_limited"
+    assert upstream.stats["requests"] == 0
+    assert limiter.stats()["rejected"]["interactive"] == 1
+
+
+def test_upstream_throttling_is_negatively_cached_without_mock_data(
+    run, database, live_upstream
+):
+    upstream = live_upstream(throttle_rate=1.0)
+
+    first, second, failure = run(fetch_twice("SLOW"))
+
+    assert first is None and second is None
+    assert failure["error"] == "rate_limited"
+    assert upstream.stats["throttled"] == 1
+
+
+def test_throttled_overviews_are_not_made_up(run, database, live_upstream):
+    live_upstream(throttle_rate=1.0)
+
+    first, _, failure = run(fetch_twice("SLOWCO", "overview"))
+
+    assert first is None
+    assert failure["error"] == "rate_limited"
@@ -0,0 +1,166 @@
+"""PostgreSQL backend tests, run when TEST_POSTGRES_URL names a database
+
+    TEST_POSTGRES_URL=postgresql+asyncpg://postgres@localhost/stock_dashboard_test
+
+Tables are created in a scratch schema of that database, dropped afterwards.
+"""
+
+import os
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, select, text
+
+from app.core.config import settings
+from app.core.database import (
+    APICacheTag,
+    Base,
+    ReportingQueuePool,
+    StockPrice,
+    build_engine,
+    routing_sessionmaker,
+)
+from app.models.stock import PriceSeries, StockOverview
+from app.services import db_service
+from app.services.db_service import CacheRepository, StockRepository
+
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+SCHEMA = "test_stock_dashboard"
+
+pytestmark = pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL is not set")
+if POSTGRES_URL:
+    pytest.importorskip("asyncpg")
+
+
+def _series(start: datetime, bars: int, close: float = 10.0) -> PriceSeries:
+    return PriceSeries.from_records(
+        [
+            (f"{start + timedelta(days=i):%Y-%m-%d}", *[close] * 4, 100 + i)
+            for i in range(bars)
+        ]
+    )
+
+
+def _engine(role: str):
+    """Build a server engine for a role, with the scratch schema as search path"""
+    engine = build_engine(POSTGRES_URL, settings.DATABASE_PROFILE, role=role)
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def use_schema(dbapi_connection, record):
+        dbapi_connection.run_async(
+            lambda connection: connection.execute(f"SET search_path TO {SCHEMA}")
+        )
+
+    return engine
+
+
+def sessions(engines):
+    """Get a routing session factory over the backend's engines"""
+    return routing_sessionmaker(engines["read"], engines["write"])
+
+
+@asynccontextmanager
+async def postgres_backend():
+    """Create the tables in the scratch schema and yield the read/write engines"""
+    admin = build_engine(POSTGRES_URL, role="write")
+    async with admin.begin() as conn:
+        await conn.exec_driver_sql(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.exec_driver_sql(f"CREATE SCHEMA {SCHEMA}")
+    engines = {"read": _engine("read"), "write": _engine("write")}
+    try:
+        async with engines["write"].begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        yield engines
+    finally:
+        for engine in engines.values():
+            await engine.dispose()
+        async with admin.begin() as conn:
+            await conn.exec_driver_sql(f"DROP SCHEMA {SCHEMA} CASCADE")
+        await admin.dispose()
+
+
+def test_server_engines_share_settings_sized_pools(run):
+    async def main():
+        async with postgres_backend() as engines:
+            read_only = {}
+            for role, engine in engines.items():
+                async with engine.connect() as conn:
+                    read_only[role] = await conn.scalar(
+                        text("SHOW default_transaction_read_only")
+                    )
+            return engines, read_only
+
+    engines, read_only = run(main())
+    for engine in engines.values():
+        pool = engine.sync_engine.pool
+        assert isinstance(pool, ReportingQueuePool)
+        assert pool.size() == settings.DATABASE_POOL_SIZE
+        assert pool._max_overflow == settings.DATABASE_MAX_OVERFLOW
+        assert pool._pre_ping
+    assert engines["read"].sync_engine.pool._timeout == (
+        settings.DATABASE_POOL_TIMEOUT_SECONDS
+    )
+    assert engines["write"].sync_engine.pool._timeout == (
+        settings.DATABASE_WRITE_TIMEOUT_SECONDS
+    )
+    assert read_only == {"read": "on", "write": "off"}
+
+
+@pytest.mark.parametrize("copy", [False, True])
+def test_save_stock_prices_counts_inserts_and_updates(copy, run, monkeypatch):
+    # The chunked upsert below the COPY threshold, COPY through staging above
+    monkeypatch.setattr(db_service, "PRICE_COPY_MIN_ROWS", 1 if copy else 10**6)
+
+    async def main():
+        async with postgres_backend() as engines, sessions(engines)() as db:
+            stock = await StockRepository.save_stock(
+                db, StockOverview(symbol="PGSQL", name="Postgres Corp")
+            )
+            first = await StockRepository.save_stock_prices(
+                db, stock.id, _series(datetime(2024, 1, 1), 30), chunk_rows=7
+            )
+            # 10 bars rewritten with a new close, 5 new
+            second = await StockRepository.save_stock_prices(
+                db,
+                stock.id,
+                _series(datetime(2024, 1, 21), 15, close=20.0),
+                chunk_rows=7,
+            )
+            result = await db.execute(
+                select(StockPrice.close)
+                .where(StockPrice.stock_id == stock.id)
+                .order_by(StockPrice.date)
+            )
+            return first, second, result.scalars().all()
+
+    first, second, closes = run(main())
+    assert first == (30, 0)
+    assert second == (5, 10)
+    assert closes == [10.0] * 20 + [20.0] * 15
+
+
+def test_cache_upserts_replace_entries_and_tags(run):
+    async def main():
+        async with postgres_backend() as engines, sessions(engines)() as db:
+            for body, tags in ((b'{"v":1}', ["a", "b"]), (b'{"v":2}', ["c"])):
+                assert await CacheRepository.set_many_cached_bodies(
+                    db, [("data:v1:PG", body)], tags={"data:v1:PG": tags}
+                )
+            body = await CacheRepository.get_cached_data(db, "data:v1:PG")
+            result = await db.execute(
+                select(APICacheTag.tag).where(APICacheTag.cache_key == "data:v1:PG")
+            )
+            tags = result.scalars().all()
+            versions = [
+                await CacheRepository.bump_namespace_version(db, "search")
+                for _ in range(2)
+            ]
+            stored = await CacheRepository.get_namespace_versions(db)
+            return body, tags, versions, stored
+
+    body, tags, versions, stored = run(main())
+    assert body == b'{"v":2}'
+    assert tags == ["c"]
+    assert versions == [2, 3]
+    assert stored == {"search": 3}
@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.core.database import async_session
+from app.models.stock import PriceSeries, StockOverview
+from app.services import stock_service as stock_module
+from app.services.db_service import StockRepository
+from app.services.price_archive import PriceArchive
+from app.services.stock_service import StockService
+
+pytest.importorskip("pyarrow")
+
+START = datetime(2020, 1, 1)
+
+
+def bars(first: int, count: int, close: float = 10.0) -> PriceSeries:
+    """Daily bars from START + `first` days, oldest first"""
+    return PriceSeries.from_records(
+        [
+            (f"{START + timedelta(days=i):%Y-%m-%d}", close, close, close, close, i)
+            for i in range(first, first + count)
+        ]
+    )
+
+
+def days(prices: PriceSeries):
+    return [(row.date - START).days for row in prices]
+
+
+def test_archive_reads_back_newest_first_within_bounds(tmp_path):
+    archive = PriceArchive(tmp_path)
+    assert archive.write("ARCH", bars(0, 10)) == 10
+
+    assert days(archive.read("ARCH")) == list(range(9, -1, -1))
+    since, before = START + timedelta(days=3), START + timedelta(days=6)
+    assert days(archive.read("ARCH", since=since, before=before)) == [5, 4, 3]
+    assert len(archive.read("MISSING")) == 0
+
+
+def test_archive_writes_merge_and_replace_dates(tmp_path):
+    archive = PriceArchive(tmp_path)
+    archive.write("ARCH", bars(0, 10))
+    # Overlapping dates take the newly written bars
+    assert archive.write("ARCH", bars(8, 4, close=20.0)) == 12
+    prices = archive.read("ARCH")
+    closes = dict(zip(days(prices), prices.close.tolist()))
+    assert [closes[day] for day in (7, 8, 11)] == [10.0, 20.0, 20.0]
+
+
+@pytest.fixture
+def archive(tmp_path, monkeypatch):
+    """Archive into a scratch directory, keeping 10 days in the database"""
+    monkeypatch.setattr(settings, "PRICE_ARCHIVE_HOT_DAYS", 10)
+    scratch = PriceArchive(tmp_path)
+    monkeypatch.setattr(stock_module, "price_archive", scratch)
+    return scratch
+
+
+async def store(db, symbol: str, prices: PriceSeries) -> int:
+    stock = await StockRepository.save_stock(
+        db, StockOverview(symbol=symbol, name=f"{symbol} Inc.")
+    )
+    await StockRepository.save_stock_prices(db, stock.id, prices)
+    return stock.id
+
+
+def test_history_merges_archived_and_stored_bars(run, database, archive):
+    async def main():
+        async with async_session() as db:
+            stock_id = await store(db, "ARCHM", bars(0, 30))
+            moved = await StockService.archive_price_history(
+                db, stock_id, "ARCHM", START + timedelta(days=29)
+            )
+            stored = await StockRepository.get_price_series(db, stock_id)
+            history = await StockService.get_price_history("ARCHM", db)
+            return moved, stored, history
+
+    moved, stored, history = run(main())
+    assert moved == 19
+    assert days(stored) == list(range(29, 18, -1))
+    assert days(archive.read("ARCHM")) == list(range(18, -1, -1))
+    assert days(history.prices) == list(range(29, -1, -1))
+
+
+def test_bars_stored_during_archiving_are_kept(run, database, archive):
+    get_price_series = StockRepository.get_price_series
+
+    async def read_then_store(db, stock_id, days=None, before=None):
+        closed = await get_price_series(db, stock_id, days=days, before=before)
+        # Another writer stores an old bar after the closed bars were read
+        async with async_session() as other:
+            await StockRepository.save_stock_prices(other, stock_id, bars(-1, 1))
+        return closed
+
+    async def main():
+        async with async_session() as db:
+            stock_id = await store(db, "ARCHR", bars(0, 30))
+            with pytest.MonkeyPatch.context() as patch:
+                patch.setattr(StockRepository, "get_price_series", read_then_store)
+                moved = await StockService.archive_price_history(
+                    db, stock_id, "ARCHR", START + timedelta(days=29)
+                )
+            kept = await StockRepository.get_price_series(db, stock_id)
+            # The next run archives it
+            await StockService.archive_price_history(
+                db, stock_id, "ARCHR", START + timedelta(days=29)
+            )
+            remaining = await StockRepository.get_price_series(db, stock_id)
+            return moved, kept, remaining
+
+    moved, kept, remaining = run(main())
+    assert moved == 19
+    assert days(kept) == [*range(29, 18, -1), -1]
+    assert days(remaining) == list(range(29, 18, -1))
+    assert days(archive.read("ARCHR")) == list(range(18, -2, -1))
@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.core.database import async_session, read_engine, write_engine
+from app.models.stock import PriceSeries, StockOverview
+from app.services.db_service import (
+    PRICE_UPSERT_CHUNK_ROWS,
+    SELECT_CHUNK_ROWS,
+    StockRepository,
+)
+
+
+def test_latest_price_dates_bind_symbols_in_chunks(run, database):
+    symbols = [f"LP{i}" for i in range(3 * SELECT_CHUNK_ROWS + 1)]
+    stored = symbols[:: SELECT_CHUNK_ROWS + 1]
+    bound = []
+
+    def count_parameters(conn, cursor, statement, parameters, context, many):
+        if "max(stock_prices.date)" in statement:
+            bound.append(len(parameters))
+
+    async def main():
+        async with async_session() as db:
+            for day, symbol in enumerate(stored, start=1):
+                stock = await StockRepository.save_stock(
+                    db, StockOverview(symbol=symbol, name=symbol)
+                )
+                await StockRepository.save_stock_prices(
+                    db,
+                    stock.id,
+                    PriceSeries.from_records(
+                        [(f"2024-01-{day:02d}", 1.0, 1.0, 1.0, 1.0, 100)]
+                    ),
+                )
+            return await StockRepository.get_latest_price_dates(db, symbols)
+
+    engines = [engine.sync_engine for engine in (read_engine, write_engine)]
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", count_parameters)
+    try:
+        latest = run(main())
+    finally:
+        for engine in engines:
+            event.remove(engine, "before_cursor_execute", count_parameters)
+
+    assert latest == {
+        symbol: datetime(2024, 1, day) for day, symbol in enumerate(stored, start=1)
+    }
+    assert bound == [SELECT_CHUNK_ROWS] * 3 + [1]
+
+
+def daily_bars(start: datetime, count: int, close: float) -> PriceSeries:
+    return PriceSeries.from_records(
+        [
+            (f"{start + timedelta(days=i):%Y-%m-%d}", close, close, close, close, i)
+            for i in range(count)
+        ]
+    )
+
+
+# SQLite's default limit on bound values per statement
+SQLITE_MAX_VARIABLES = 32766
+
+
+@pytest.mark.parametrize("chunk_rows", [PRICE_UPSERT_CHUNK_ROWS, 7])
+def test_save_stock_prices_counts_inserts_and_updates(chunk_rows, run, database):
+    # 5000 bars bind 40000 values in all, more than one statement may hold
+    bars = 5000
+    start = datetime(1990, 1, 1)
+    symbol = f"UPS{chunk_rows}"
+    bound = []
+
+    def count_parameters(conn, cursor, statement, parameters, context, many):
+        if statement.startswith("INSERT INTO stock_prices"):
+            bound.append(len(parameters))
+
+    async def main():
+        async with async_session() as db:
+            stock = await StockRepository.save_stock(
+                db, StockOverview(symbol=symbol, name=symbol)
+            )
+            first = await StockRepository.save_stock_prices(
+                db, stock.id, daily_bars(start, bars, 10.0), chunk_rows=chunk_rows
+            )
+            # The second half is rewritten with a new close, as many bars added
+            second = await StockRepository.save_stock_prices(
+                db,
+                stock.id,
+                daily_bars(start + timedelta(days=bars // 2), bars, 20.0),
+                chunk_rows=chunk_rows,
+            )
+            stored = await StockRepository.get_price_series(db, stock.id)
+            return first, second, stored
+
+    engine = write_engine.sync_engine
+    event.listen(engine, "before_cursor_execute", count_parameters)
+    try:
+        first, second, stored = run(main())
+    finally:
+        event.remove(engine, "before_cursor_execute", count_parameters)
+
+    assert first == (bars, 0)
+    assert second == (bars // 2, bars // 2)
+    assert len(stored) == bars + bars // 2
+    assert stored.close.tolist() == [20.0] * bars + [10.0] * (bars // 2)
+    assert sum(bound) == 2 * bars * 8
+    assert max(bound) < SQLITE_MAX_VARIABLES
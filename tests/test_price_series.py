@@ -0,0 +1,96 @@
+import json
+from datetime import datetime
+
+import numpy as np
+
+from app.models.stock import PriceSeries, StockData, StockPrice
+
+RECORDS = [
+    ("2024-01-02", 10.0, 11.0, 9.5, 10.5, 1000),
+    ("2024-01-03", 10.5, 12.0, 10.0, 11.5, 2000),
+    ("2024-01-04", 11.5, 11.8, 10.9, 11.0, 1500),
+    ("2024-01-05", 11.0, 11.2, 10.1, 10.2, 1200),
+]
+
+
+def series() -> PriceSeries:
+    return PriceSeries.from_records(RECORDS)
+
+
+def test_integer_indexing_and_iteration_build_rows():
+    prices = series()
+    assert len(prices) == 4
+    assert prices[1] == StockPrice(
+        date=datetime(2024, 1, 3),
+        open=10.5,
+        high=12.0,
+        low=10.0,
+        close=11.5,
+        volume=2000,
+    )
+    assert prices[-1].close == 10.2
+    assert list(prices) == prices.to_rows()
+    assert [row.volume for row in prices] == [1000, 2000, 1500, 1200]
+
+
+def test_slices_are_views_of_the_columns():
+    prices = series()
+    middle = prices[1:3]
+    assert isinstance(middle, PriceSeries)
+    assert [row.close for row in middle] == [11.5, 11.0]
+    assert np.shares_memory(middle.close, prices.close)
+    assert len(prices[4:]) == 0
+
+
+def test_since_keeps_bars_on_or_after_the_start():
+    prices = series()
+    assert [row.date.day for row in prices.since(datetime(2024, 1, 3))] == [3, 4, 5]
+    assert len(prices.since(datetime(2024, 2, 1))) == 0
+    assert prices.since(datetime(2023, 1, 1)) == prices
+
+
+def test_sorted_and_concat():
+    prices = series()
+    newest_first = prices.sorted()
+    assert [row.date.day for row in newest_first] == [5, 4, 3, 2]
+    assert newest_first.sorted(descending=False) == prices
+    assert PriceSeries.concat([prices[:2], prices[2:]]) == prices
+    assert PriceSeries.concat([]) == PriceSeries.empty()
+
+
+def test_json_and_row_round_trips():
+    prices = series()
+    assert PriceSeries.from_json_rows(prices.to_json_rows()) == prices
+    assert PriceSeries.from_rows(prices.to_rows()) == prices
+    assert PriceSeries.from_rows([row.model_dump() for row in prices]) == prices
+    assert prices.to_json_rows()[0] == {
+        "date": "2024-01-02T00:00:00",
+        "open": 10.0,
+        "high": 11.0,
+        "low": 9.5,
+        "close": 10.5,
+        "volume": 1000,
+    }
+
+
+def test_stock_data_serializes_prices_as_rows():
+    data = StockData(symbol="PS", name="Price Series Inc.", prices=series())
+    body = data.model_dump_json()
+    assert json.loads(body)["prices"] == series().to_json_rows()
+    assert StockData.model_validate_json(body).prices == series()
+    # Python dumps keep datetimes; validation accepts rows or a series
+    dumped = data.model_dump()
+    assert dumped["prices"][0]["date"] == datetime(2024, 1, 2)
+    assert StockData.model_validate(dumped).prices == series()
+    assert StockData(symbol="PS", name="Empty").prices == PriceSeries.empty()
+
+
+def test_json_schema_documents_a_list_of_price_rows():
+    schema = StockData.model_json_schema()
+    prices = schema["properties"]["prices"]
+    assert prices["type"] == "array"
+    assert prices["items"]["$ref"].endswith("/StockPrice")
+    assert list(schema["$defs"]["StockPrice"]["properties"]) == [
+        "date",
+        *PriceSeries.COLUMNS,
+    ]
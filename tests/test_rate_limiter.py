@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+
+from app.services.alpha_vantage_client import AlphaVantageClient
+from app.services.rate_limiter import Priority, RateLimiter, RateLimitExceeded
+
+
+def drained_limiter(per_minute: int = 600, **options) -> RateLimiter:
+    """Create a limiter whose minute bucket starts empty"""
+    limiter = RateLimiter(per_minute=per_minute, per_day=1000, **options)
+    limiter.minute_bucket.tokens = 0.0
+    return limiter
+
+
+def test_fast_path_takes_a_token(run):
+    limiter = RateLimiter(per_minute=5, per_day=10)
+    run(limiter.acquire())
+    stats = limiter.stats()
+    assert stats["remaining_minute"] == 4
+    assert stats["granted"] == {"interactive": 1, "background": 0}
+
+
+def test_interactive_calls_are_served_before_queued_background_calls(run):
+    limiter = drained_limiter()
+    order = []
+
+    async def call(priority: Priority):
+        await limiter.acquire(priority)
+        order.append(priority)
+
+    async def main():
+        background = [
+            asyncio.create_task(call(Priority.BACKGROUND)) for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(call(Priority.INTERACTIVE))
+        await asyncio.gather(*background, interactive)
+
+    run(main())
+    assert order[0] == Priority.INTERACTIVE
+    assert order[1:] == [Priority.BACKGROUND] * 2
+
+
+def test_interactive_calls_give_up_after_max_wait(run):
+    limiter = drained_limiter(per_minute=1, interactive_max_wait=0.05)
+    with pytest.raises(RateLimitExceeded):
+        run(limiter.acquire(Priority.INTERACTIVE))
+    assert limiter.stats()["rejected"]["interactive"] == 1
+
+
+def test_exhausted_daily_budget_is_refused(run):
+    limiter = RateLimiter(per_minute=5, per_day=1)
+    run(limiter.acquire())
+    with pytest.raises(RateLimitExceeded):
+        run(limiter.acquire())
+
+
+def test_penalize_drains_the_minute_bucket():
+    limiter = RateLimiter(per_minute=5, per_day=10)
+    limiter.penalize()
+    stats = limiter.stats()
+    assert stats["remaining_minute"] == 0
+    assert stats["throttled"] == 1
+
+
+def test_upstream_throttle_note_penalizes(run, fake_upstream):
+    url, _ = fake_upstream(throttle_rate=1.0)
+    limiter = RateLimiter(per_minute=100, per_day=100)
+    client = AlphaVantageClient(url, rate_limiter=limiter)
+
+    async def main():
+        try:
+            data = await client.query({"function": "OVERVIEW", "symbol": "AAPL"})
+            text = "".join(
+                [piece async for piece in client.iter_text({"function": "OVERVIEW"})]
+            )
+        finally:
+            await client.close()
+        return data, text
+
+    data, text = run(main())
+    assert "Information" in data and "Information" in text
+    assert limiter.throttled == 2
+
+
+def test_streamed_series_does_not_penalize(run, fake_upstream):
+    url, _ = fake_upstream()
+    limiter = RateLimiter(per_minute=100, per_day=100)
+    client = AlphaVantageClient(url, rate_limiter=limiter)
+    params = {"function": "TIME_SERIES_DAILY", "symbol": "AAPL", "outputsize": "full"}
+
+    async def main():
+        try:
+            return [piece async for piece in client.iter_text(params, 4096)]
+        finally:
+            await client.close()
+
+    assert len(run(main())) > 1
+    assert limiter.throttled == 0
+
+
+def test_local_refusal_does_not_penalize(run, fake_upstream):
+    url, config = fake_upstream()
+    limiter = RateLimiter(per_minute=100, per_day=1)
+    limiter.day_bucket.tokens = 0.0
+    client = AlphaVantageClient(url, rate_limiter=limiter)
+
+    async def main():
+        try:
+            return await client.query({"function": "OVERVIEW", "symbol": "AAPL"})
+        finally:
+            await client.close()
+
+    with pytest.raises(RateLimitExceeded):
+        run(main())
+    assert limiter.throttled == 0
+    assert config.stats["requests"] == 0
@@ -0,0 +1,67 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from app.core.database import async_session
+from app.services import scheduler_service as scheduler_module
+from app.services.db_service import StockRepository
+from app.services.market_calendar import market_time
+from app.services.scheduler_service import scheduler_service
+
+
+def test_pipeline_skips_up_to_date_symbols_and_survives_failures(
+    run, database, live_upstream, monkeypatch
+):
+    upstream = live_upstream()
+    monkeypatch.setattr(scheduler_service, "refresh_concurrency", 2)
+    now = market_time()
+    # Fetched after today's close: nothing to fetch
+    current = ["PIPEC1", "PIPEC2"]
+    # A few sessions behind: one compact fetch each
+    stale = [f"PIPES{i}" for i in range(5)]
+    # Unknown to the upstream, which answers with an error message
+    unknown = ["ZZPIPE"]
+    symbols = [*current, *unknown, *stale]
+    latest = {symbol: now - timedelta(days=7) for symbol in stale + unknown}
+    latest.update({symbol: now + timedelta(days=1) for symbol in current})
+    fetched_at = {symbol: now + timedelta(days=1) for symbol in current}
+
+    async def main():
+        await scheduler_service._run_refresh_pipeline(symbols, latest, fetched_at)
+        async with async_session() as db:
+            return await StockRepository.get_latest_price_dates(db, symbols)
+
+    stored = run(main())
+    progress = scheduler_service.refresh_progress
+    assert progress["skipped"] == 2
+    assert progress["failed"] == 1
+    assert progress["persisted"] == 5
+    assert not progress["running"]
+    assert sorted(stored) == stale
+    # Two calls per fetched symbol (daily series and overview), none skipped
+    assert upstream.stats["requests"] == 2 * (len(stale) + len(unknown))
+
+
+def test_pipeline_stops_when_a_stage_fails(run, database, live_upstream, monkeypatch):
+    live_upstream()
+    monkeypatch.setattr(scheduler_service, "refresh_concurrency", 1)
+
+    def unavailable():
+        raise RuntimeError("database unavailable")
+
+    # Persist workers cannot open a session, so nothing drains the bounded
+    # queues the fetch and parse workers are feeding
+    monkeypatch.setattr(scheduler_module, "async_session", unavailable)
+    symbols = [f"PIPEF{i}" for i in range(8)]
+    latest = {symbol: market_time() - timedelta(days=7) for symbol in symbols}
+
+    async def main():
+        pipeline = scheduler_service._run_refresh_pipeline(symbols, latest)
+        with pytest.raises(ExceptionGroup) as raised:
+            await asyncio.wait_for(pipeline, 10)
+        return raised.value
+
+    group = run(main())
+    assert [str(e) for e in group.exceptions] == ["database unavailable"]
+    assert not scheduler_service.refresh_progress["running"]
@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+from sqlalchemy import insert, select, text
+
+from app.core.database import (
+    ReportingQueuePool,
+    Stock,
+    async_session,
+    read_engine,
+    write_engine,
+    write_intent,
+)
+
+
+def test_statements_are_routed_by_intent():
+    with async_session().sync_session as session:
+        reader = read_engine.sync_engine
+        writer = write_engine.sync_engine
+        assert session.get_bind(clause=select(Stock)) is reader
+        assert session.get_bind(clause=write_intent(select(Stock))) is writer
+        assert session.get_bind(clause=insert(Stock)) is writer
+        assert session.get_bind() is writer
+
+
+@pytest.mark.parametrize("via", ["flush", "execute"])
+def test_reads_complete_while_the_writer_is_busy(via, run, database, monkeypatch):
+    symbol = f"ROUTE{via[0].upper()}"
+    # A single read connection: a session keeping it while it waits for the
+    # writer would starve every other reader
+    pool = read_engine.sync_engine.pool
+    tiny = ReportingQueuePool(
+        pool._creator,
+        pool_size=1,
+        max_overflow=0,
+        timeout=0.5,
+        dialect=pool._dialect,
+        _dispatch=pool.dispatch,
+    )
+    monkeypatch.setattr(read_engine.sync_engine, "pool", tiny)
+
+    async def read_then_write():
+        async with async_session() as db:
+            await db.execute(select(Stock).where(Stock.symbol == symbol))
+            if via == "flush":
+                db.add(Stock(symbol=symbol, name="Routing Corp"))
+            else:
+                stmt = insert(Stock).values(symbol=symbol, name="Routing Corp")
+                await db.execute(stmt)
+            await db.commit()
+
+    async def read():
+        async with async_session() as db:
+            result = await db.execute(select(Stock.symbol))
+            return result.scalars().all()
+
+    async def main():
+        async with write_engine.connect() as busy_writer:
+            await busy_writer.execute(text("SELECT 1"))
+            writing = asyncio.create_task(read_then_write())
+            await asyncio.sleep(0.2)
+            assert not writing.done()
+            checked_out = tiny.checkedout()
+            reads = await asyncio.gather(*(read() for _ in range(3)))
+        await writing
+        async with async_session() as db:
+            stored = await db.scalar(select(Stock.name).where(Stock.symbol == symbol))
+        return checked_out, reads, stored
+
+    checked_out, reads, stored = run(main())
+    assert checked_out == 0
+    assert all(symbol not in symbols for symbols in reads)
+    assert stored == "Routing Corp"
+
+
+def test_session_reads_its_own_uncommitted_writes(run, database):
+    async def main():
+        async with async_session() as db:
+            db.add(Stock(symbol="RYWF", name="Flushed Corp"))
+            await db.flush()
+            await db.execute(insert(Stock).values(symbol="RYWE", name="Executed Corp"))
+            seen = await db.execute(
+                select(Stock.symbol).where(Stock.symbol.in_(["RYWF", "RYWE"]))
+            )
+            seen = sorted(seen.scalars().all())
+            await db.rollback()
+            # A new transaction reads from the read engine again
+            routed = db.sync_session.get_bind(clause=select(Stock))
+            gone = await db.scalar(select(Stock.id).where(Stock.symbol == "RYWF"))
+            return seen, routed, gone
+
+    seen, routed, gone = run(main())
+    assert seen == ["RYWE", "RYWF"]
+    assert routed is read_engine.sync_engine
+    assert gone is None
+
+
+def test_session_transaction_layout_used_to_release_reads(run, database):
+    # RoutingSession._release_read_connection edits this private structure;
+    # if an SQLAlchemy upgrade changes it, this fails before routing does
+    from sqlalchemy.engine import Connection, Transaction
+
+    async def main():
+        async with async_session() as db:
+            await db.execute(select(Stock.id))
+            connections = db.sync_session.get_transaction()._connections
+            entry = connections[read_engine.sync_engine]
+            layout = (
+                len(entry),
+                isinstance(entry[0], Connection),
+                isinstance(entry[1], Transaction),
+                connections.get(entry[0]) is entry,
+            )
+            await db.run_sync(lambda session: session.start_writing())
+            released = (
+                read_engine.sync_engine not in connections
+                and entry[0] not in connections
+                and entry[0].closed
+            )
+            return layout, released
+
+    layout, released = run(main())
+    assert layout == (4, True, True, True)
+    assert released
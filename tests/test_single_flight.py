@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution(run):
+    flights = SingleFlight("test")
+    executions = 0
+
+    async def work():
+        nonlocal executions
+        executions += 1
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def main():
+        return await asyncio.gather(*(flights.do("key", work) for _ in range(10)))
+
+    assert run(main()) == ["result"] * 10
+    assert executions == 1
+    assert flights.stats() == {
+        "calls": 10,
+        "executions": 1,
+        "coalesced": 9,
+        "in_flight": 0,
+    }
+
+
+def test_distinct_keys_run_separately(run):
+    flights = SingleFlight("test")
+
+    async def main():
+        return await asyncio.gather(
+            flights.do("a", lambda: asyncio.sleep(0, result="a")),
+            flights.do("b", lambda: asyncio.sleep(0, result="b")),
+        )
+
+    assert run(main()) == ["a", "b"]
+    assert flights.executions == 2
+
+
+def test_leader_error_reaches_every_waiter(run):
+    flights = SingleFlight("test")
+
+    async def work():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def main():
+        return await asyncio.gather(
+            *(flights.do("key", work) for _ in range(3)), return_exceptions=True
+        )
+
+    results = run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert not flights.is_in_flight("key")
+
+
+def test_cancelled_leader_hands_over_to_a_waiter(run):
+    flights = SingleFlight("test")
+    started = []
+
+    async def work():
+        started.append(None)
+        await asyncio.sleep(0.05)
+        return len(started)
+
+    async def main():
+        leader = asyncio.create_task(flights.do("key", work))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(flights.do("key", work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await waiter
+
+    # The waiter retried as the new leader instead of seeing the cancellation
+    assert run(main()) == 2
+    assert flights.executions == 2
+
+
+def test_cancelled_waiter_leaves_the_flight_running(run):
+    flights = SingleFlight("test")
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        leader = asyncio.create_task(flights.do("key", work))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(flights.do("key", work))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return await leader
+
+    assert run(main()) == "result"
+    assert flights.executions == 1
+
+
+def test_stats_cover_every_stock_service_group():
+    from app.services import stock_service as stock_module
+
+    groups = {
+        value.name
+        for value in vars(stock_module).values()
+        if isinstance(value, SingleFlight)
+    }
+    stats = stock_module.StockService.single_flight_stats()
+    assert "history_backfill" in stats
+    assert set(stats) == groups
@@ -0,0 +1,114 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+from app.core.database import async_session
+from app.models.stock import PriceSeries, StockData, StockOverview
+from app.services.cache_service import MemoryCache, TieredCache
+from app.services.db_service import CacheRepository, StockRepository
+from app.services.stock_service import StockService, stock_data_refreshes
+
+
+def stock_data(symbol: str, name: str) -> StockData:
+    return StockData(
+        symbol=symbol,
+        name=name,
+        prices=PriceSeries.from_records(
+            [(f"{datetime.now():%Y-%m-%d}", 1.0, 1.0, 1.0, 1.0, 100)]
+        ),
+        last_updated=datetime.now(),
+    )
+
+
+def test_entries_turn_stale_then_expire():
+    memory = MemoryCache()
+    now = datetime.now()
+    memory.set("fresh", "v", 1, now + timedelta(hours=1), now + timedelta(hours=2))
+    memory.set("stale", "v", 1, now - timedelta(seconds=1), now + timedelta(hours=1))
+    memory.set("gone", "v", 1, None, now - timedelta(seconds=1))
+
+    assert memory.get("fresh") == ("v", False)
+    assert memory.get("stale") == ("v", True)
+    assert memory.get("gone") is None
+    assert memory.stats()["expirations"] == 1
+
+
+def test_database_tier_reports_staleness_and_expiry(run, database):
+    async def main():
+        async with async_session() as db:
+            await CacheRepository.set_cached_data(
+                db, "swr:stale", {"v": 1}, expire_seconds=3600, stale_seconds=0
+            )
+            await CacheRepository.set_cached_data(
+                db, "swr:gone", {"v": 1}, expire_seconds=0
+            )
+            # A fresh memory tier reads both from the database
+            cache = TieredCache(MemoryCache())
+            return (
+                await cache.get(db, "swr:stale", json.loads),
+                await cache.get(db, "swr:gone", json.loads),
+            )
+
+    stale, gone = run(main())
+    assert stale == ({"v": 1}, True)
+    assert gone is None
+
+
+def test_stale_hit_is_served_while_one_refresh_runs(run, database, monkeypatch):
+    monkeypatch.setattr(settings, "STOCK_DATA_SOFT_TTL_SECONDS", 0)
+    refreshes = []
+    release = asyncio.Event()
+
+    async def refresh_stock_data(symbol, db=None):
+        async def refresh():
+            refreshes.append(symbol)
+            await release.wait()
+
+        return await stock_data_refreshes.do(symbol, refresh)
+
+    monkeypatch.setattr(StockService, "refresh_stock_data", refresh_stock_data)
+
+    async def main():
+        async with async_session() as db:
+            await StockService.cache_stock_data(db, stock_data("SWRS", "Stale Inc."))
+            served = []
+            for _ in range(3):
+                served.append(await StockService.get_stock_data("SWRS", db))
+                body = await StockService.get_stock_data_json("SWRS", db)
+                served.append(StockData.model_validate_json(body))
+                # Let the refresh task start, as a request boundary would
+                await asyncio.sleep(0)
+            started = len(refreshes)
+            release.set()
+            await asyncio.sleep(0.01)
+            return served, started
+
+    served, started = run(main())
+    assert [data.name for data in served] == ["Stale Inc."] * 6
+    assert started == 1
+
+
+def test_expired_entry_is_fetched_before_answering(run, database, monkeypatch):
+    monkeypatch.setattr(settings, "STOCK_DATA_HARD_TTL_SECONDS", 0)
+    refreshes = []
+
+    async def refresh_stock_data(symbol, db=None):
+        refreshes.append(symbol)
+
+    monkeypatch.setattr(StockService, "refresh_stock_data", refresh_stock_data)
+
+    async def main():
+        async with async_session() as db:
+            stock = await StockRepository.save_stock(
+                db, StockOverview(symbol="SWRH", name="Stored Inc.")
+            )
+            await StockRepository.save_stock_prices(
+                db, stock.id, stock_data("SWRH", "Stored Inc.").prices
+            )
+            await StockService.cache_stock_data(db, stock_data("SWRH", "Expired Inc."))
+            return await StockService.get_stock_data("SWRH", db)
+
+    data = run(main())
+    assert data.name == "Stored Inc."
+    assert refreshes == []
@@ -0,0 +1,118 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app.core.database import async_session
+from app.models.stock import StockOverview
+from app.services.autocomplete_index import AutocompleteIndex
+from app.services.db_service import StockRepository
+from app.services.scheduler_service import scheduler_service
+from app.services.stock_service import SEARCH_RESULTS, StockService
+
+SEARCH_STOCKS = [
+    ("ZEPH", "Zephyr Holdings Inc."),
+    ("ZEPHB", "Zephyr Holdings Class B"),
+    ("ZPHR", "Zephyrine Capital Group"),
+    ("ZNTH", "Zenith Zephyr Energy Corp."),
+    ("ZNT", "Zenith Technologies Ltd."),
+    ("ZNTX", "Zenith Therapeutics Inc."),
+    ("ZZEN", "Zen Garden Realty Trust"),
+]
+QUERIES = ["z", "zep", "zeph", "ZEPHB", "zen", "zenith t", "zephyr hold", "garden"]
+
+
+@pytest.fixture(scope="module")
+def search_stocks(database):
+    async def main():
+        async with async_session() as db:
+            for symbol, name in SEARCH_STOCKS:
+                await StockRepository.save_stock(
+                    db, StockOverview(symbol=symbol, name=name)
+                )
+            return await StockRepository.get_stock_names(db)
+
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_index_matches_the_database_search(query, run, search_stocks):
+    index = AutocompleteIndex()
+    index.build(search_stocks)
+
+    async def main():
+        async with async_session() as db:
+            stocks = await StockRepository.search_stocks(db, query, SEARCH_RESULTS)
+            return [(stock.symbol, stock.name) for stock in stocks]
+
+    # Both find the same stocks; token matches are ranked by word position in
+    # the index and by BM25 in the database, so only exact symbols must lead
+    found, stored = index.search(query, SEARCH_RESULTS), run(main())
+    assert sorted(found) == sorted(stored)
+    if query.upper() in dict(search_stocks):
+        exact = (query.upper(), dict(search_stocks)[query.upper()])
+        assert found[0] == stored[0] == exact
+
+
+@pytest.fixture
+def index(search_stocks, monkeypatch):
+    """Serve searches from a fresh index built over the stored stocks"""
+    from app.services import stock_service as stock_module
+
+    fresh = AutocompleteIndex()
+    fresh.build(search_stocks)
+    fresh.synced_at = datetime.now()
+    monkeypatch.setattr(stock_module, "autocomplete_index", fresh)
+    return fresh
+
+
+async def store_elsewhere(symbol: str, name: str):
+    """Store a stock as another process would, so the served index misses it"""
+    async with async_session() as db:
+        await StockRepository.save_stock(db, StockOverview(symbol=symbol, name=name))
+
+
+def test_built_index_answers_without_the_database(run, index, live_upstream):
+    live_upstream()
+
+    async def no_database_search(*args, **kwargs):
+        raise AssertionError("database searched")
+
+    async def main():
+        async with async_session() as db:
+            return await StockService.search_stocks("zephyr hold", db)
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(StockRepository, "search_stocks", no_database_search)
+        results = run(main())
+    assert [result["symbol"] for result in results[:2]] == ["ZEPH", "ZEPHB"]
+
+
+def test_sync_adds_stocks_stored_and_renamed_elsewhere(run, index, live_upstream):
+    live_upstream()
+
+    async def main():
+        await store_elsewhere("ZEPHX", "Zephyr Exchange Traded Fund")
+        await store_elsewhere("ZPHR", "Zephyrine Capital Partners")
+        async with async_session() as db:
+            before = await StockService.search_stocks("zephyr ex", db)
+            synced = await StockService.sync_search_index(db)
+            after = await StockService.search_stocks("zephyr ex", db)
+        return before, synced, after
+
+    before, synced, after = run(main())
+    assert "ZEPHX" not in [result["symbol"] for result in before]
+    # Recently stored stocks are read again, within the sync overlap
+    assert synced >= 2
+    assert after[0]["symbol"] == "ZEPHX"
+    assert index.search("zephyrine") == [("ZPHR", "Zephyrine Capital Partners")]
+
+
+def test_rebuild_picks_up_stocks_stored_elsewhere(run, index):
+    async def main():
+        await store_elsewhere("ZRBD", "Zebra Rebuild Holdings")
+        assert index.search("zebra rebuild") == []
+        await scheduler_service.rebuild_search_index()
+
+    run(main())
+    assert index.search("zebra rebuild") == [("ZRBD", "Zebra Rebuild Holdings")]
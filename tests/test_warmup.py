@@ -0,0 +1,92 @@
+import asyncio
+import time
+from collections import Counter
+
+import httpx
+
+from app.core.config import settings
+from app.core.database import async_session
+from app.services.cache_keys import cache_keys
+from app.services.cache_service import tiered_cache
+from app.services.db_service import RequestStatsRepository
+from app.services.stock_service import background_refreshes
+from app.services.warmup_service import WarmupService, warmup_service
+
+
+def enable_warmup(monkeypatch, timeout: float = 60.0):
+    monkeypatch.setattr(settings, "WARMUP_ENABLED", True)
+    monkeypatch.setattr(settings, "WARMUP_TIMEOUT_SECONDS", timeout)
+
+
+def test_warm_up_loads_popular_and_most_requested_symbols(
+    run, database, live_upstream, monkeypatch
+):
+    enable_warmup(monkeypatch)
+    monkeypatch.setattr(settings, "WARMUP_MAX_SYMBOLS", 3)
+    live_upstream()
+    service = WarmupService()
+
+    async def main():
+        async with async_session() as db:
+            await RequestStatsRepository.add_request_counts(
+                db, Counter({"WRMA": 10**6, "WRMB": 10**6 - 1})
+            )
+        await service.warm_up(["WRMP"])
+        # History backfills started by the loads finish before the loop closes
+        await asyncio.gather(*background_refreshes)
+
+    run(main())
+    symbols = ["WRMP", "WRMA", "WRMB"]
+    assert service.progress["state"] == "done"
+    assert service.progress["total"] == service.progress["loaded"] == 3
+    for symbol in symbols:
+        for namespace in ("data", "overview"):
+            assert tiered_cache.memory.get(cache_keys.key(namespace, symbol))
+
+
+def test_warm_up_gives_up_after_the_timeout(run, database, live_upstream, monkeypatch):
+    enable_warmup(monkeypatch, timeout=0.2)
+    live_upstream(latency_ms=2000)
+    service = WarmupService()
+
+    async def main():
+        started = time.monotonic()
+        await service.warm_up(["WRMSLOW"])
+        elapsed = time.monotonic() - started
+        await asyncio.gather(*background_refreshes)
+        return elapsed
+
+    elapsed = run(main())
+    assert service.progress["state"] == "timed_out"
+    assert service.ready
+    assert elapsed < 1.5
+
+
+def test_ready_reports_503_until_warm_up_finishes(
+    run, database, live_upstream, monkeypatch
+):
+    from app.app import app
+
+    enable_warmup(monkeypatch)
+    live_upstream(latency_ms=300)
+    monkeypatch.setattr(warmup_service, "progress", {"state": "pending"})
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        client = httpx.AsyncClient(transport=transport, base_url="http://test")
+        async with client:
+            pending = await client.get("/api/v1/ready")
+            warming = asyncio.create_task(warmup_service.warm_up(["WRMR"]))
+            await asyncio.sleep(0.1)
+            running = await client.get("/api/v1/ready")
+            await warming
+            ready = await client.get("/api/v1/ready")
+        await asyncio.gather(*background_refreshes)
+        return pending, running, ready
+
+    pending, running, ready = run(main())
+    assert pending.status_code == running.status_code == 503
+    assert running.json()["warmup"]["state"] == "running"
+    assert ready.status_code == 200
+    assert ready.json() == {"ready": True, "warmup": warmup_service.progress}
+    assert ready.json()["warmup"]["state"] == "done"